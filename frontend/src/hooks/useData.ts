@@ -24,6 +24,8 @@ import type {
   UtilityModel,
   OccupantFinanceModel,
   RiskModel,
+  HousingCostSelection,
+  HousingCostResult,
 } from '../types/database'
 // BASELINE_SCENARIO_ID available if needed for fallback
 
@@ -569,3 +571,60 @@ export function useOccupantFinanceModels() {
 export function useRiskModels() {
   return useSupabaseQuery<RiskModel>('v_risk_models', 'sort_order')
 }
+
+// Precomputed monthly housing cost for one full selection (loader/housing_cost_results.py).
+// data is null while the selection's row loads and when the batch job hasn't priced the
+// combination; it never holds the row of a previous selection.
+export function useHousingCostResult(selection: HousingCostSelection | null) {
+  const [state, setState] = useState<{
+    key: string | null
+    data: HousingCostResult | null
+    loading: boolean
+    error: string | null
+  }>({ key: null, data: null, loading: false, error: null })
+  const selectionKey = selection ? JSON.stringify(selection) : null
+
+  useEffect(() => {
+    if (!selectionKey) {
+      setState({ key: null, data: null, loading: false, error: null })
+      return
+    }
+
+    // Responses for a selection that is no longer current are dropped
+    let current = true
+    const currentSelection = JSON.parse(selectionKey) as HousingCostSelection
+    async function fetchResult() {
+      setState({ key: selectionKey, data: null, loading: true, error: null })
+      try {
+        const { data, error } = await supabase
+          .from('v_housing_cost_results' as never)
+          .select('*')
+          .match(currentSelection as never)
+          .maybeSingle()
+        if (error) throw error
+        if (current) {
+          setState({ key: selectionKey, data: data as HousingCostResult | null, loading: false, error: null })
+        }
+      } catch (err) {
+        if (current) {
+          setState({
+            key: selectionKey,
+            data: null,
+            loading: false,
+            error: err instanceof Error ? err.message : 'Unknown error',
+          })
+        }
+      }
+    }
+    fetchResult()
+    return () => {
+      current = false
+    }
+  }, [selectionKey])
+
+  // Until the effect for a new selection runs, don't expose the previous selection's state
+  if (state.key !== selectionKey) {
+    return { data: null, loading: selectionKey !== null, error: null }
+  }
+  return { data: state.data, loading: state.loading, error: state.error }
+}
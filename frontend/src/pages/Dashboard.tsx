@@ -14,13 +14,14 @@ import LifestyleSelector from '../components/LifestyleSelector'
 import UtilitySelector from '../components/UtilitySelector'
 import FinanceSelector from '../components/FinanceSelector'
 import RiskSelector from '../components/RiskSelector'
-import { useSummaryStats, useCostElements, useConsumptionFactors } from '../hooks/useData'
+import { useSummaryStats, useCostElements, useConsumptionFactors, useHousingCostResult } from '../hooks/useData'
+import { useModel } from '../contexts/ModelContext'
 import { useOccupancy } from '../contexts/OccupancyContext'
 import { useLifestyle } from '../contexts/LifestyleContext'
 import { useUtility } from '../contexts/UtilityContext'
 import { useFinance } from '../contexts/FinanceContext'
 import { useRisk } from '../contexts/RiskContext'
-import type { UtilityRateTier } from '../types/database'
+import type { ConsumptionFactor, UtilityRateTier } from '../types/database'
 
 // Extended color palette for stacked bars
 const STACKED_COLORS = [
@@ -29,6 +30,40 @@ const STACKED_COLORS = [
   '#22c55e', '#eab308', '#0ea5e9', '#d946ef', '#64748b', '#fb7185',
 ]
 
+type ActivitySpec = Pick<ConsumptionFactor, 'frequency_column' | 'multiplier_column' | 'applies_to' | 'frequency_unit'>
+
+// Seed activities' frequency columns (SEED_ACTIVITIES in loader/consumption_engine.py), for
+// rows from before the frequency_column / multiplier_column migration or with both NULL
+const SEED_ACTIVITIES: Record<string, ActivitySpec> = {
+  shower: { frequency_column: 'showers_per_week', multiplier_column: null, applies_to: 'per_person', frequency_unit: 'week' },
+  bath: { frequency_column: 'baths_per_week', multiplier_column: null, applies_to: 'per_person', frequency_unit: 'week' },
+  laundry_load: { frequency_column: 'laundry_loads_per_week', multiplier_column: null, applies_to: 'per_household', frequency_unit: 'week' },
+  dishwasher_load: { frequency_column: 'dishwasher_loads_per_week', multiplier_column: null, applies_to: 'per_household', frequency_unit: 'week' },
+  hand_dishes: { frequency_column: 'hand_wash_dishes_per_day', multiplier_column: null, applies_to: 'per_household', frequency_unit: 'day' },
+  toilet_flush: { frequency_column: 'toilet_flushes_per_day', multiplier_column: null, applies_to: 'per_person', frequency_unit: 'day' },
+  cooking_meal: { frequency_column: 'meals_cooked_per_day', multiplier_column: null, applies_to: 'per_household', frequency_unit: 'day' },
+  tv_hour: { frequency_column: 'tv_hours_per_day', multiplier_column: null, applies_to: 'per_household', frequency_unit: 'day' },
+  computer_hour: { frequency_column: 'computer_hours_per_day', multiplier_column: null, applies_to: 'per_adult', frequency_unit: 'day' },
+  lighting_hour: { frequency_column: 'lighting_hours_per_day', multiplier_column: null, applies_to: 'per_household', frequency_unit: 'day' },
+  refrigerator: { frequency_column: null, multiplier_column: null, applies_to: 'per_household', frequency_unit: 'month' },
+  water_heater_standby: { frequency_column: null, multiplier_column: null, applies_to: 'per_household', frequency_unit: 'month' },
+  hvac_heating: { frequency_column: null, multiplier_column: 'heating_multiplier', applies_to: 'per_household', frequency_unit: 'month' },
+  hvac_cooling: { frequency_column: null, multiplier_column: 'cooling_multiplier', applies_to: 'per_household', frequency_unit: 'month' },
+}
+
+// How often a factor row is used; other rows with neither column are flat monthly loads
+function activitySpec(factor: ConsumptionFactor): ActivitySpec {
+  if (!factor.frequency_column && !factor.multiplier_column && SEED_ACTIVITIES[factor.activity_code]) {
+    return SEED_ACTIVITIES[factor.activity_code]
+  }
+  return {
+    frequency_column: factor.frequency_column ?? null,
+    multiplier_column: factor.multiplier_column ?? null,
+    applies_to: factor.applies_to || 'per_household',
+    frequency_unit: factor.frequency_unit || 'month',
+  }
+}
+
 // Calculate tiered utility cost
 function calculateTieredCost(consumption: number, baseFee: number, rateTiers: UtilityRateTier[]): number {
   let totalCost = baseFee
@@ -99,6 +134,28 @@ export default function Dashboard() {
   const { selectedWaterModel, selectedSewerModel, selectedElectricModel, selectedGasModel } = useUtility()
   const { selectedFinanceModel } = useFinance()
   const { selectedRiskModel } = useRisk()
+  const { selectedModelId } = useModel()
+
+  // Precomputed cost row for the full selection (falls back to the in-browser calculation below)
+  const housingCostSelection = useMemo(() => {
+    if (!selectedModelId || !selectedOccupancyModel || !selectedLifestyleModel || !selectedWaterModel ||
+        !selectedSewerModel || !selectedElectricModel || !selectedGasModel || !selectedFinanceModel || !selectedRiskModel) {
+      return null
+    }
+    return {
+      scenario_id: selectedModelId,
+      occupancy_model_id: selectedOccupancyModel.id,
+      lifestyle_model_id: selectedLifestyleModel.id,
+      water_model_id: selectedWaterModel.id,
+      sewer_model_id: selectedSewerModel.id,
+      electric_model_id: selectedElectricModel.id,
+      gas_model_id: selectedGasModel.id,
+      finance_model_id: selectedFinanceModel.id,
+      risk_model_id: selectedRiskModel.id,
+    }
+  }, [selectedModelId, selectedOccupancyModel, selectedLifestyleModel, selectedWaterModel, selectedSewerModel,
+      selectedElectricModel, selectedGasModel, selectedFinanceModel, selectedRiskModel])
+  const { data: precomputedCost } = useHousingCostResult(housingCostSelection)
 
   // Home price from cost model (for mortgage calculation)
   const homePrice = useMemo(() => {
@@ -111,115 +168,35 @@ export default function Dashboard() {
       return { water: 0, electric: 0, gas: 0 }
     }
 
-    const occupants = selectedOccupancyModel.total_occupants
-    const adults = selectedOccupancyModel.adults
-    const lifestyle = selectedLifestyleModel
-
-    const getConsumption = (code: string) => consumptionFactors.find(f => f.activity_code === code)
+    // Each factor row says how often it is used (see consumption_factors.frequency_column)
+    const people: Record<ConsumptionFactor['applies_to'], number> = {
+      per_person: selectedOccupancyModel.total_occupants,
+      per_adult: selectedOccupancyModel.adults,
+      per_child: selectedOccupancyModel.children,
+      per_household: 1,
+    }
+    const periods: Record<ConsumptionFactor['frequency_unit'], number> = { day: 30, week: 4.33, month: 1 }
+    const lifestyle = selectedLifestyleModel as unknown as Record<string, number>
 
     let waterGallons = 0
     let electricKwh = 0
     let gasTherms = 0
 
-    // Showers
-    const shower = getConsumption('shower')
-    if (shower) {
-      const monthlyShowers = occupants * lifestyle.showers_per_week * 4.33
-      waterGallons += monthlyShowers * shower.water_gallons
-      electricKwh += monthlyShowers * shower.electric_kwh
-      gasTherms += monthlyShowers * shower.gas_therms
-    }
-
-    // Baths
-    const bath = getConsumption('bath')
-    if (bath) {
-      const monthlyBaths = occupants * lifestyle.baths_per_week * 4.33
-      waterGallons += monthlyBaths * bath.water_gallons
-      electricKwh += monthlyBaths * bath.electric_kwh
-      gasTherms += monthlyBaths * bath.gas_therms
-    }
-
-    // Laundry
-    const laundry = getConsumption('laundry_load')
-    if (laundry) {
-      const monthlyLoads = lifestyle.laundry_loads_per_week * 4.33
-      waterGallons += monthlyLoads * laundry.water_gallons
-      electricKwh += monthlyLoads * laundry.electric_kwh
-    }
-
-    // Dishwasher
-    const dishwasher = getConsumption('dishwasher_load')
-    if (dishwasher) {
-      const monthlyLoads = lifestyle.dishwasher_loads_per_week * 4.33
-      waterGallons += monthlyLoads * dishwasher.water_gallons
-      electricKwh += monthlyLoads * dishwasher.electric_kwh
-    }
-
-    // Hand dishes
-    const handDishes = getConsumption('hand_dishes')
-    if (handDishes) {
-      const monthlyTimes = lifestyle.hand_wash_dishes_per_day * 30
-      waterGallons += monthlyTimes * handDishes.water_gallons
-    }
-
-    // Toilet flushes
-    const toilet = getConsumption('toilet_flush')
-    if (toilet) {
-      const monthlyFlushes = occupants * lifestyle.toilet_flushes_per_day * 30
-      waterGallons += monthlyFlushes * toilet.water_gallons
-    }
-
-    // Cooking
-    const cooking = getConsumption('cooking_meal')
-    if (cooking) {
-      const monthlyMeals = lifestyle.meals_cooked_per_day * 30
-      waterGallons += monthlyMeals * cooking.water_gallons
-      electricKwh += monthlyMeals * cooking.electric_kwh
-      gasTherms += monthlyMeals * cooking.gas_therms
-    }
-
-    // TV
-    const tv = getConsumption('tv_hour')
-    if (tv) {
-      const monthlyHours = lifestyle.tv_hours_per_day * 30
-      electricKwh += monthlyHours * tv.electric_kwh
-    }
-
-    // Computer
-    const computer = getConsumption('computer_hour')
-    if (computer) {
-      const monthlyHours = adults * lifestyle.computer_hours_per_day * 30
-      electricKwh += monthlyHours * computer.electric_kwh
-    }
-
-    // Lighting
-    const lighting = getConsumption('lighting_hour')
-    if (lighting) {
-      const monthlyHours = lifestyle.lighting_hours_per_day * 30
-      electricKwh += monthlyHours * lighting.electric_kwh
-    }
-
-    // Base loads
-    const fridge = getConsumption('refrigerator')
-    if (fridge) {
-      electricKwh += fridge.electric_kwh
-    }
-
-    const waterHeater = getConsumption('water_heater_standby')
-    if (waterHeater) {
-      electricKwh += waterHeater.electric_kwh
-      gasTherms += waterHeater.gas_therms
-    }
-
-    const heating = getConsumption('hvac_heating')
-    if (heating) {
-      electricKwh += heating.electric_kwh * lifestyle.heating_multiplier
-      gasTherms += heating.gas_therms * lifestyle.heating_multiplier
-    }
-
-    const cooling = getConsumption('hvac_cooling')
-    if (cooling) {
-      electricKwh += cooling.electric_kwh * lifestyle.cooling_multiplier
+    for (const factor of consumptionFactors) {
+      const spec = activitySpec(factor)
+      let count = 1
+      if (spec.frequency_column) {
+        count = lifestyle[spec.frequency_column] ?? 0
+        if (spec.applies_to !== 'per_household') {
+          count = people[spec.applies_to] * count
+        }
+        count = count * periods[spec.frequency_unit]
+      } else if (spec.multiplier_column) {
+        count = lifestyle[spec.multiplier_column] ?? 1
+      }
+      waterGallons += count * (factor.water_gallons || 0)
+      electricKwh += count * (factor.electric_kwh || 0)
+      gasTherms += count * (factor.gas_therms || 0)
     }
 
     return {
@@ -326,10 +303,34 @@ export default function Dashboard() {
     )
   }, [homePrice, selectedFinanceModel, riskAdjustments.ratePremium])
 
-  // Total monthly housing cost (includes risk amortization)
-  const totalMonthlyHousingCost = useMemo(() => {
-    return mortgagePayment.total + utilityCosts.total + riskAdjustments.totalMonthlyImpact
-  }, [mortgagePayment, utilityCosts, riskAdjustments])
+  // Monthly cost shown on the page: the precomputed row for the selection (total and
+  // breakdown together), or the in-browser calculation when no row exists yet
+  const monthlyCosts = useMemo(() => {
+    if (precomputedCost) {
+      return {
+        utilities: {
+          water: precomputedCost.water_cost,
+          sewer: precomputedCost.sewer_cost,
+          electric: precomputedCost.electric_cost,
+          gas: precomputedCost.gas_cost,
+          total: precomputedCost.utility_total,
+        },
+        mortgage: {
+          principal: precomputedCost.mortgage_principal,
+          pmi: precomputedCost.mortgage_pmi,
+          total: precomputedCost.mortgage_total,
+        },
+        riskMonthly: precomputedCost.risk_monthly,
+        total: precomputedCost.total_monthly,
+      }
+    }
+    return {
+      utilities: utilityCosts,
+      mortgage: mortgagePayment,
+      riskMonthly: riskAdjustments.totalMonthlyImpact,
+      total: mortgagePayment.total + utilityCosts.total + riskAdjustments.totalMonthlyImpact,
+    }
+  }, [precomputedCost, mortgagePayment, utilityCosts, riskAdjustments])
 
   // Build cost elements (one-time)
   const buildCostElements = useMemo(() => {
@@ -593,29 +594,29 @@ export default function Dashboard() {
                 <span className="flex items-center text-sm text-gray-600">
                   <span className="w-6 text-center">💧</span> Water
                 </span>
-                <span className="font-medium">{formatCurrencyDetailed(utilityCosts.water)}</span>
+                <span className="font-medium">{formatCurrencyDetailed(monthlyCosts.utilities.water)}</span>
               </div>
               <div className="flex justify-between items-center">
                 <span className="flex items-center text-sm text-gray-600">
                   <span className="w-6 text-center">🚰</span> Sewer
                 </span>
-                <span className="font-medium">{formatCurrencyDetailed(utilityCosts.sewer)}</span>
+                <span className="font-medium">{formatCurrencyDetailed(monthlyCosts.utilities.sewer)}</span>
               </div>
               <div className="flex justify-between items-center">
                 <span className="flex items-center text-sm text-gray-600">
                   <span className="w-6 text-center">⚡</span> Electric
                 </span>
-                <span className="font-medium">{formatCurrencyDetailed(utilityCosts.electric)}</span>
+                <span className="font-medium">{formatCurrencyDetailed(monthlyCosts.utilities.electric)}</span>
               </div>
               <div className="flex justify-between items-center">
                 <span className="flex items-center text-sm text-gray-600">
                   <span className="w-6 text-center">🔥</span> Gas
                 </span>
-                <span className="font-medium">{formatCurrencyDetailed(utilityCosts.gas)}</span>
+                <span className="font-medium">{formatCurrencyDetailed(monthlyCosts.utilities.gas)}</span>
               </div>
               <div className="border-t pt-2 flex justify-between items-center">
                 <span className="text-sm font-medium text-gray-700">Total Utilities</span>
-                <span className="text-lg font-bold text-cyan-600">{formatCurrencyDetailed(utilityCosts.total)}</span>
+                <span className="text-lg font-bold text-cyan-600">{formatCurrencyDetailed(monthlyCosts.utilities.total)}</span>
               </div>
             </div>
             <div className="mt-3 text-xs text-gray-500">
@@ -637,17 +638,17 @@ export default function Dashboard() {
               <div className="space-y-3">
                 <div className="flex justify-between items-center">
                   <span className="text-sm text-gray-600">Principal & Interest</span>
-                  <span className="font-medium">{formatCurrencyDetailed(mortgagePayment.principal)}</span>
+                  <span className="font-medium">{formatCurrencyDetailed(monthlyCosts.mortgage.principal)}</span>
                 </div>
-                {mortgagePayment.pmi > 0 && (
+                {monthlyCosts.mortgage.pmi > 0 && (
                   <div className="flex justify-between items-center">
                     <span className="text-sm text-gray-600">PMI</span>
-                    <span className="font-medium text-amber-600">{formatCurrencyDetailed(mortgagePayment.pmi)}</span>
+                    <span className="font-medium text-amber-600">{formatCurrencyDetailed(monthlyCosts.mortgage.pmi)}</span>
                   </div>
                 )}
                 <div className="border-t pt-2 flex justify-between items-center">
                   <span className="text-sm font-medium text-gray-700">Total Mortgage</span>
-                  <span className="text-lg font-bold text-purple-600">{formatCurrencyDetailed(mortgagePayment.total)}</span>
+                  <span className="text-lg font-bold text-purple-600">{formatCurrencyDetailed(monthlyCosts.mortgage.total)}</span>
                 </div>
               </div>
             )}
@@ -666,23 +667,23 @@ export default function Dashboard() {
             </h3>
             <div className="text-center py-4">
               <p className="text-4xl font-bold text-green-600">
-                {formatCurrency(totalMonthlyHousingCost)}
+                {formatCurrency(monthlyCosts.total)}
               </p>
               <p className="text-sm text-green-700 mt-2">per month</p>
             </div>
             <div className="border-t border-green-200 pt-3 space-y-1 text-sm">
               <div className="flex justify-between text-gray-600">
                 <span>Mortgage + PMI</span>
-                <span>{formatCurrency(mortgagePayment.total)}</span>
+                <span>{formatCurrency(monthlyCosts.mortgage.total)}</span>
               </div>
               <div className="flex justify-between text-gray-600">
                 <span>Utilities</span>
-                <span>{formatCurrency(utilityCosts.total)}</span>
+                <span>{formatCurrency(monthlyCosts.utilities.total)}</span>
               </div>
-              {riskAdjustments.totalMonthlyImpact > 0 && (
+              {monthlyCosts.riskMonthly > 0 && (
                 <div className="flex justify-between text-red-600">
                   <span>Risk Costs</span>
-                  <span>+{formatCurrency(riskAdjustments.totalMonthlyImpact)}</span>
+                  <span>+{formatCurrency(monthlyCosts.riskMonthly)}</span>
                 </div>
               )}
             </div>
@@ -852,8 +853,8 @@ export default function Dashboard() {
                   <div>
                     <p className="text-gray-500 mb-1">Risk</p>
                     <p className="font-medium">{selectedRiskModel?.name || '-'}</p>
-                    {riskAdjustments.totalMonthlyImpact > 0 && (
-                      <p className="text-xs text-red-600 mt-0.5">+{formatCurrencyDetailed(riskAdjustments.totalMonthlyImpact)}/mo impact</p>
+                    {monthlyCosts.riskMonthly > 0 && (
+                      <p className="text-xs text-red-600 mt-0.5">+{formatCurrencyDetailed(monthlyCosts.riskMonthly)}/mo impact</p>
                     )}
                   </div>
                   <div className="border-t pt-3">
@@ -565,6 +565,8 @@ export interface ConsumptionFactor {
   gas_therms: number
   applies_to: 'per_person' | 'per_household' | 'per_adult' | 'per_child'
   frequency_unit: 'day' | 'week' | 'month'
+  frequency_column?: string | null   // lifestyle_models column with uses per frequency_unit (null = flat monthly load; absent before the migration)
+  multiplier_column?: string | null  // lifestyle_models column scaling a flat load
   notes: string | null
   sort_order: number | null
   created_at: string
@@ -652,3 +654,30 @@ export interface MortgagePaymentResult {
   closing_costs: number
   total_cash_needed: number
 }
+
+// Precomputed monthly housing cost for one model combination (v_housing_cost_results)
+export interface HousingCostSelection {
+  scenario_id: string
+  occupancy_model_id: string
+  lifestyle_model_id: string
+  water_model_id: string
+  sewer_model_id: string
+  electric_model_id: string
+  gas_model_id: string
+  finance_model_id: string
+  risk_model_id: string
+}
+
+export interface HousingCostResult extends HousingCostSelection {
+  total_monthly: number
+  mortgage_principal: number
+  mortgage_pmi: number
+  mortgage_total: number
+  water_cost: number
+  sewer_cost: number
+  electric_cost: number
+  gas_cost: number
+  utility_total: number
+  risk_monthly: number
+  calculated_at: string
+}
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Affordability: the housing cost chain run backwards.
+
+housing_cost_engine.py goes from a home price (total_onetime_costs) to a
+monthly cost. Here the monthly budget is fixed (income x payment-to-income
+cap) and the unknown is the highest home price each model combination can
+carry:
+    occupancy x lifestyle x water x sewer x electric x gas x finance x risk
+
+Every price-dependent term of the chain is linear in the home price:
+mortgage P&I and PMI scale with the loan (price x (1 - down payment)),
+and the R1-R4 risk costs with the price; utilities don't depend on it. So
+    monthly(H) = slope[finance, risk] * H + utilities[o, l, w, s, e, g]
+and the largest affordable price is a closed form for the whole table:
+    H* = (budget - utilities) / slope
+optionally capped by cash on hand (down payment + closing costs <= savings).
+
+bisect_max_price() is a vectorized bisection for cost functions that are
+not linear in the price (e.g. with extra price-dependent terms); the
+benchmark uses it against the forward calculation to check the closed form.
+
+No Supabase dependency; see affordability_table() in
+calculate_housing_costs.py for the database-backed entry point.
+
+    python affordability_engine.py --benchmark
+"""
+
+import time
+
+import numpy as np
+
+import housing_cost_engine as housing
+
+# Housing cost burden threshold (share of gross income)
+PAYMENT_TO_INCOME_CAP = 0.30
+
+# Axes of the affordability table (the housing cube without the scenario)
+TABLE_AXES = housing.AXES[1:]
+
+
+def monthly_budget(annual_income, cap: float = PAYMENT_TO_INCOME_CAP) -> np.ndarray:
+    """Monthly housing budget for a gross annual income."""
+    return np.asarray(annual_income, dtype=np.float64) * cap / 12
+
+
+def price_slopes(finance: list[dict], risk: list[dict]) -> np.ndarray:
+    """
+    Monthly cost per dollar of home price (mortgage + PMI + risk impact),
+    from the forward engine at a price of $1.
+
+    Returns:
+        (finance, risk) float64 array
+    """
+    fin, risk_cols = housing.finance_arrays(finance), housing.risk_arrays(risk)
+    unit = np.ones(1)
+    adjustments = housing.risk_adjustments(unit, fin, risk_cols)
+    mortgage = housing.mortgage_payments(unit, fin, adjustments['rate_premium'])
+    return (mortgage['total'] + adjustments['monthly_impact'])[0]
+
+
+def cash_limits(finance: list[dict], savings) -> np.ndarray:
+    """
+    Highest price whose down payment plus closing costs fit in savings.
+
+    Returns:
+        (finance,) float64 array (inf where nothing is due up front)
+    """
+    fin = housing.finance_arrays(finance)
+    upfront = fin['down_payment'] + housing._column(finance, 'closing_cost_percent')
+    with np.errstate(divide='ignore'):
+        return np.where(upfront > 0, float(savings) / upfront, np.inf)
+
+
+def max_affordable_prices(budget, occupancy: list[dict], lifestyle: list[dict], factors: list[dict],
+                          utilities: dict, finance: list[dict], risk: list[dict], savings=None) -> dict:
+    """
+    Largest affordable home price for every model combination.
+
+    Args:
+        budget: Monthly housing budget (scalar, or (budgets,) for several incomes)
+        occupancy, lifestyle, factors, utilities, finance, risk: Model rows
+            (see housing_cost_engine.monthly_housing_costs())
+        savings: Optional cash for down payment + closing costs
+
+    Returns:
+        {
+            'shape': table shape in TABLE_AXES order (with a leading budget axis for array budgets),
+            'max_price': table of prices (0 where utilities alone exceed the budget),
+            'cash_bound': bool table, True where savings set the price (None without savings),
+            'utility_total': (occupancy, lifestyle, water, sewer, electric, gas),
+            'slope': (finance, risk) monthly cost per dollar of price,
+            'budget': budget array
+        }
+    """
+    consumption = housing.monthly_consumption(occupancy, lifestyle, factors)
+    _, utility_total = housing.utility_totals(consumption, utilities)
+    slope = price_slopes(finance, risk)
+
+    budget = np.asarray(budget, dtype=np.float64)
+    headroom = budget.reshape(budget.shape + (1,) * 8) - utility_total[..., None, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price = np.where(slope > 0, headroom / slope, np.inf)
+    price = np.where(headroom > 0, price, 0.0)
+
+    cash_bound = None
+    if savings is not None:
+        cash = cash_limits(finance, savings)[:, None]
+        cash_bound = cash < price
+        price = np.minimum(price, cash)
+
+    return {
+        'shape': price.shape,
+        'max_price': price,
+        'cash_bound': cash_bound,
+        'utility_total': utility_total,
+        'slope': slope,
+        'budget': budget,
+    }
+
+
+def affordable_share(result: dict, home_prices) -> np.ndarray:
+    """
+    Share of model combinations that can carry each home price.
+
+    Returns:
+        (prices,) or (budgets, prices) float64 array
+    """
+    prices = np.asarray(home_prices, dtype=np.float64)
+    table = result['max_price'].reshape(result['budget'].shape + (-1,))
+    return (table[..., None] >= prices).mean(axis=-2)
+
+
+# ============================================================
+# Bisection
+# ============================================================
+
+def bisect_max_price(cost_fn, budget, lo, hi, tol: float = 0.01, max_iter: int = 100) -> np.ndarray:
+    """
+    Largest price with cost_fn(price) <= budget, element-wise, for a cost
+    increasing in price.
+
+    Args:
+        cost_fn: Maps a price array to a monthly cost array of the same shape
+        budget: Monthly budget (broadcasts against lo / hi)
+        lo, hi: Bracket; lo must be affordable (hi may be)
+        tol: Stop when every bracket is narrower than this (dollars)
+
+    Returns:
+        Prices (hi where hi itself is affordable)
+    """
+    lo, hi = np.broadcast_arrays(np.asarray(lo, dtype=np.float64), np.asarray(hi, dtype=np.float64))
+    lo, hi = lo.copy(), hi.copy()
+    budget = np.broadcast_to(np.asarray(budget, dtype=np.float64), lo.shape)
+    at_hi = cost_fn(hi) <= budget
+    for _ in range(max_iter):
+        if np.all(hi - lo <= tol):
+            break
+        mid = (lo + hi) / 2
+        ok = cost_fn(mid) <= budget
+        lo = np.where(ok, mid, lo)
+        hi = np.where(ok, hi, mid)
+    return np.where(at_hi, hi, lo)
+
+
+def cell_costs(prices, cells: tuple, utility_total: np.ndarray, finance: list[dict], risk: list[dict]) -> np.ndarray:
+    """
+    Forward monthly cost of chosen table cells at chosen prices, through
+    the housing engine's mortgage and risk functions.
+
+    Args:
+        prices: (cells,) home prices
+        cells: TABLE_AXES index arrays, each (cells,)
+        utility_total: From max_affordable_prices()
+    """
+    o, l, w, s, e, g, f, r = cells
+    fin, risk_cols = housing.finance_arrays(finance), housing.risk_arrays(risk)
+    prices = np.asarray(prices, dtype=np.float64)
+    adjustments = housing.risk_adjustments(prices, fin, risk_cols)
+    mortgage = housing.mortgage_payments(prices, fin, adjustments['rate_premium'])
+    rows = np.arange(len(prices))
+    return (mortgage['total'][rows, f, r] + utility_total[o, l, w, s, e, g]) + adjustments['monthly_impact'][rows, f, r]
+
+
+# ============================================================
+# Benchmark
+# ============================================================
+
+def benchmark(sizes: dict = None, income: float = 76_800, n_checks: int = 2000, seed: int = 0) -> dict:
+    """Closed-form table over synthetic models; a sample re-solved by bisection on the forward chain."""
+    sizes = sizes or {'scenario': 1, 'occupancy': 10, 'lifestyle': 10, 'water': 6, 'sewer': 6, 'electric': 6,
+                      'gas': 6, 'finance': 10, 'risk': 10}
+    models = housing.synthetic_models(sizes, seed)
+    args = (models['occupancy'], models['lifestyle'], models['factors'], models['utilities'], models['finance'], models['risk'])
+    budget = monthly_budget(income)
+
+    start = time.perf_counter()
+    result = max_affordable_prices(budget, *args)
+    seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    positions = rng.integers(0, result['max_price'].size, n_checks)
+    cells = np.unravel_index(positions, result['shape'])
+    closed = result['max_price'].ravel()[positions]
+
+    start = time.perf_counter()
+    cost = lambda prices: cell_costs(prices, cells, result['utility_total'], models['finance'], models['risk'])
+    bisected = bisect_max_price(cost, budget, np.zeros(n_checks), np.full(n_checks, 5e6))
+    bisect_seconds = time.perf_counter() - start
+
+    finite = np.isfinite(closed) & (closed > 0)
+    return {
+        'combinations': result['max_price'].size,
+        'seconds': seconds,
+        'bisect_seconds': bisect_seconds,
+        'checked': int(finite.sum()),
+        'max_price_diff': float(np.max(np.abs(closed[finite] - bisected[finite]), initial=0.0)),
+        'max_budget_error': float(np.max(np.abs(cost(np.where(finite, closed, 0.0))[finite] - budget), initial=0.0)),
+        'median_max_price': float(np.median(result['max_price'])),
+        'unaffordable': int((result['max_price'] == 0).sum()),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Maximum affordable home price per model combination')
+    parser.add_argument('--benchmark', action='store_true', help='Solve a synthetic affordability table')
+    parser.add_argument('--income', type=float, default=76_800, help='Gross annual household income')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+    else:
+        stats = benchmark(income=args.income)
+        print(f"Combinations:        {stats['combinations']:>12,}")
+        print(f"Closed form:         {stats['seconds']:>12.3f} s")
+        print(f"Checked vs bisection: {stats['checked']:,} cells ({stats['bisect_seconds']:.2f} s), "
+              f"max price difference ${stats['max_price_diff']:.4f}, "
+              f"cost at H* within ${stats['max_budget_error']:.2e} of budget")
+        print(f"Median max price:    ${stats['median_max_price']:>11,.0f}  ({stats['unaffordable']:,} unaffordable)")
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Vectorized mortgage amortization.
+
+calculate_mortgage_payment() (SQL) and calculateMortgagePayment()
+(Dashboard) return one level monthly payment. F01-Principal and
+F02-Interest need how that payment splits over the life of the loan, and
+PMI drop-off needs the running balance. Everything here is closed form,
+so schedules for many loans are (loans x months) array expressions with
+no month-by-month loop:
+    g = 1 + i                                   (i = annual_rate / 12)
+    payment  M   = P * (i * g^n) / (g^n - 1)
+    balance  B_k = P * g^k - M * (g^k - 1) / i
+    cumulative interest after k payments = k * M - (P - B_k)
+    PMI ends once B_k <= PMI_LTV_CUTOFF * home value:
+        k* = ceil(log((M/i - L) / (M/i - P)) / log(g)),  L = cutoff balance
+
+Payments are unrounded (the value calculate_mortgage_payment() rounds
+for display). Loans with a 0 term or 0 rate are cash purchases and pay
+nothing, as in the SQL and the Dashboard. PMI (loan * pmi_rate / 12) is
+charged while the opening balance is above the cutoff, for loans whose
+down payment is below the finance model's pmi_threshold.
+
+annual_split() gives the per-year principal / interest / PMI totals from
+year-boundary balances only, without building monthly arrays; schedule()
+builds the monthly arrays for just the fields asked for, in month chunks.
+
+No Supabase dependency.
+
+    python amortization_engine.py --benchmark --loans 10000
+"""
+
+import time
+
+import numpy as np
+
+# Loan-to-original-value at which PMI terminates automatically
+PMI_LTV_CUTOFF = 0.78
+
+SCHEDULE_FIELDS = ('payment', 'interest', 'principal', 'balance', 'cumulative_interest', 'pmi')
+
+
+def _array(values, shape=None) -> np.ndarray:
+    values = np.asarray(values, dtype=np.float64)
+    return values if shape is None else np.broadcast_to(values, shape)
+
+
+def loan_arrays(principal, annual_rate, term_years, home_value=None, pmi_rate=0.0, pmi_applies=False) -> dict:
+    """
+    Column arrays for a batch of loans (inputs broadcast to one shape, then flattened).
+
+    Args:
+        principal: Loan amounts
+        annual_rate: Nominal annual rates (decimal)
+        term_years: Loan terms in years
+        home_value: Original property value for the LTV cutoff (defaults to principal)
+        pmi_rate: Annual PMI rate on the original loan amount
+        pmi_applies: Whether each loan carries PMI
+
+    Returns:
+        {'shape', 'principal', 'monthly_rate', 'n_payments', 'home_value', 'pmi_monthly'}
+    """
+    home_value = principal if home_value is None else home_value
+    shape = np.broadcast_shapes(*(np.shape(v) for v in (principal, annual_rate, term_years, home_value, pmi_rate, pmi_applies)))
+    rate = _array(annual_rate, shape).ravel()
+    n_payments = np.rint(_array(term_years, shape).ravel() * 12).astype(np.int64)
+
+    # Cash purchases: no loan
+    financed = (n_payments != 0) & (rate != 0)
+    loan = np.where(financed, _array(principal, shape).ravel(), 0.0)
+    pmi = np.where(np.broadcast_to(np.asarray(pmi_applies, dtype=bool), shape).ravel(),
+                   (loan * _array(pmi_rate, shape).ravel()) / 12, 0.0)
+    return {
+        'shape': shape,
+        'principal': loan,
+        'monthly_rate': np.where(financed, rate / 12, 0.0),
+        'n_payments': np.where(financed, n_payments, 0),
+        'home_value': _array(home_value, shape).ravel().copy(),
+        'pmi_monthly': pmi,
+    }
+
+
+def finance_loans(home_prices, finance: list[dict], rate_premium=0.0) -> dict:
+    """
+    Loans for every (home price, occupant finance model) pair, as the
+    Dashboard sets them up: loan = price * (1 - down_payment_percent).
+
+    Args:
+        home_prices: (prices,) purchase prices
+        finance: occupant_finance_models rows
+        rate_premium: Added to each model's annual rate (e.g. risk premium)
+
+    Returns:
+        loan_arrays() output with shape (prices, finance models)
+    """
+    column = lambda key: np.array([0.0 if row.get(key) is None else float(row[key]) for row in finance])
+    price = np.asarray(home_prices, dtype=np.float64)[:, None]
+    down = column('down_payment_percent')[None, :]
+    return loan_arrays(
+        principal=price * (1 - down),
+        annual_rate=column('annual_interest_rate')[None, :] + rate_premium,
+        term_years=column('loan_term_years')[None, :],
+        home_value=price,
+        pmi_rate=column('pmi_rate')[None, :],
+        pmi_applies=(down < column('pmi_threshold')[None, :]) & (column('pmi_rate')[None, :] > 0),
+    )
+
+
+# ============================================================
+# Closed forms
+# ============================================================
+
+def monthly_payment(loans: dict) -> np.ndarray:
+    """Level monthly P&I (Dashboard / SQL formula and operation order)."""
+    growth = np.power(1 + loans['monthly_rate'], loans['n_payments'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        payment = loans['principal'] * (loans['monthly_rate'] * growth) / (growth - 1)
+    return np.where(loans['n_payments'] > 0, payment, 0.0)
+
+
+def balance_after(loans: dict, k, payment: np.ndarray = None) -> np.ndarray:
+    """
+    Balance after k payments; k broadcasts against the loan axis, e.g.
+    k[None, :] for a (loans, months) result. Clamped to [0, principal].
+    """
+    payment = monthly_payment(loans) if payment is None else payment
+    k = np.minimum(np.asarray(k), loans['n_payments'].reshape((-1,) + (1,) * (np.ndim(k) - 1)))
+    extra = (1,) * (np.ndim(k) - 1)
+    principal, rate, payment = (a.reshape((-1,) + extra) for a in (loans['principal'], loans['monthly_rate'], payment))
+    growth = np.power(1 + rate, k)
+    safe_rate = np.where(rate > 0, rate, 1.0)
+    balance = principal * growth - payment * (growth - 1) / safe_rate
+    return np.clip(np.where(rate > 0, balance, 0.0), 0.0, principal)
+
+
+def pmi_months(loans: dict, payment: np.ndarray = None) -> np.ndarray:
+    """
+    Number of monthly PMI charges: months whose opening balance is above
+    PMI_LTV_CUTOFF * home value (0 for loans without PMI).
+    """
+    payment = monthly_payment(loans) if payment is None else payment
+    rate, principal = loans['monthly_rate'], loans['principal']
+    cutoff = PMI_LTV_CUTOFF * loans['home_value']
+    has_pmi = (loans['pmi_monthly'] > 0) & (principal > cutoff)
+
+    safe_rate = np.where(rate > 0, rate, 1.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = (payment / safe_rate - cutoff) / (payment / safe_rate - principal)
+        k = np.ceil(np.log(ratio) / np.log1p(rate))
+    k = np.where(has_pmi & np.isfinite(k), k, 0).astype(np.int64)
+    k = np.clip(k, 0, loans['n_payments'])
+
+    # Settle floating-point ties at the boundary against the balance itself
+    k = np.where(has_pmi & (k > 1) & (balance_after(loans, k - 1, payment) <= cutoff), k - 1, k)
+    k = np.where(has_pmi & (k < loans['n_payments']) & (balance_after(loans, k, payment) > cutoff), k + 1, k)
+    return np.where(has_pmi, k, 0)
+
+
+def loan_summary(loans: dict) -> dict:
+    """
+    Lifetime figures per loan.
+
+    Returns:
+        {'payment', 'total_interest', 'pmi_months', 'total_pmi'}
+        (pmi_months is also the 1-based month of the last PMI charge)
+    """
+    payment = monthly_payment(loans)
+    months = pmi_months(loans, payment)
+    return {
+        'payment': payment,
+        'total_interest': np.maximum(loans['n_payments'] * payment - loans['principal'], 0.0),
+        'pmi_months': months,
+        'total_pmi': months * loans['pmi_monthly'],
+    }
+
+
+# ============================================================
+# Schedules
+# ============================================================
+
+def annual_split(loans: dict, years: int = None) -> dict:
+    """
+    Per-year principal (F01), interest (F02) and PMI for every loan, from
+    year-boundary balances only.
+
+    Returns:
+        {'principal', 'interest', 'pmi', 'balance': (loans, years) float64}
+        (balance at each year end)
+    """
+    payment = monthly_payment(loans)
+    years = years or int(np.ceil(loans['n_payments'].max(initial=0) / 12))
+    boundaries = np.arange(years + 1) * 12
+    balance = balance_after(loans, boundaries[None, :], payment)
+    paid_months = np.clip(boundaries[None, :], 0, loans['n_payments'][:, None])
+    payments_in_year = np.diff(paid_months, axis=1) * payment[:, None]
+    principal = balance[:, :-1] - balance[:, 1:]
+    pmi_paid = np.clip(boundaries[None, :], 0, pmi_months(loans, payment)[:, None])
+    return {
+        'principal': principal,
+        'interest': payments_in_year - principal,
+        'pmi': np.diff(pmi_paid, axis=1) * loans['pmi_monthly'][:, None],
+        'balance': balance[:, 1:],
+    }
+
+
+def schedule(loans: dict, fields=SCHEDULE_FIELDS, months: int = None, dtype=np.float64, chunk: int = 60) -> dict:
+    """
+    Monthly amortization arrays for the requested fields.
+
+    Args:
+        loans: Output of loan_arrays() / finance_loans()
+        fields: Subset of SCHEDULE_FIELDS to build
+        months: Schedule length (defaults to the longest term)
+        dtype: Output dtype (float32 halves memory; values are computed in float64)
+        chunk: Months computed per pass, bounding float64 temporaries
+
+    Returns:
+        {field: (loans, months) array}; column m is payment month m + 1
+    """
+    unknown = set(fields) - set(SCHEDULE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown schedule fields: {sorted(unknown)}")
+    payment = monthly_payment(loans)
+    months = months or int(loans['n_payments'].max(initial=0))
+    n_pmi = pmi_months(loans, payment) if 'pmi' in fields else None
+    out = {field: np.empty((len(payment), months), dtype=dtype) for field in fields}
+
+    for lo in range(0, months, chunk):
+        k = np.arange(lo + 1, min(lo + chunk, months) + 1)
+        active = k[None, :] <= loans['n_payments'][:, None]
+        opening = balance_after(loans, k[None, :] - 1, payment)
+        closing = balance_after(loans, k[None, :], payment)
+        interest = np.where(active, opening * loans['monthly_rate'][:, None], 0.0)
+        values = {
+            'payment': np.where(active, payment[:, None], 0.0),
+            'interest': interest,
+            'principal': opening - closing,
+            'balance': closing,
+            'cumulative_interest': np.minimum(k[None, :], loans['n_payments'][:, None]) * payment[:, None]
+                                   - (loans['principal'][:, None] - closing),
+            'pmi': np.where(k[None, :] <= n_pmi[:, None], loans['pmi_monthly'][:, None], 0.0) if n_pmi is not None else None,
+        }
+        for field in fields:
+            out[field][:, lo:lo + len(k)] = values[field]
+    return out
+
+
+# ============================================================
+# Reference and benchmark
+# ============================================================
+
+def reference_schedule(principal: float, annual_rate: float, term_years: float, home_value: float,
+                       pmi_monthly: float) -> dict:
+    """Month-by-month loop (balance carried forward), used to check the closed forms."""
+    n, i = int(round(term_years * 12)), annual_rate / 12
+    if n == 0 or i == 0:
+        return {'payment': 0.0, 'balance': [], 'interest': [], 'pmi_months': 0}
+    payment = principal * (i * (1 + i) ** n) / ((1 + i) ** n - 1)
+    balance, balances, interest, n_pmi = principal, [], [], 0
+    for _ in range(n):
+        if pmi_monthly > 0 and balance > PMI_LTV_CUTOFF * home_value:
+            n_pmi += 1
+        interest.append(balance * i)
+        balance = balance + balance * i - payment
+        balances.append(max(balance, 0.0))
+    return {'payment': payment, 'balance': balances, 'interest': interest, 'pmi_months': n_pmi}
+
+
+def synthetic_loans(n_loans: int, seed: int = 0) -> dict:
+    """Random loans shaped like the occupant finance presets."""
+    rng = np.random.default_rng(seed)
+    price = rng.uniform(250_000, 800_000, n_loans)
+    down = rng.choice([0.035, 0.05, 0.1, 0.15, 0.2, 0.25], n_loans)
+    return loan_arrays(
+        principal=price * (1 - down),
+        annual_rate=rng.uniform(0.03, 0.09, n_loans),
+        term_years=rng.choice([15, 20, 30], n_loans, p=[0.2, 0.1, 0.7]),
+        home_value=price,
+        pmi_rate=rng.uniform(0.003, 0.012, n_loans),
+        pmi_applies=down < 0.2,
+    )
+
+
+def benchmark(n_loans: int = 10_000, n_checks: int = 200, seed: int = 0) -> dict:
+    """Full monthly schedules and annual splits for synthetic loans; sample checked against the loop."""
+    loans = synthetic_loans(n_loans, seed)
+
+    start = time.perf_counter()
+    full = schedule(loans)
+    schedule_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    annual = annual_split(loans)
+    summary = loan_summary(loans)
+    annual_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    worst_balance = worst_interest = 0.0
+    pmi_mismatches = 0
+    for j in rng.integers(0, n_loans, n_checks).tolist():
+        n = int(loans['n_payments'][j])
+        ref = reference_schedule(float(loans['principal'][j]), float(loans['monthly_rate'][j] * 12), n / 12,
+                                 float(loans['home_value'][j]), float(loans['pmi_monthly'][j]))
+        worst_balance = max(worst_balance, float(np.max(np.abs(full['balance'][j, :n] - ref['balance']))))
+        worst_interest = max(worst_interest, float(np.max(np.abs(full['interest'][j, :n] - ref['interest']))))
+        pmi_mismatches += int(summary['pmi_months'][j] != ref['pmi_months'])
+
+    return {
+        'loans': n_loans,
+        'months': full['balance'].shape[1],
+        'schedule_seconds': schedule_seconds,
+        'schedule_mb': sum(a.nbytes for a in full.values()) / 1e6,
+        'annual_seconds': annual_seconds,
+        'annual_mb': sum(a.nbytes for a in annual.values()) / 1e6,
+        'checked': n_checks,
+        'max_balance_error': worst_balance,
+        'max_interest_error': worst_interest,
+        'pmi_mismatches': pmi_mismatches,
+        'split_error': float(np.max(np.abs(annual['principal'].sum(axis=1) - loans['principal']))),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Vectorized mortgage amortization')
+    parser.add_argument('--benchmark', action='store_true', help='Amortize synthetic loans')
+    parser.add_argument('--loans', type=int, default=10_000, help='Number of synthetic loans')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+    else:
+        stats = benchmark(args.loans)
+        print(f"Loans x months:      {stats['loans']:,} x {stats['months']}")
+        print(f"Monthly schedules:   {stats['schedule_seconds']:.3f} s, {stats['schedule_mb']:,.0f} MB "
+              f"({len(SCHEDULE_FIELDS)} fields, float64)")
+        print(f"Annual split + PMI:  {stats['annual_seconds']:.3f} s, {stats['annual_mb']:,.1f} MB")
+        print(f"Checked vs loop:     {stats['checked']} loans, max balance error ${stats['max_balance_error']:.2e}, "
+              f"max interest error ${stats['max_interest_error']:.2e}, {stats['pmi_mismatches']} PMI end months differ")
+        print(f"Principal repaid vs loan amount: max difference ${stats['split_error']:.2e}")
@@ -0,0 +1,1127 @@
+#!/usr/bin/env python3
+"""
+Calculate carrying costs (cost of capital) for a cost/time model.
+
+This module computes the time-value-of-money cost based on:
+1. When costs were paid (from cost_entries)
+2. Cost of capital rates by phase (from finance_assumptions)
+
+The calculation:
+- For each cost entry, track cumulative spend
+- Calculate carrying cost from payment date to project end
+- Apply phase-specific rates with annual compounding (or the phase's
+  simple/monthly/daily/continuous compounding convention)
+
+The per-entry math lives in carrying_cost_engine.py (vectorized, no Supabase).
+"""
+
+import csv
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Optional
+from dotenv import load_dotenv
+from postgrest.exceptions import APIError
+from supabase import create_client, Client
+import numpy as np
+
+import carrying_cost_cache as cache
+import carrying_cost_engine as engine
+import carrying_cost_montecarlo as montecarlo
+import carrying_cost_incremental as incremental
+import construction_loan_engine as construction_loan
+import money
+import developer_return_engine as returns
+import risk_engine as risk_pricing
+from carrying_cost_engine import calculate_carrying_cost
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+
+supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+
+
+# Supabase returns at most this many rows per request
+PAGE_SIZE = 1000
+# Values per .in_() filter, so the request URL stays short
+IN_CHUNK = 200
+
+
+def fetch_all_rows(table: str, columns: str = '*', order: str = 'id') -> list:
+    """Read every row of a table or view, PAGE_SIZE rows per request."""
+    rows = []
+    while True:
+        result = supabase.table(table).select(columns).order(order).range(
+            len(rows), len(rows) + PAGE_SIZE - 1
+        ).execute()
+        rows.extend(result.data)
+        if len(result.data) < PAGE_SIZE:
+            return rows
+
+
+def fetch_rows_in(table: str, column: str, values: list, columns: str = '*', order: str = 'id') -> list:
+    """
+    Read every row whose column is in values: IN_CHUNK values per .in_()
+    filter, PAGE_SIZE rows per request.
+    """
+    rows = []
+    for lo in range(0, len(values), IN_CHUNK):
+        chunk = list(values[lo:lo + IN_CHUNK])
+        page = []
+        while True:
+            result = supabase.table(table).select(columns).in_(column, chunk).order(order).range(
+                len(page), len(page) + PAGE_SIZE - 1
+            ).execute()
+            page.extend(result.data)
+            if len(result.data) < PAGE_SIZE:
+                break
+        rows.extend(page)
+    return rows
+
+
+def build_rates(assumption_rows: list, default_annual_rate=None) -> dict:
+    """
+    Build the phase rate lookup from finance_assumptions rows.
+    Returns dict: {phase: {'rate': Decimal, 'compound': bool, 'compounding': str|None}}
+
+    Rows with effective_from / effective_to become dated rate segments,
+    {'segments': [{'from': date|None, 'to': date|None, 'rate': Decimal}]},
+    on top of the phase's undated row (or the default rate if it has none).
+    """
+    rates = {}
+    default_rate = Decimal('0.08')  # Fallback
+
+    if default_annual_rate:
+        default_rate = Decimal(str(default_annual_rate))
+
+    dated_rows = []
+    for row in assumption_rows:
+        if row.get('effective_from') or row.get('effective_to'):
+            dated_rows.append(row)
+            continue
+        rates[row['phase']] = {
+            'rate': Decimal(str(row['annual_rate'])),
+            'compound': row['compound_annually'],
+            'compounding': row.get('compounding')
+        }
+
+    # Time-varying rates within a phase
+    for row in sorted(dated_rows, key=lambda r: str(r.get('effective_from') or '')):
+        info = rates.setdefault(row['phase'], {
+            'rate': default_rate,
+            'compound': row['compound_annually'],
+            'compounding': row.get('compounding')
+        })
+        info.setdefault('segments', []).append({
+            'from': date.fromisoformat(str(row['effective_from'])) if row.get('effective_from') else None,
+            'to': date.fromisoformat(str(row['effective_to'])) if row.get('effective_to') else None,
+            'rate': Decimal(str(row['annual_rate']))
+        })
+
+    # Add default for any missing phases
+    rates['_default'] = {'rate': default_rate, 'compound': True}
+
+    return rates
+
+
+def get_finance_rates(finance_model_id: str) -> dict:
+    """
+    Get cost of capital rates by phase for a finance model.
+    Returns dict: {phase: {'rate': Decimal, 'compound': bool}}
+    """
+    result = supabase.table('finance_assumptions').select('*').eq(
+        'finance_model_id', finance_model_id
+    ).execute()
+
+    # Get default rate from model
+    model_result = supabase.table('finance_models').select('default_annual_rate').eq(
+        'id', finance_model_id
+    ).execute()
+    default_rate = model_result.data[0]['default_annual_rate'] if model_result.data else None
+
+    return build_rates(result.data, default_rate)
+
+
+def get_finance_models(finance_model_ids: list[str]) -> dict:
+    """
+    Get names and phase rates for several finance models, paging both
+    tables (fetch_rows_in) so no assumption row is dropped at PostgREST's
+    row limit.
+
+    Returns dict: {finance_model_id: {'name': str, 'rates': {...}}}
+    Unknown ids get their id as name and the fallback default rate.
+    """
+    model_rows = fetch_rows_in('finance_models', 'id', finance_model_ids, 'id, name, default_annual_rate')
+    assumption_rows = fetch_rows_in('finance_assumptions', 'finance_model_id', finance_model_ids)
+
+    models_by_id = {m['id']: m for m in model_rows}
+    rows_by_model = {fm_id: [] for fm_id in finance_model_ids}
+    for row in assumption_rows:
+        rows_by_model[row['finance_model_id']].append(row)
+
+    models = {}
+    for fm_id in finance_model_ids:
+        model = models_by_id.get(fm_id, {})
+        models[fm_id] = {
+            'name': model.get('name', fm_id),
+            'rates': build_rates(rows_by_model[fm_id], model.get('default_annual_rate'))
+        }
+
+    return models
+
+
+def get_cost_entries(cost_time_model_id: str) -> list:
+    """
+    Get all cost entries for a model, ordered by date.
+    """
+    result = supabase.table('v_cost_entries').select('*').eq(
+        'cost_time_model_id', cost_time_model_id
+    ).order('date_paid').execute()
+
+    return result.data
+
+
+def resolve_project_dates(model: Optional[dict], entries: list) -> tuple:
+    """
+    Project start and end dates from a cost_time_models row, else inferred
+    from the entries, else today to 1 year from now.
+    """
+    if model:
+        start = model.get('project_start_date')
+        end = model.get('project_end_date')
+        if start and end:
+            return (date.fromisoformat(start), date.fromisoformat(end))
+
+    # Infer from cost entries
+    if entries:
+        dates = [date.fromisoformat(e['date_paid']) for e in entries]
+        return (min(dates), max(dates))
+
+    # Default: today to 1 year from now
+    today = date.today()
+    return (today, today + timedelta(days=365))
+
+
+def get_project_dates(cost_time_model_id: str, entries: Optional[list] = None) -> tuple:
+    """
+    Get project start and end dates from the model or infer from entries.
+    Pass already-fetched entries to avoid querying them again.
+    """
+    # Try to get from model
+    result = supabase.table('cost_time_models').select(
+        'project_start_date, project_end_date'
+    ).eq('id', cost_time_model_id).execute()
+
+    model = result.data[0] if result.data else None
+    has_dates = model and model.get('project_start_date') and model.get('project_end_date')
+    if entries is None and not has_dates:
+        entries = get_cost_entries(cost_time_model_id)
+
+    return resolve_project_dates(model, entries or [])
+
+
+def load_calculation_bundle(cost_time_model_id: str, finance_model_id: str) -> dict:
+    """
+    Gather everything one carrying cost calculation needs.
+
+    Uses the get_carrying_cost_bundle RPC (one round-trip). If the function
+    isn't deployed yet, falls back to four queries issued in parallel.
+
+    Returns:
+        {
+            'cost_time_model_id', 'finance_model_id',
+            'cost_model_name', 'finance_model_name',
+            'entries': [v_cost_entries rows ordered by date_paid],
+            'rates': {phase: {'rate': Decimal, 'compound': bool}},
+            'project_start': date, 'project_end': date
+        }
+    """
+    try:
+        data = supabase.rpc('get_carrying_cost_bundle', {
+            'p_cost_time_model_id': cost_time_model_id,
+            'p_finance_model_id': finance_model_id
+        }).execute().data
+    except APIError:
+        data = None
+
+    if data is None:
+        queries = {
+            'cost_model': supabase.table('cost_time_models').select(
+                'id, name, project_start_date, project_end_date'
+            ).eq('id', cost_time_model_id),
+            'finance_model': supabase.table('finance_models').select(
+                'id, name, default_annual_rate'
+            ).eq('id', finance_model_id),
+            'assumptions': supabase.table('finance_assumptions').select(
+                '*'
+            ).eq('finance_model_id', finance_model_id),
+            'entries': supabase.table('v_cost_entries').select('*').eq(
+                'cost_time_model_id', cost_time_model_id
+            ).order('date_paid'),
+        }
+        with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+            futures = {key: pool.submit(query.execute) for key, query in queries.items()}
+            rows = {key: future.result().data for key, future in futures.items()}
+
+        data = {
+            'cost_model': rows['cost_model'][0] if rows['cost_model'] else None,
+            'finance_model': rows['finance_model'][0] if rows['finance_model'] else None,
+            'assumptions': rows['assumptions'],
+            'entries': rows['entries'],
+        }
+
+    cost_model = data.get('cost_model') or {}
+    finance_model = data.get('finance_model') or {}
+    entries = data.get('entries') or []
+    project_start, project_end = resolve_project_dates(cost_model, entries)
+
+    return {
+        'cost_time_model_id': cost_time_model_id,
+        'finance_model_id': finance_model_id,
+        'cost_model_name': cost_model.get('name', cost_time_model_id),
+        'finance_model_name': finance_model.get('name', finance_model_id),
+        'entries': entries,
+        'rates': build_rates(data.get('assumptions') or [], finance_model.get('default_annual_rate')),
+        'project_start': project_start,
+        'project_end': project_end
+    }
+
+
+def get_content_version(cost_time_model_id: str, finance_model_id: str) -> Optional[str]:
+    """
+    Checksum of every input a calculation for this pair reads, from the
+    get_carrying_cost_version RPC. None if the function isn't deployed.
+    """
+    try:
+        return supabase.rpc('get_carrying_cost_version', {
+            'p_cost_time_model_id': cost_time_model_id,
+            'p_finance_model_id': finance_model_id
+        }).execute().data
+    except APIError:
+        return None
+
+
+def summary_totals(total_base_cents: int, total_carrying_cents: int) -> dict:
+    """
+    Headline totals from whole-cent sums.
+    Returns total_base_cost, total_carrying_cost, total_with_carrying, carrying_cost_pct.
+    """
+    total_base = money.cents_to_decimal(total_base_cents)
+    total_carrying = money.cents_to_decimal(total_carrying_cents)
+    carrying_pct = (total_carrying / total_base * 100) if total_base > 0 else Decimal('0')
+
+    return {
+        'total_base_cost': money.cents_to_dollars(total_base_cents),
+        'total_carrying_cost': money.cents_to_dollars(total_carrying_cents),
+        'total_with_carrying': money.cents_to_dollars(total_base_cents + total_carrying_cents),
+        'carrying_cost_pct': float(carrying_pct)
+    }
+
+
+def price_entries(entries: list, rates: dict, project_end: date) -> tuple:
+    """
+    Price every entry at its phase rate to project end.
+
+    Returns:
+        (entry arrays, per-entry rate, days_held, carrying cents), see carrying_cost_engine
+    """
+    arrays = engine.entry_arrays(entries)
+    phase_rate, phase_mode = engine.phase_rate_arrays(arrays['phases'], rates)
+    rate = phase_rate[arrays['phase_idx']]
+
+    # Days from payment to project end
+    days_held = engine.day_number(project_end) - arrays['paid_day']
+
+    # Growth factors come from cached per-(rate, mode) day tables
+    carrying = engine.phase_carrying_cost_cents(
+        arrays['amount_cents'], days_held, arrays['phase_idx'], phase_rate, phase_mode
+    )
+    apply_rate_curves(carrying, arrays, rates, project_end, phase_rate, phase_mode)
+    return arrays, rate, days_held, carrying
+
+
+def apply_rate_curves(carrying, arrays: dict, rates: dict, project_end: date, phase_rate, phase_mode) -> None:
+    """
+    Re-price, in place, entries whose phase has dated rate segments by
+    integrating across the segments (carrying_cost_engine rate curves).
+    Flat-rate phases keep the exact lookup-table result.
+    """
+    segments = engine.phase_rate_segments(arrays['phases'], rates)
+    curved = np.array([bool(seg) for seg in segments], dtype=bool)
+    if not curved.any():
+        return
+
+    mask = curved[arrays['phase_idx']]
+    carrying[mask] = engine.curve_carrying_cost_cents(
+        arrays['amount_cents'][mask], arrays['paid_day'][mask], arrays['phase_idx'][mask],
+        engine.day_number(project_end), phase_rate, phase_mode, segments
+    )
+
+
+def require_flat_rates(rates: dict, phases: list, caller: str) -> None:
+    """Raise ValueError if any of the phases has dated rate segments, which caller prices at one flat rate."""
+    curved = [phase for phase, segments in zip(phases, engine.phase_rate_segments(phases, rates)) if segments]
+    if curved:
+        raise ValueError(
+            f"{caller} uses one flat rate per phase; dated rate segments on: {', '.join(curved)}. "
+            f"Use calculate_model_carrying_costs() or compare_finance_models() for rate curves."
+        )
+
+
+DETAIL_COLUMNS = ['ce_id', 'ce_name', 'phase', 'date_paid', 'amount', 'days_held', 'rate', 'carrying_cost']
+
+# Rows per Parquet row group when streaming details
+DETAIL_BATCH_ROWS = 50_000
+
+
+def iter_details(entries: list, arrays: dict, days_held, rate, carrying):
+    """
+    Yield one entry-level calculation dict at a time (see DETAIL_COLUMNS).
+    Only the engine arrays are held; nothing per entry is built up front.
+    """
+    for entry, ce_idx, ce_name, phase_idx, amount, days, entry_rate, cost in zip(
+        entries,
+        arrays['ce_idx'].tolist(),
+        arrays['ce_names'],
+        arrays['phase_idx'].tolist(),
+        arrays['amount_cents'].tolist(),
+        days_held.tolist(),
+        rate.tolist(),
+        carrying.tolist()
+    ):
+        yield {
+            'ce_id': arrays['ce_ids'][ce_idx],
+            'ce_name': ce_name,
+            'phase': arrays['phases'][phase_idx],
+            'date_paid': entry['date_paid'],
+            'amount': amount / 100,
+            'days_held': days,
+            'rate': entry_rate,
+            'carrying_cost': cost / 100
+        }
+
+
+def write_details(details, path: str) -> int:
+    """
+    Stream entry-level details to a CSV file, or Parquet if path ends in
+    .parquet (needs pyarrow), without holding them all in memory.
+
+    Returns the number of rows written.
+    """
+    count = 0
+    if not path.endswith('.parquet'):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=DETAIL_COLUMNS)
+            writer.writeheader()
+            for d in details:
+                writer.writerow(d)
+                count += 1
+        return count
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ('ce_id', pa.string()), ('ce_name', pa.string()), ('phase', pa.string()),
+        ('date_paid', pa.string()), ('amount', pa.float64()), ('days_held', pa.int64()),
+        ('rate', pa.float64()), ('carrying_cost', pa.float64()),
+    ])
+    with pq.ParquetWriter(path, schema) as writer:
+        batch = []
+        for d in details:
+            batch.append(d)
+            if len(batch) == DETAIL_BATCH_ROWS:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    return count
+
+
+def calculate_model_carrying_costs(
+    cost_time_model_id: str,
+    finance_model_id: str,
+    verbose: bool = False,
+    bundle: Optional[dict] = None,
+    details: str = 'list',
+    details_path: Optional[str] = None
+) -> dict:
+    """
+    Calculate total carrying costs for a cost/time model using a finance model.
+
+    Entries are converted to arrays and priced in one vectorized pass by
+    carrying_cost_engine; aggregates are grouped sums over whole cents.
+    Pass a bundle from load_calculation_bundle() to skip all fetching.
+
+    Aggregates are always computed eagerly. Per-entry details depend on:
+        details='list'  list of dicts (default)
+        details='iter'  lazy iterator, consumed once
+        details='none'  omitted
+        details_path    streamed to CSV/Parquet instead (see write_details());
+                        the result gets 'details_path' and 'details_written'
+
+    Returns:
+        {
+            'total_base_cost': Decimal,
+            'total_carrying_cost': Decimal,
+            'total_with_carrying': Decimal,
+            'carrying_cost_pct': Decimal,
+            'by_phase': {phase: {'base': Decimal, 'carrying': Decimal}},
+            'by_ce': {ce_id: {'base': Decimal, 'carrying': Decimal}},
+            'details': [list of entry-level calculations]
+        }
+    """
+    if details not in ('list', 'iter', 'none'):
+        raise ValueError(f"details must be 'list', 'iter' or 'none', got {details!r}")
+
+    if bundle is None:
+        bundle = load_calculation_bundle(cost_time_model_id, finance_model_id)
+
+    entries = bundle['entries']
+    rates = bundle['rates']
+    project_start, project_end = bundle['project_start'], bundle['project_end']
+
+    if verbose:
+        print(f"Project period: {project_start} to {project_end}")
+        print(f"Entries: {len(entries)}")
+        print(f"Rates by phase: {rates}")
+
+    arrays, rate, days_held, carrying = price_entries(entries, rates, project_end)
+    summary = engine.summarize(arrays, carrying)
+
+    if verbose:
+        for d in iter_details(entries, arrays, days_held, rate, carrying):
+            print(f"  {d['ce_id']}: ${d['amount']:,.2f} on {d['date_paid']}, held {d['days_held']}d "
+                  f"@ {d['rate']*100:.1f}% = ${d['carrying_cost']:,.2f}")
+
+    result = {
+        **summary_totals(summary['total_base_cents'], summary['total_carrying_cents']),
+        'by_phase': {k: {'base': v['base'] / 100, 'carrying': v['carrying'] / 100}
+                     for k, v in summary['by_phase'].items()},
+        'by_ce': {k: {'base': v['base'] / 100, 'carrying': v['carrying'] / 100}
+                  for k, v in summary['by_ce'].items()},
+        'project_start': str(project_start),
+        'project_end': str(project_end),
+        'entry_count': len(entries)
+    }
+
+    if details_path:
+        result['details_path'] = details_path
+        result['details_written'] = write_details(
+            iter_details(entries, arrays, days_held, rate, carrying), details_path
+        )
+    elif details == 'list':
+        result['details'] = list(iter_details(entries, arrays, days_held, rate, carrying))
+    elif details == 'iter':
+        result['details'] = iter_details(entries, arrays, days_held, rate, carrying)
+
+    return result
+
+
+def cached_model_carrying_costs(
+    cost_time_model_id: str,
+    finance_model_id: str,
+    remote: bool = False,
+    path: Optional[str] = None
+) -> dict:
+    """
+    calculate_model_carrying_costs() through the result cache (aggregates
+    only; per-entry details are not cached).
+
+    The content version comes from one lightweight RPC; a matching local
+    (or, with remote=True, carrying_cost_results table) entry is returned
+    without loading entries. Misses are calculated and stored in both.
+    Without the RPC the bundle is loaded and checksummed locally, which
+    still skips the calculation on a hit.
+    """
+    bundle = None
+    version = get_content_version(cost_time_model_id, finance_model_id)
+    if version is None:
+        bundle = load_calculation_bundle(cost_time_model_id, finance_model_id)
+        version = cache.content_version(bundle)
+
+    conn = cache.open_cache(path)
+    try:
+        result = cache.cache_get(conn, cost_time_model_id, finance_model_id, version)
+        if result is not None:
+            return result
+
+        if remote:
+            try:
+                rows = supabase.table('carrying_cost_results').select('result').eq(
+                    'cost_time_model_id', cost_time_model_id
+                ).eq('finance_model_id', finance_model_id).eq(
+                    'content_version', cache.cache_key(version)
+                ).execute().data
+            except APIError:
+                rows, remote = [], False
+            if rows:
+                result = rows[0]['result']
+                cache.cache_put(conn, cost_time_model_id, finance_model_id, version, result)
+                return result
+
+        result = calculate_model_carrying_costs(
+            cost_time_model_id, finance_model_id, bundle=bundle, details='none'
+        )
+        cache.cache_put(conn, cost_time_model_id, finance_model_id, version, result)
+        if remote:
+            supabase.table('carrying_cost_results').upsert({
+                'cost_time_model_id': cost_time_model_id,
+                'finance_model_id': finance_model_id,
+                'content_version': cache.cache_key(version),
+                'result': result
+            }, on_conflict='cost_time_model_id,finance_model_id').execute()
+        return result
+    finally:
+        conn.close()
+
+
+def price_finance_models(entries: list, project_end: date, rates_by_model: list) -> tuple:
+    """
+    Total base and carrying cost (whole cents) of one cost model's entries
+    under each of several finance models' phase rates.
+
+    Returns:
+        (total_base_cents, [total_carrying_cents per finance model])
+    """
+    arrays = engine.entry_arrays(entries)
+    rate_matrix, mode_matrix = engine.phase_rate_matrix(arrays['phases'], rates_by_model)
+    days_held = engine.day_number(project_end) - arrays['paid_day']
+
+    carrying = engine.carrying_cost_matrix(
+        arrays['amount_cents'], days_held, arrays['phase_idx'], rate_matrix, mode_matrix
+    )
+    for m, rates in enumerate(rates_by_model):
+        apply_rate_curves(carrying[:, m], arrays, rates, project_end, rate_matrix[m], mode_matrix[m])
+    return int(arrays['amount_cents'].sum()), carrying.sum(axis=0).tolist()
+
+
+def compare_finance_models(
+    cost_time_model_id: str,
+    finance_model_ids: list[str]
+) -> list[dict]:
+    """
+    Compare carrying costs across multiple finance models for the same cost/time model.
+    Useful for "what if rates change" analysis.
+
+    The cost model is loaded once and all finance models are priced together:
+    a (models x phases) rate matrix is expanded to an (entries x models)
+    carrying cost matrix in one vectorized operation, so comparing 50 rate
+    environments costs about the same as comparing one.
+    """
+    entries = get_cost_entries(cost_time_model_id)
+    project_start, project_end = get_project_dates(cost_time_model_id, entries)
+    models = get_finance_models(finance_model_ids)
+
+    total_base_cents, total_carrying_cents = price_finance_models(
+        entries, project_end, [models[fm_id]['rates'] for fm_id in finance_model_ids]
+    )
+
+    results = []
+    for fm_id, carrying_cents in zip(finance_model_ids, total_carrying_cents):
+        results.append({
+            'finance_model_id': fm_id,
+            'finance_model_name': models[fm_id]['name'],
+            **summary_totals(total_base_cents, carrying_cents)
+        })
+
+    return results
+
+
+def carrying_cost_sensitivity(
+    cost_time_model_id: str,
+    finance_model_id: str,
+    rate_shifts_bps: list,
+    end_shifts_days: list,
+    bundle: Optional[dict] = None
+) -> dict:
+    """
+    Carrying cost over a grid of rate shifts and project-end shifts.
+
+    Every phase rate moves by the same number of basis points; the project end
+    moves by the given number of days (payment dates stay fixed). A 40 x 40
+    grid is evaluated in one vectorized pass, fast enough for a heatmap.
+    Phases with dated rate segments are priced on their rate curves, the
+    shift applying to every segment.
+
+    Returns:
+        {
+            'rate_shifts_bps': [...], 'end_shifts_days': [...],
+            'project_end': str, 'total_base_cost': float,
+            'carrying': (rates x ends) array of carrying cost in dollars,
+            'by_phase': {phase: (rates x ends) array in dollars}
+        }
+    Values are unrounded; per-entry cent rounding is skipped for speed.
+    """
+    if bundle is None:
+        bundle = load_calculation_bundle(cost_time_model_id, finance_model_id)
+
+    arrays = engine.entry_arrays(bundle['entries'])
+    phase_rate, phase_mode = engine.phase_rate_arrays(arrays['phases'], bundle['rates'])
+
+    surface = engine.sensitivity_surface(
+        arrays['amount_cents'],
+        arrays['paid_day'],
+        arrays['phase_idx'],
+        phase_rate,
+        phase_mode,
+        engine.day_number(bundle['project_end']),
+        [bps / 10000 for bps in rate_shifts_bps],
+        end_shifts_days,
+        engine.phase_rate_segments(arrays['phases'], bundle['rates'])
+    )
+
+    return {
+        'rate_shifts_bps': list(rate_shifts_bps),
+        'end_shifts_days': list(end_shifts_days),
+        'project_end': str(bundle['project_end']),
+        'total_base_cost': int(arrays['amount_cents'].sum()) / 100,
+        'carrying': surface['total'] / 100,
+        'by_phase': {phase: surface['by_phase'][:, :, i] / 100
+                     for i, phase in enumerate(arrays['phases'])}
+    }
+
+
+def simulate_carrying_cost_risk(
+    cost_time_model_id: str,
+    finance_model_id: str,
+    risk_model_id: str,
+    n_draws: int = 100_000,
+    workers: int = 1,
+    seed: Optional[int] = None,
+    bundle: Optional[dict] = None
+) -> dict:
+    """
+    Monte Carlo carrying cost distribution under a risk_models preset.
+
+    Each draw stretches the project timeline by a sampled R1 schedule slip and
+    adds a sampled R2 rate premium to every phase rate (see
+    carrying_cost_montecarlo.py for the distributions). Finance models with
+    dated rate segments are rejected (ValueError).
+
+    Returns:
+        {
+            'risk_model_name': str,
+            'base_carrying_cost': float (no slip, no premium),
+            'draws', 'mean', 'std', 'p10', 'p50', 'p90', 'min', 'max': floats in dollars
+        }
+    """
+    if bundle is None:
+        bundle = load_calculation_bundle(cost_time_model_id, finance_model_id)
+
+    arrays = engine.entry_arrays(bundle['entries'])
+    require_flat_rates(bundle['rates'], arrays['phases'], 'simulate_carrying_cost_risk()')
+
+    risk_result = supabase.table('risk_models').select(
+        'name, schedule_variance_pct, rate_premium_bps'
+    ).eq('id', risk_model_id).execute()
+    if not risk_result.data:
+        raise ValueError(f"Risk model not found: {risk_model_id}")
+    risk = risk_result.data[0]
+
+    phase_rate, phase_mode = engine.phase_rate_arrays(arrays['phases'], bundle['rates'])
+    weight, group_day, group_phase = engine.collapse_entries(
+        arrays['amount_cents'], arrays['paid_day'], arrays['phase_idx']
+    )
+    days_held = engine.day_number(bundle['project_end']) - group_day
+    rate = phase_rate[group_phase]
+    mode = phase_mode[group_phase]
+
+    cents = montecarlo.simulate(
+        weight, days_held, rate, mode,
+        risk['schedule_variance_pct'], risk['rate_premium_bps'],
+        n_draws=n_draws, seed=seed, workers=workers
+    )
+    base = engine.growth_factors(days_held, rate, mode) @ weight
+
+    return {
+        'risk_model_name': risk['name'],
+        'base_carrying_cost': float(base) / 100,
+        **montecarlo.summarize_draws(cents)
+    }
+
+
+def load_incremental_ledger(
+    cost_time_model_id: str,
+    finance_model_id: str,
+    bundle: Optional[dict] = None
+) -> dict:
+    """
+    Build an incremental ledger (see carrying_cost_incremental.py) for live
+    totals while entries are edited or the project end date is moved.
+    Finance models with dated rate segments are rejected (ValueError).
+    """
+    if bundle is None:
+        bundle = load_calculation_bundle(cost_time_model_id, finance_model_id)
+
+    ledger = incremental.new_ledger(bundle['rates'], bundle['project_end'], origin=bundle['project_start'])
+    incremental.load_entries(ledger, bundle['entries'])
+    return ledger
+
+
+def construction_loan_schedule(
+    cost_time_model_id: str,
+    finance_model_id: str,
+    specs: Optional[list[dict]] = None,
+    bundle: Optional[dict] = None
+) -> dict:
+    """
+    Monthly draw, equity, interest and balance series for one or more
+    construction loan structures over a cost model's payment timeline
+    (see construction_loan_engine.py).
+
+    Args:
+        specs: Loan structure dicts; default is one DEFAULT_LOAN_SPEC loan at
+            the finance model's construction rate. Specs without an
+            annual_rate also use that rate.
+
+    Returns:
+        {
+            'months': ['YYYY-MM', ...],
+            'cost': [dollars per month],
+            'loans': [{'spec': dict, **totals, 'draw', 'equity', 'interest', 'balance': [...]}]
+        }
+    """
+    if bundle is None:
+        bundle = load_calculation_bundle(cost_time_model_id, finance_model_id)
+
+    rates = bundle['rates']
+    if not specs or any('annual_rate' not in spec for spec in specs):
+        require_flat_rates(rates, ['construction'], 'construction_loan_schedule()')
+    construction_rate = float(rates.get('construction', rates['_default'])['rate'])
+    specs = [{'annual_rate': construction_rate, **spec} for spec in (specs or [{}])]
+
+    entries = bundle['entries']
+    first_month, last_month = construction_loan.to_month_numbers(
+        [bundle['project_start'], bundle['project_end']]
+    ).tolist()
+    result = construction_loan.run_construction_loans(
+        engine.to_cents([e['amount_total'] for e in entries]),
+        construction_loan.to_month_numbers([e['date_paid'] for e in entries]),
+        first_month,
+        last_month - first_month + 1,
+        specs
+    )
+
+    return {
+        'months': result['months'],
+        'cost': result['cost'].tolist(),
+        'loans': [
+            {
+                'spec': {**construction_loan.DEFAULT_LOAN_SPEC, **spec},
+                **summary,
+                'draw': result['draw'][i].tolist(),
+                'equity': result['equity'][i].tolist(),
+                'interest': result['interest'][i].tolist(),
+                'balance': result['balance'][i].tolist(),
+            }
+            for i, (spec, summary) in enumerate(zip(specs, result['summary']))
+        ]
+    }
+
+
+def developer_return(
+    cost_time_model_id: str,
+    finance_model_id: str,
+    sale_prices: list[float],
+    sale_delays_days: Optional[list[int]] = None,
+    discount_rate: Optional[float] = None,
+    bundle: Optional[dict] = None,
+    nodes: Optional[list] = None
+) -> dict:
+    """
+    NPV and IRR of the cost-entry outflows against an assumed sale, for every
+    (sale price, sale delay) combination (see developer_return_engine.py).
+
+    Entries coded B13-Return or any of its descendants (the static
+    required-return estimate) are left out of the outflows. The sale happens
+    sale_delay days after project end.
+
+    Args:
+        sale_prices: Sale prices in dollars
+        sale_delays_days: Days from project end to sale (default: [0], at project end)
+        discount_rate: NPV rate (default: the finance model's default rate)
+        nodes: cost_elements_unified rows (default: fetched)
+
+    Returns:
+        {
+            'total_cost': float,
+            'sale_prices': [...], 'sale_delays_days': [...],
+            'npv', 'irr', 'profit', 'equity_multiple': [[value per delay] per price]
+        }
+    """
+    if sale_delays_days is None:
+        sale_delays_days = [0]
+
+    if bundle is None:
+        bundle = load_calculation_bundle(cost_time_model_id, finance_model_id)
+
+    if discount_rate is None:
+        discount_rate = float(bundle['rates']['_default']['rate'])
+
+    if nodes is None:
+        nodes = get_ce_hierarchy()
+
+    excluded = ce_subtree(nodes, returns.RETURN_CE_ID)
+    entries = [e for e in bundle['entries'] if e['ce_id'] not in excluded]
+    prices = np.repeat(np.asarray(sale_prices, dtype=np.float64), len(sale_delays_days))
+    sale_day = engine.day_number(bundle['project_end']) + np.tile(
+        np.asarray(sale_delays_days, dtype=np.int64), len(sale_prices)
+    )
+
+    metrics = returns.return_metrics(
+        engine.to_cents([e['amount_total'] for e in entries]),
+        engine.to_day_numbers([e['date_paid'] for e in entries]),
+        prices,
+        sale_day,
+        discount_rate
+    )
+
+    shape = (len(sale_prices), len(sale_delays_days))
+    return {
+        'total_cost': metrics['total_cost'],
+        'sale_prices': list(sale_prices),
+        'sale_delays_days': list(sale_delays_days),
+        'discount_rate': discount_rate,
+        **{key: metrics[key].reshape(shape).tolist() for key in ('npv', 'irr', 'profit', 'equity_multiple')}
+    }
+
+
+def risk_comparison(
+    cost_time_model_ids: list[str],
+    finance_model_id: str,
+    risk_model_ids: Optional[list[str]] = None,
+    bundles: Optional[list[dict]] = None
+) -> dict:
+    """
+    R1-R4 risk costs of every risk preset against every cost model, on each
+    model's own payment timeline (see risk_engine.py).
+
+    Args:
+        cost_time_model_ids: Cost models to compare
+        finance_model_id: Supplies the construction rate (its 'construction'
+            phase rate, else its default rate; dated segments raise ValueError)
+        risk_model_ids: Presets to apply (default: all risk_models)
+        bundles: Already-loaded calculation bundles, one per cost model
+
+    Returns:
+        {
+            'cost_models': [names], 'risk_models': [names],
+            'total_cost', 'construction_months': [value per cost model],
+            'premium_interest', 'schedule_carry', 'sales_carry', 'contingency',
+            'contingency_carry', 'marketing_addon', 'total', 'monthly_impact':
+                [[value per risk model] per cost model]
+        }
+    """
+    if bundles is None:
+        with ThreadPoolExecutor(max_workers=min(8, max(len(cost_time_model_ids), 1))) as pool:
+            bundles = list(pool.map(lambda i: load_calculation_bundle(i, finance_model_id), cost_time_model_ids))
+
+    for bundle in bundles:
+        require_flat_rates(bundle['rates'], ['construction'], 'risk_comparison()')
+
+    risk_rows = fetch_all_rows('risk_models', '*', order='sort_order')
+    if risk_model_ids is not None:
+        wanted = set(risk_model_ids)
+        risk_rows = [row for row in risk_rows if row['id'] in wanted]
+
+    timelines = []
+    for bundle in bundles:
+        first_month, last_month = construction_loan.to_month_numbers(
+            [bundle['project_start'], bundle['project_end']]
+        ).tolist()
+        timelines.append({
+            'amount_cents': engine.to_cents([e['amount_total'] for e in bundle['entries']]),
+            'paid_month': construction_loan.to_month_numbers([e['date_paid'] for e in bundle['entries']]),
+            'first_month': first_month,
+            'n_months': last_month - first_month + 1,
+        })
+    base_rate = [float(b['rates'].get('construction', b['rates']['_default'])['rate']) for b in bundles]
+
+    result = risk_pricing.risk_costs(risk_pricing.timeline_matrix(timelines), base_rate, risk_rows)
+    result['monthly_impact'] = risk_pricing.monthly_impact(result)
+    return {
+        'cost_models': [b['cost_model_name'] for b in bundles],
+        'risk_models': [row['name'] for row in risk_rows],
+        'total_cost': result['total_cost'].tolist(),
+        'construction_months': result['construction_months'].tolist(),
+        **{
+            field: result[field].tolist()
+            for field in risk_pricing.ONE_TIME_FIELDS + ('total', 'monthly_impact')
+        }
+    }
+
+
+def get_ce_hierarchy() -> list:
+    """All cost_elements_unified nodes (ce_id, parent_id, level, short_name)."""
+    return fetch_all_rows('cost_elements_unified', 'ce_id, parent_id, level, short_name', order='ce_id')
+
+
+def ce_subtree(nodes: list, root: str) -> set:
+    """ce_ids of root and all of its descendants (root is included even if not in nodes)."""
+    children = {}
+    for node in nodes:
+        children.setdefault(node.get('parent_id'), []).append(node['ce_id'])
+    subtree, stack = set(), [root]
+    while stack:
+        ce_id = stack.pop()
+        if ce_id not in subtree:
+            subtree.add(ce_id)
+            stack.extend(children.get(ce_id, ()))
+    return subtree
+
+
+def carrying_cost_rollup(
+    cost_time_model_id: str,
+    finance_model_id: str,
+    bundle: Optional[dict] = None,
+    nodes: Optional[list] = None
+) -> dict:
+    """
+    Base and carrying cost subtotals for every cost_elements_unified node
+    (L1-L5), each including all of its descendants.
+
+    Per-entry results are summed onto their ce_id node, then accumulated
+    child-to-parent level by level over parent-index arrays.
+
+    Args:
+        nodes: cost_elements_unified rows (default: fetched)
+
+    Returns:
+        {
+            ce_id: {'name': str, 'level': int, 'parent_id': str|None,
+                    'base': float, 'carrying': float},
+            ...
+            'unmapped': {'base': float, 'carrying': float}  # entries with unknown ce_id
+        }
+    """
+    if bundle is None:
+        bundle = load_calculation_bundle(cost_time_model_id, finance_model_id)
+    if nodes is None:
+        nodes = get_ce_hierarchy()
+
+    arrays, _, _, carrying = price_entries(bundle['entries'], bundle['rates'], bundle['project_end'])
+    hierarchy = engine.hierarchy_arrays(nodes)
+
+    base_direct, base_unmapped = engine.node_values(
+        hierarchy, arrays['ce_ids'], arrays['ce_idx'], arrays['amount_cents']
+    )
+    carrying_direct, carrying_unmapped = engine.node_values(
+        hierarchy, arrays['ce_ids'], arrays['ce_idx'], carrying
+    )
+    base = engine.rollup(hierarchy, base_direct).tolist()
+    carrying_totals = engine.rollup(hierarchy, carrying_direct).tolist()
+
+    result = {
+        node['ce_id']: {
+            'name': node.get('short_name'),
+            'level': node.get('level'),
+            'parent_id': node.get('parent_id'),
+            'base': b / 100,
+            'carrying': c / 100
+        }
+        for node, b, c in zip(nodes, base, carrying_totals)
+    }
+    result['unmapped'] = {'base': base_unmapped / 100, 'carrying': carrying_unmapped / 100}
+    return result
+
+
+# ============================================================
+# CLI Interface
+# ============================================================
+
+if __name__ == "__main__":
+    import sys
+    import json
+
+    usage = "Usage: python calculate_carrying_costs.py <cost_time_model_id> <finance_model_id> [--verbose] [--no-cache] [--remote-cache] [--details out.csv|out.parquet] [--risk]"
+
+    if len(sys.argv) < 3:
+        print(usage)
+        print()
+        print("Example:")
+        print("  python calculate_carrying_costs.py xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx 00000000-0000-0000-0000-000000000002")
+        print()
+
+        # Show available models
+        print("Available Finance Models:")
+        result = supabase.table('finance_models').select('id, name, is_baseline').execute()
+        for fm in result.data:
+            baseline = " (baseline)" if fm['is_baseline'] else ""
+            print(f"  {fm['id']}: {fm['name']}{baseline}")
+
+        print()
+        print("Available Cost/Time Models:")
+        result = supabase.table('cost_time_models').select('id, name').execute()
+        if result.data:
+            for ctm in result.data:
+                print(f"  {ctm['id']}: {ctm['name']}")
+        else:
+            print("  (none - create one first)")
+
+        sys.exit(1)
+
+    cost_time_model_id = sys.argv[1]
+    finance_model_id = sys.argv[2]
+    verbose = '--verbose' in sys.argv
+    details_path = None
+    if '--details' in sys.argv:
+        details_at = sys.argv.index('--details') + 1
+        if details_at >= len(sys.argv) or sys.argv[details_at].startswith('--'):
+            print("--details needs an output path (.csv or .parquet)")
+            print(usage)
+            sys.exit(1)
+        details_path = sys.argv[details_at]
+    use_cache = '--no-cache' not in sys.argv and not verbose and not details_path
+
+    print(f"Calculating carrying costs...")
+    print(f"  Cost/Time Model: {cost_time_model_id}")
+    print(f"  Finance Model: {finance_model_id}")
+    print()
+
+    if use_cache:
+        result = cached_model_carrying_costs(
+            cost_time_model_id, finance_model_id, remote='--remote-cache' in sys.argv
+        )
+    else:
+        result = calculate_model_carrying_costs(
+            cost_time_model_id, finance_model_id, verbose=verbose, details='none', details_path=details_path
+        )
+
+    print()
+    print("=" * 60)
+    print("RESULTS")
+    print("=" * 60)
+    print(f"Project Period: {result['project_start']} to {result['project_end']}")
+    print(f"Cost Entries: {result['entry_count']}")
+    print()
+    print(f"Total Base Cost:     ${result['total_base_cost']:>15,.2f}")
+    print(f"Total Carrying Cost: ${result['total_carrying_cost']:>15,.2f}")
+    print(f"                     {'-' * 17}")
+    print(f"Total with Carrying: ${result['total_with_carrying']:>15,.2f}")
+    print(f"Carrying Cost %:     {result['carrying_cost_pct']:>15.1f}%")
+    print()
+    print("By Phase:")
+    for phase, vals in sorted(result['by_phase'].items()):
+        print(f"  {phase:20s}: Base ${vals['base']:>12,.2f}, Carrying ${vals['carrying']:>10,.2f}")
+
+    if details_path:
+        print()
+        print(f"Wrote {result['details_written']:,} entry details to {details_path}")
+
+    if '--risk' in sys.argv:
+        comparison = risk_comparison([cost_time_model_id], finance_model_id)
+        print()
+        print(f"Risk presets ({comparison['construction_months'][0]}-month timeline):")
+        print(f"  {'Preset':<16} {'R2 premium':>12} {'R1 delay':>12} {'R4 sales':>12} {'R3 conting.':>12} "
+              f"{'R4 mktg':>10} {'Total':>13} {'Monthly':>9}")
+        for r, name in enumerate(comparison['risk_models']):
+            row = {field: comparison[field][0][r] for field in risk_pricing.ONE_TIME_FIELDS + ('total', 'monthly_impact')}
+            print(f"  {name[:16]:<16} ${row['premium_interest']:>11,.0f} ${row['schedule_carry']:>11,.0f} "
+                  f"${row['sales_carry']:>11,.0f} ${row['contingency'] + row['contingency_carry']:>11,.0f} "
+                  f"${row['marketing_addon']:>9,.0f} ${row['total']:>12,.0f} ${row['monthly_impact']:>8,.2f}")
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Monthly housing cost for every model combination, from Supabase.
+
+Reads the model tables the Dashboard selectors use (scenarios, occupancy,
+lifestyle, consumption factors, water/sewer/electric/gas utility models,
+occupant finance models, risk models) and prices the full cross-product
+with housing_cost_engine.py.
+
+Usage:
+    python calculate_housing_costs.py            # summary + cheapest combinations
+    python calculate_housing_costs.py --top 20
+    python calculate_housing_costs.py --seasonal --amortization
+    python calculate_housing_costs.py --income 76800 --cap 0.30 --savings 40000
+    python calculate_housing_costs.py --lifetime --years 30 --hoa 100
+    python calculate_housing_costs.py --tariffs      # calculate_utility_costs vs local tariffs
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from postgrest.exceptions import APIError
+
+import affordability_engine as affordability
+import amortization_engine as amortization
+import housing_cost_engine as housing
+import projection_engine as projection
+import tariff_engine as tariffs
+from calculate_carrying_costs import PAGE_SIZE, supabase, fetch_all_rows
+
+
+def get_home_prices(scenario_ids: list) -> list:
+    """total_onetime_costs per scenario (get_summary_stats_for_scenario), None when missing."""
+    def fetch(scenario_id):
+        data = supabase.rpc('get_summary_stats_for_scenario', {'p_scenario_id': scenario_id}).execute().data
+        stats = data[0] if isinstance(data, list) and data else data
+        return (stats or {}).get('total_onetime_costs')
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        return list(pool.map(fetch, scenario_ids))
+
+
+def load_housing_models() -> dict:
+    """
+    Read every model table the monthly cost depends on, in selector order.
+
+    Returns:
+        {
+            'scenarios': [{'scenario_id', 'name'}], 'home_prices': [float|None],
+            'occupancy', 'lifestyle', 'factors': [rows],
+            'utilities': {'water'|'sewer'|'electric'|'gas': [rows]},
+            'finance', 'risk': [rows]
+        }
+    """
+    scenarios = fetch_all_rows('scenarios', 'scenario_id, name', order='sort_order')
+    utilities = {u: [] for u in housing.UTILITY_TYPES}
+    for row in fetch_all_rows('v_utility_models', order='sort_order'):
+        utilities.setdefault(row['utility_type'], []).append(row)
+
+    return {
+        'scenarios': scenarios,
+        'home_prices': get_home_prices([s['scenario_id'] for s in scenarios]),
+        'occupancy': fetch_all_rows('v_occupancy_models', order='sort_order'),
+        'lifestyle': fetch_all_rows('v_lifestyle_models', order='sort_order'),
+        'factors': fetch_all_rows('consumption_factors', order='sort_order'),
+        'utilities': utilities,
+        'finance': fetch_all_rows('occupant_finance_models', order='sort_order'),
+        'risk': fetch_all_rows('v_risk_models', order='sort_order'),
+    }
+
+
+def get_utility_costs(model_ids: list, consumptions, is_summer: bool = False) -> np.ndarray:
+    """
+    Bills for every (utility model, consumption) pair from the
+    calculate_utility_costs RPC. The consumptions are split so no call
+    returns more than PAGE_SIZE rows (PostgREST's row limit). Falls back to
+    pricing the compiled tariffs locally if the function isn't deployed.
+
+    Returns:
+        (models, consumptions) float64 array, NaN where the SQL bill is NULL
+
+    Raises:
+        ValueError: If a call returns fewer rows than model ids x consumptions
+            (unknown or repeated model ids)
+    """
+    model_ids = list(model_ids)
+    consumptions = [float(c) for c in consumptions]
+    bills = np.full((len(model_ids), len(consumptions)), np.nan)
+    if not model_ids or not consumptions:
+        return bills
+    position = {model_id: m for m, model_id in enumerate(model_ids)}
+    models_per_call = min(len(model_ids), PAGE_SIZE)
+    consumptions_per_call = PAGE_SIZE // models_per_call
+    calls = [
+        (m_lo, c_lo)
+        for m_lo in range(0, len(model_ids), models_per_call)
+        for c_lo in range(0, len(consumptions), consumptions_per_call)
+    ]
+
+    def fetch(call):
+        m_lo, c_lo = call
+        ids = model_ids[m_lo:m_lo + models_per_call]
+        chunk = consumptions[c_lo:c_lo + consumptions_per_call]
+        rows = supabase.rpc('calculate_utility_costs', {
+            'p_utility_model_ids': ids,
+            'p_consumptions': chunk,
+            'p_is_summer': is_summer,
+        }).execute().data
+        if len(rows) != len(ids) * len(chunk):
+            missing = set(ids) - {row['utility_model_id'] for row in rows}
+            raise ValueError(f"calculate_utility_costs returned {len(rows)} rows for {len(ids)} models x "
+                             f"{len(chunk)} consumptions (unknown model ids: {sorted(missing)})")
+        return c_lo, rows
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for c_lo, rows in pool.map(fetch, calls):
+                for row in rows:
+                    cost = row['cost']
+                    bills[position[row['utility_model_id']], c_lo + row['consumption_index'] - 1] = (
+                        np.nan if cost is None else float(cost)
+                    )
+    except APIError:
+        models = supabase.table('utility_models').select('*').in_('id', model_ids).execute().data
+        missing = set(model_ids) - {model['id'] for model in models}
+        if missing:
+            raise ValueError(f"Unknown utility model ids: {sorted(missing)}")
+        for model in models:
+            tariff = tariffs.compile_tariff(model['base_monthly_fee'], model['rate_tiers'],
+                                            tariffs.seasonal_multiplier(model, is_summer))
+            bills[position[model['id']]] = housing.js_round(tariffs.price(tariff, consumptions), 2)
+    return bills
+
+
+def check_utility_costs(models: dict, levels: int = 2000, is_summer: bool = False) -> dict:
+    """
+    calculate_utility_costs bills against tariff_engine's compiled tariffs for
+    every utility model, over a grid of consumptions from 0 to 1.5x the
+    type's largest tier cap.
+
+    Args:
+        models: Output of load_housing_models()
+        levels: Consumption levels per utility type
+        is_summer: Seasonal multiplier to apply
+
+    Returns:
+        {utility type: {'consumptions', 'bills' (SQL), 'local': (models, levels) arrays,
+                        'seconds': RPC time, 'mismatches': bills NULL or more than a cent apart
+                        (float half-cent ties may round the other way)}}
+    """
+    checks = {}
+    for u in housing.UTILITY_TYPES:
+        rows = models['utilities'][u]
+        if not rows:
+            continue
+        caps = [t['max_units'] for row in rows for t in tariffs.parse_tiers(row['rate_tiers'])
+                if t['max_units'] is not None]
+        consumptions = np.round(np.linspace(0.0, 1.5 * max(caps, default=1000.0), levels), 1)
+
+        start = time.perf_counter()
+        bills = get_utility_costs([row['id'] for row in rows], consumptions, is_summer)
+        seconds = time.perf_counter() - start
+
+        compiled = tariffs.compile_models(rows, [tariffs.seasonal_multiplier(row, is_summer) for row in rows])
+        local = housing.js_round(tariffs.price_matrix(compiled, consumptions), 2)
+        checks[u] = {
+            'consumptions': consumptions,
+            'bills': bills,
+            'local': local,
+            'seconds': seconds,
+            'mismatches': int(np.count_nonzero(~(np.rint(np.abs(bills - local) * 100) <= 1))),
+        }
+    return checks
+
+
+def axis_labels(models: dict) -> dict:
+    """(ids, names) per axis, in housing_cost_engine.AXES order."""
+    def pairs(rows, id_key='id', name_keys=('name',)):
+        return (
+            [row[id_key] for row in rows],
+            [next((row[k] for k in name_keys if row.get(k)), row[id_key]) for row in rows],
+        )
+
+    labels = {
+        'scenario': pairs(models['scenarios'], 'scenario_id'),
+        'occupancy': pairs(models['occupancy']),
+        'lifestyle': pairs(models['lifestyle']),
+        'finance': pairs(models['finance'], name_keys=('short_code', 'name')),
+        'risk': pairs(models['risk']),
+    }
+    for u in housing.UTILITY_TYPES:
+        labels[u] = pairs(models['utilities'][u], name_keys=('provider_code', 'provider_name'))
+    return {axis: labels[axis] for axis in housing.AXES}
+
+
+def calculate_housing_costs(models: dict = None) -> dict:
+    """
+    Price every combination of the nine model dimensions.
+
+    Args:
+        models: Output of load_housing_models() (loaded if omitted)
+
+    Returns:
+        housing_cost_engine.monthly_housing_costs() output plus
+        'labels' ({axis: (ids, names)})
+    """
+    models = models or load_housing_models()
+    result = housing.monthly_housing_costs(
+        models['home_prices'], models['occupancy'], models['lifestyle'], models['factors'],
+        models['utilities'], models['finance'], models['risk']
+    )
+    result['labels'] = axis_labels(models)
+    return result
+
+
+def cheapest_combinations(result: dict, n: int = 10) -> list[dict]:
+    """The n lowest monthly totals: breakdown() plus 'names' ({axis: model name})."""
+    flat = result['total'].ravel()
+    n = min(n, flat.size)
+    order = np.argpartition(flat, n - 1)[:n] if n < flat.size else np.arange(flat.size)
+    order = order[np.argsort(flat[order], kind='stable')]
+
+    rows = []
+    for position in order.tolist():
+        index = np.unravel_index(position, result['shape'])
+        rows.append({
+            **housing.breakdown(result, tuple(int(i) for i in index)),
+            'names': {axis: result['labels'][axis][1][i] for axis, i in zip(housing.AXES, index)},
+        })
+    return rows
+
+
+def affordability_table(annual_income, cap: float = affordability.PAYMENT_TO_INCOME_CAP, savings=None,
+                        models: dict = None) -> dict:
+    """
+    Largest affordable total_onetime_costs for every (occupancy, lifestyle,
+    utility, finance, risk) combination at one income.
+
+    Args:
+        annual_income: Gross household income (e.g. 80% of AMI)
+        cap: Payment-to-income cap
+        savings: Optional cash for down payment + closing costs
+        models: Output of load_housing_models() (loaded if omitted)
+
+    Returns:
+        affordability_engine.max_affordable_prices() output plus 'labels'
+        ({axis: (ids, names)} for TABLE_AXES) and 'scenarios' (one row per
+        scenario: name, home price, share of combinations that can afford it)
+    """
+    models = models or load_housing_models()
+    result = affordability.max_affordable_prices(
+        affordability.monthly_budget(annual_income, cap), models['occupancy'], models['lifestyle'],
+        models['factors'], models['utilities'], models['finance'], models['risk'], savings=savings
+    )
+    labels = axis_labels(models)
+    result['labels'] = {axis: labels[axis] for axis in affordability.TABLE_AXES}
+
+    prices = [p if p else housing.DEFAULT_HOME_PRICE for p in models['home_prices']]
+    shares = affordability.affordable_share(result, prices)
+    result['scenarios'] = [
+        {'name': name, 'home_price': float(price), 'affordable_share': float(share)}
+        for name, price, share in zip(labels['scenario'][1], prices, shares)
+    ]
+    return result
+
+
+def lifetime_costs(years: int = housing.DEFAULT_TERM_YEARS, params: dict = None, hoa_monthly: float = 0.0,
+                   periods: str = 'year', models: dict = None) -> dict:
+    """
+    Lifetime cost projection for every (scenario, occupant finance model)
+    pair. O01-Utilities starts at the median 12-month utility cost over
+    every occupancy, lifestyle and utility model combination; O02-O04 at
+    projection_engine.DEFAULT_OPERATING_RATES of the home price.
+
+    Args:
+        years: Projection horizon
+        params: Overrides of projection_engine.DEFAULT_ESCALATION
+        hoa_monthly: O05-HOA dues in the first year
+        periods: 'year' or 'month'
+        models: Output of load_housing_models() (loaded if omitted)
+
+    Returns:
+        projection_engine.project() output (one row per pair, scenario-major)
+        plus 'labels' ([(scenario name, finance model name)])
+    """
+    models = models or load_housing_models()
+    annual = housing.annual_utility_costs(models['occupancy'], models['lifestyle'], models['factors'], models['utilities'])
+    prices = np.array([p if p else housing.DEFAULT_HOME_PRICE for p in models['home_prices']], dtype=np.float64)
+    loans = amortization.finance_loans(prices, models['finance'])
+    operating = projection.operating_bases(
+        np.repeat(prices, len(models['finance'])), float(np.median(annual['annual_total'])), 12 * hoa_monthly
+    )
+    result = projection.project(operating, loans, params, years, periods)
+
+    labels = axis_labels(models)
+    result['labels'] = [(s, f) for s in labels['scenario'][1] for f in labels['finance'][1]]
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Monthly housing cost for every model combination')
+    parser.add_argument('--top', type=int, default=10, help='Number of cheapest combinations to list')
+    parser.add_argument('--seasonal', action='store_true', help='Compare 12-month seasonal bills with 12x the generic month')
+    parser.add_argument('--amortization', action='store_true', help='Lifetime interest and PMI drop-off per finance model')
+    parser.add_argument('--income', type=float, help='Solve the affordability table for this gross annual income')
+    parser.add_argument('--cap', type=float, default=affordability.PAYMENT_TO_INCOME_CAP, help='Payment-to-income cap')
+    parser.add_argument('--savings', type=float, help='Cash available for down payment + closing costs')
+    parser.add_argument('--lifetime', action='store_true', help='Lifetime cost projection per scenario and finance model')
+    parser.add_argument('--years', type=int, default=housing.DEFAULT_TERM_YEARS, help='Lifetime projection horizon')
+    parser.add_argument('--hoa', type=float, default=0.0, help='Monthly HOA dues for the lifetime projection')
+    parser.add_argument('--tariffs', action='store_true', help='Check calculate_utility_costs bills against the local tariffs')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    models = load_housing_models()
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = calculate_housing_costs(models)
+    calc_seconds = time.perf_counter() - start
+
+    print(f"\n{'='*60}")
+    print("MONTHLY HOUSING COST - ALL COMBINATIONS")
+    print(f"{'='*60}")
+    for axis, size in zip(housing.AXES, result['shape']):
+        print(f"  {axis:<10} {size:>4}")
+    total = result['total']
+    print(f"\nCombinations: {total.size:,} (loaded in {load_seconds:.2f} s, priced in {calc_seconds:.3f} s)")
+    print(f"Monthly total: min ${total.min():,.2f}  median ${np.median(total):,.2f}  max ${total.max():,.2f}")
+
+    print(f"\nCheapest {args.top}:")
+    for row in cheapest_combinations(result, args.top):
+        names = row['names']
+        print(f"  ${row['total']:>10,.2f}  {names['scenario']} | {names['occupancy']} | {names['lifestyle']} | "
+              f"{names['water']}/{names['sewer']}/{names['electric']}/{names['gas']} | {names['finance']} | {names['risk']}")
+
+    if args.seasonal:
+        annual = housing.annual_utility_costs(models['occupancy'], models['lifestyle'], models['factors'], models['utilities'])
+        print("\nAnnual utility cost by model (mean over occupancy x lifestyle):")
+        print(f"  {'Model':<40} {'12-month':>12} {'12 x generic':>14} {'Change':>10}")
+        for u in housing.UTILITY_TYPES:
+            for m, model in enumerate(models['utilities'][u]):
+                seasonal = float(annual['annual'][u][..., m].mean())
+                generic = float(annual['generic_annual'][u][..., m].mean())
+                print(f"  {model['name'][:40]:<40} ${seasonal:>11,.2f} ${generic:>13,.2f} {seasonal - generic:>+10,.2f}")
+
+    if args.amortization:
+        prices = [p if p else housing.DEFAULT_HOME_PRICE for p in models['home_prices']]
+        loans = amortization.finance_loans(prices, models['finance'])
+        summary = amortization.loan_summary(loans)
+        first_year = amortization.annual_split(loans, years=1)
+        print("\nAmortization by finance model (mean over scenarios):")
+        print(f"  {'Model':<30} {'P&I':>10} {'Interest (life)':>16} {'PMI months':>11} {'Yr 1 F01':>10} {'Yr 1 F02':>10}")
+        for f, model in enumerate(models['finance']):
+            cell = lambda values: values.reshape(loans['shape'])[:, f].mean()
+            print(f"  {model['name'][:30]:<30} ${cell(summary['payment']):>9,.2f} ${cell(summary['total_interest']):>15,.0f} "
+                  f"{cell(summary['pmi_months']):>11.0f} ${cell(first_year['principal'][:, 0]):>9,.0f} "
+                  f"${cell(first_year['interest'][:, 0]):>9,.0f}")
+
+    if args.income:
+        table = affordability_table(args.income, args.cap, args.savings, models)
+        max_price = table['max_price']
+        print(f"\nAffordability at ${args.income:,.0f}/yr, {args.cap:.0%} cap (budget ${float(table['budget']):,.2f}/mo):")
+        print(f"  Max affordable price: min ${max_price.min():,.0f}  median ${np.median(max_price):,.0f}  "
+              f"max ${max_price.max():,.0f}")
+        for row in table['scenarios']:
+            print(f"  {row['name'][:40]:<40} ${row['home_price']:>12,.0f}  affordable in {row['affordable_share']:>6.1%} of combinations")
+        best = np.unravel_index(np.argmax(max_price), table['shape'])
+        names = {axis: table['labels'][axis][1][i] for axis, i in zip(affordability.TABLE_AXES, best)}
+        print(f"  Highest: ${max_price[best]:,.0f} with {names['occupancy']} | {names['lifestyle']} | "
+              f"{names['water']}/{names['sewer']}/{names['electric']}/{names['gas']} | {names['finance']} | {names['risk']}")
+
+    if args.lifetime:
+        lifetime = lifetime_costs(args.years, hoa_monthly=args.hoa, models=models)
+        rate = lifetime['params']['discount_rate']
+        first_year = projection.series(lifetime)[:, 0] / 12
+        print(f"\nLifetime cost over {args.years} years (NPV at {rate:.1%}):")
+        print(f"  {'Scenario':<30} {'Finance':<20} {'Yr 1 monthly':>13} {'Total':>13} {'NPV':>13}")
+        for (scenario, finance), monthly, total, npv in zip(lifetime['labels'], first_year, lifetime['total'], lifetime['npv']):
+            print(f"  {scenario[:30]:<30} {finance[:20]:<20} ${monthly:>12,.2f} ${total:>12,.0f} ${npv:>12,.0f}")
+        escalated = projection.reevaluate(lifetime, insurance_escalation=lifetime['params']['insurance_escalation'] + 0.02)
+        print(f"  O03 escalation +2 pts: median NPV {np.median(escalated['npv'] - lifetime['npv']):+,.0f}")
+
+    if args.tariffs:
+        checks = check_utility_costs(models)
+        print("\ncalculate_utility_costs vs local tariffs (winter):")
+        print(f"  {'Type':<10} {'Models':>7} {'Bills':>9} {'RPC':>9} {'Mismatches':>11}")
+        for u, check in checks.items():
+            print(f"  {u:<10} {check['bills'].shape[0]:>7} {check['bills'].size:>9,} "
+                  f"{check['seconds']:>8.2f}s {check['mismatches']:>11,}")
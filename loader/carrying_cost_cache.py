@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+On-disk result cache for carrying cost calculations.
+
+Results are keyed by (cost_time_model_id, finance_model_id) plus a content
+version: a checksum of everything the calculation reads (project dates,
+default rate, phase assumptions, cost entries). The database computes it with
+get_carrying_cost_version(); content_version() computes an equivalent key
+from an already-loaded calculation bundle.
+
+Each pair keeps one row, so storing a result under a new version replaces
+the stale one (automatic invalidation). Least recently used rows beyond
+MAX_ENTRIES and rows older than MAX_AGE_DAYS are evicted on write.
+
+No Supabase dependency; see cached_model_carrying_costs() in
+calculate_carrying_costs.py for the database-backed entry point.
+
+    python carrying_cost_cache.py --stats
+    python carrying_cost_cache.py --clear
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'carrying_costs.sqlite')
+
+# Bump when the shape or math of cached results changes
+FORMAT_VERSION = 2
+
+MAX_ENTRIES = 500
+MAX_AGE_DAYS = 30
+
+
+def cache_path() -> str:
+    """Cache file location (CARRYING_COST_CACHE env var overrides the default)."""
+    return os.getenv('CARRYING_COST_CACHE', DEFAULT_CACHE_PATH)
+
+
+def open_cache(path: Optional[str] = None) -> sqlite3.Connection:
+    """Open (creating if needed) the cache database."""
+    path = path or cache_path()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS results (
+            cost_time_model_id TEXT NOT NULL,
+            finance_model_id TEXT NOT NULL,
+            content_version TEXT NOT NULL,
+            result TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (cost_time_model_id, finance_model_id)
+        )
+    """)
+    return conn
+
+
+def cache_key(content_version: str) -> str:
+    """Content version tagged with the result format version."""
+    return f"{FORMAT_VERSION}:{content_version}"
+
+
+def content_version(bundle: dict) -> str:
+    """
+    Checksum of a calculation bundle's inputs (see load_calculation_bundle()).
+    Used when the get_carrying_cost_version RPC isn't available.
+    """
+    payload = {
+        'project_start': str(bundle['project_start']),
+        'project_end': str(bundle['project_end']),
+        'rates': {phase: {k: str(v) for k, v in info.items()} for phase, info in sorted(bundle['rates'].items())},
+        'entries': [
+            [e.get('id'), e['ce_id'], e['phase'], str(e['date_paid']), str(e['amount_total'])]
+            for e in bundle['entries']
+        ],
+    }
+    return 'py:' + hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def cache_get(conn: sqlite3.Connection, cost_time_model_id: str, finance_model_id: str, version: str) -> Optional[dict]:
+    """Cached result for the pair at this content version, else None."""
+    row = conn.execute(
+        "SELECT result FROM results WHERE cost_time_model_id = ? AND finance_model_id = ? AND content_version = ?",
+        (cost_time_model_id, finance_model_id, cache_key(version))
+    ).fetchone()
+    if row is None:
+        return None
+
+    conn.execute(
+        "UPDATE results SET last_used = ? WHERE cost_time_model_id = ? AND finance_model_id = ?",
+        (time.time(), cost_time_model_id, finance_model_id)
+    )
+    conn.commit()
+    return json.loads(row[0])
+
+
+def cache_put(conn: sqlite3.Connection, cost_time_model_id: str, finance_model_id: str, version: str, result: dict) -> None:
+    """Store a result, replacing any older version for the pair, then evict."""
+    now = time.time()
+    conn.execute(
+        "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+        (cost_time_model_id, finance_model_id, cache_key(version), json.dumps(result), now, now)
+    )
+    evict(conn)
+
+
+def evict(conn: sqlite3.Connection, max_entries: int = MAX_ENTRIES, max_age_days: float = MAX_AGE_DAYS) -> int:
+    """Drop rows older than max_age_days, then least recently used beyond max_entries."""
+    removed = conn.execute(
+        "DELETE FROM results WHERE created_at < ?", (time.time() - max_age_days * 86400,)
+    ).rowcount
+    removed += conn.execute("""
+        DELETE FROM results WHERE rowid IN (
+            SELECT rowid FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?
+        )
+    """, (max_entries,)).rowcount
+    conn.commit()
+    return removed
+
+
+def invalidate(conn: sqlite3.Connection, cost_time_model_id: Optional[str] = None,
+               finance_model_id: Optional[str] = None) -> int:
+    """Drop cached results for a cost model, a finance model, or everything (no arguments)."""
+    conditions, params = [], []
+    if cost_time_model_id:
+        conditions.append("cost_time_model_id = ?")
+        params.append(cost_time_model_id)
+    if finance_model_id:
+        conditions.append("finance_model_id = ?")
+        params.append(finance_model_id)
+
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    removed = conn.execute(f"DELETE FROM results{where}", params).rowcount
+    conn.commit()
+    return removed
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Carrying cost result cache')
+    parser.add_argument('--stats', action='store_true', help='Show cache size')
+    parser.add_argument('--clear', action='store_true', help='Remove every cached result')
+    args = parser.parse_args()
+
+    conn = open_cache()
+    if args.clear:
+        print(f"Removed {invalidate(conn)} cached results")
+    elif args.stats:
+        count, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(result)), 0) FROM results").fetchone()
+        print(f"Cache: {cache_path()}")
+        print(f"  Results: {count}")
+        print(f"  Size:    {size / 1024:,.1f} KB")
+    else:
+        parser.print_help()
@@ -0,0 +1,936 @@
+#!/usr/bin/env python3
+"""
+Array-based carrying cost engine.
+
+Computes the same carrying costs as the original per-entry loop in
+calculate_carrying_costs.py, but over numpy arrays:
+- amount_cents:  int64 amounts in cents
+- paid_day:      payment dates as day numbers (days since 1970-01-01)
+- rate/mode:     per-entry phase rate and compounding mode
+
+All carrying costs are computed in a few vectorized operations and rounded
+to the cent at the end (half-even, like Decimal.quantize). Entries whose
+float result lands within rounding noise of a half-cent are re-priced with
+the exact Decimal formula, so results match the scalar path to the cent.
+
+This module has no Supabase dependency so it can be benchmarked offline:
+    python carrying_cost_engine.py --benchmark
+    python carrying_cost_engine.py --benchmark --entries 1000000 --sample 20000
+"""
+
+import time
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+
+from money import to_cents  # noqa: F401  (shared int64-cents parser, re-exported)
+
+DAYS_PER_YEAR = 365
+DEFAULT_PHASE = 'crosscutting'
+
+# Compounding conventions. Codes 0/1 line up with the compound_annually flag,
+# so boolean arrays can be passed wherever a mode array is expected.
+SIMPLE, ANNUAL, MONTHLY, DAILY, CONTINUOUS = range(5)
+COMPOUNDING_MODES = {
+    'simple': SIMPLE,
+    'annual': ANNUAL,
+    'monthly': MONTHLY,
+    'daily': DAILY,
+    'continuous': CONTINUOUS,
+}
+
+# Relative error budget for the float path. The float result differs from the
+# Decimal result by a few ulps; anything this close to a half-cent is re-priced.
+TIE_TOLERANCE = 1e-13
+
+
+def calculate_carrying_cost(
+    amount: Decimal,
+    days_held: int,
+    annual_rate: Decimal,
+    compound_annually: bool = True
+) -> Decimal:
+    """
+    Calculate carrying cost for a single amount.
+
+    Args:
+        amount: Principal amount
+        days_held: Number of days the money is held
+        annual_rate: Annual interest rate as decimal (0.08 = 8%)
+        compound_annually: If True, compound; if False, simple interest
+
+    Returns:
+        Carrying cost (interest/opportunity cost)
+    """
+    if days_held <= 0:
+        return Decimal('0')
+
+    years = Decimal(str(days_held)) / Decimal('365')
+
+    if compound_annually:
+        # Compound interest: A = P(1 + r)^t - P
+        # Convert to float for exponentiation, then back to Decimal
+        factor = (1 + float(annual_rate)) ** float(years)
+        carrying_cost = amount * Decimal(str(factor - 1))
+    else:
+        # Simple interest: I = P * r * t
+        carrying_cost = amount * annual_rate * years
+
+    return carrying_cost.quantize(Decimal('0.01'))
+
+
+# ============================================================
+# Array construction
+# ============================================================
+
+def to_day_numbers(dates) -> np.ndarray:
+    """Convert ISO date strings or date objects to int64 day numbers."""
+    return np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+
+
+def day_number(d: date) -> int:
+    """Day number of a single date, on the same scale as to_day_numbers()."""
+    return int(np.datetime64(d, 'D').astype(np.int64))
+
+
+def encode_labels(labels) -> tuple:
+    """
+    Encode labels as integer codes in first-appearance order.
+
+    Returns (unique_labels, codes) so that unique_labels[codes[i]] == labels[i].
+    """
+    if len(labels) == 0:
+        return [], np.zeros(0, dtype=np.int64)
+
+    uniques, first, inverse = np.unique(
+        np.asarray(labels), return_index=True, return_inverse=True
+    )
+    order = np.argsort(first, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return uniques[order].tolist(), rank[inverse.ravel()]
+
+
+def entry_arrays(entries: list) -> dict:
+    """
+    Convert v_cost_entries rows into column arrays.
+
+    Returns:
+        {
+            'amount_cents': int64 array,
+            'paid_day': int64 array (day numbers),
+            'phases': [phase labels], 'phase_idx': int64 array,
+            'ce_ids': [ce_id labels], 'ce_idx': int64 array,
+            'ce_names': [ce_name per entry]
+        }
+    """
+    phases, phase_idx = encode_labels([e['phase'] or DEFAULT_PHASE for e in entries])
+    ce_ids, ce_idx = encode_labels([e['ce_id'] for e in entries])
+
+    return {
+        'amount_cents': to_cents([e['amount_total'] for e in entries]),
+        'paid_day': to_day_numbers([e['date_paid'] for e in entries]),
+        'phases': phases,
+        'phase_idx': phase_idx,
+        'ce_ids': ce_ids,
+        'ce_idx': ce_idx,
+        'ce_names': [e['ce_name'] for e in entries],
+    }
+
+
+def compounding_mode(info: dict) -> int:
+    """
+    Compounding mode code for a rates entry.
+
+    Uses the 'compounding' convention when set, otherwise the
+    compound_annually flag (True = annual, False = simple).
+    """
+    if info.get('compounding'):
+        return COMPOUNDING_MODES[info['compounding']]
+    return ANNUAL if info['compound'] else SIMPLE
+
+
+def phase_rate_arrays(phases: list, rates: dict) -> tuple:
+    """
+    Look up (rate, compounding mode) for each phase label.
+
+    Args:
+        phases: Phase labels (as returned by entry_arrays)
+        rates: {phase: {'rate': Decimal, 'compound': bool, 'compounding': str}} incl. '_default'
+
+    Returns:
+        (rate float64 array, mode int64 array), one value per phase
+    """
+    infos = [rates.get(phase, rates['_default']) for phase in phases]
+    rate = np.array([float(info['rate']) for info in infos], dtype=np.float64)
+    mode = np.array([compounding_mode(info) for info in infos], dtype=np.int64)
+    return rate, mode
+
+
+def phase_rate_matrix(phases: list, rates_by_model: list) -> tuple:
+    """
+    Stack phase rates for several finance models.
+
+    Returns:
+        (rate float64 array, mode int64 array), each shaped (models, phases)
+    """
+    pairs = [phase_rate_arrays(phases, rates) for rates in rates_by_model]
+    rate = np.array([p[0] for p in pairs], dtype=np.float64).reshape(len(pairs), len(phases))
+    mode = np.array([p[1] for p in pairs], dtype=np.int64).reshape(len(pairs), len(phases))
+    return rate, mode
+
+
+# ============================================================
+# Vectorized calculation
+# ============================================================
+
+def _mode_growth(mode: int, days_held, annual_rate) -> np.ndarray:
+    years = days_held / DAYS_PER_YEAR
+    if mode == SIMPLE:
+        return annual_rate * years
+    if mode == ANNUAL:
+        return np.power(1.0 + annual_rate, years) - 1.0
+    if mode == MONTHLY:
+        return np.power(1.0 + annual_rate / 12, 12 * years) - 1.0
+    if mode == DAILY:
+        return np.power(1.0 + annual_rate / DAYS_PER_YEAR, days_held) - 1.0
+    return np.expm1(annual_rate * years)
+
+
+def daily_growth_base(annual_rate: float, compounding: int) -> float:
+    """
+    Per-day growth base g for a compounding mode, so (1 + growth) = g ** days.
+    Not defined for SIMPLE (linear growth).
+    """
+    if compounding == ANNUAL:
+        return (1.0 + annual_rate) ** (1.0 / DAYS_PER_YEAR)
+    if compounding == MONTHLY:
+        return (1.0 + annual_rate / 12) ** (12.0 / DAYS_PER_YEAR)
+    if compounding == DAILY:
+        return 1.0 + annual_rate / DAYS_PER_YEAR
+    if compounding == CONTINUOUS:
+        return float(np.exp(annual_rate / DAYS_PER_YEAR))
+    raise ValueError('Simple interest has no per-day growth base')
+
+
+def growth_factors(days_held, annual_rate, compounding) -> np.ndarray:
+    """
+    Carrying cost per dollar for each compounding mode:
+        simple: r * d/365            annual:     (1 + r)^(d/365) - 1
+        monthly: (1 + r/12)^(12d/365) - 1
+        daily:  (1 + r/365)^d - 1    continuous: e^(r * d/365) - 1
+
+    Broadcasts over any array shapes; entries with days_held <= 0 get 0.
+    compounding may be a mode code array or a compound_annually bool array.
+    """
+    days_held = np.asarray(days_held)
+    annual_rate = np.asarray(annual_rate, dtype=np.float64)
+    mode = np.asarray(compounding).astype(np.int64)
+    modes = np.flatnonzero(np.bincount(mode.ravel(), minlength=len(COMPOUNDING_MODES)))
+
+    if len(modes) == 1:
+        growth = _mode_growth(int(modes[0]), days_held, annual_rate)
+    else:
+        growth = np.zeros(np.broadcast(days_held, annual_rate, mode).shape)
+        for m in modes.tolist():
+            growth = np.where(mode == m, _mode_growth(m, days_held, annual_rate), growth)
+    return np.where(days_held > 0, growth, 0.0)
+
+
+def scalar_carrying_cost(amount: Decimal, days_held: int, annual_rate: Decimal, compounding: int) -> Decimal:
+    """
+    Reference carrying cost for one amount under any compounding mode.
+
+    Simple and annual delegate to calculate_carrying_cost(); the other modes
+    follow the same float-factor-then-Decimal recipe.
+    """
+    if compounding in (SIMPLE, ANNUAL):
+        return calculate_carrying_cost(amount, days_held, annual_rate, compounding == ANNUAL)
+    if days_held <= 0:
+        return Decimal('0')
+    factor = float(_mode_growth(compounding, np.float64(days_held), np.float64(annual_rate)))
+    return (amount * Decimal(str(factor))).quantize(Decimal('0.01'))
+
+
+def round_cents(raw_cents, amount_cents, days_held, annual_rate, compounding, reprice=None) -> np.ndarray:
+    """
+    Round float carrying costs (in cents) to whole cents, exactly.
+
+    Values within float noise of a half-cent are re-priced with the scalar
+    Decimal formula so ties break exactly as calculate_carrying_cost() does.
+    All array arguments must broadcast to raw_cents.shape.
+
+    reprice, if given, replaces the scalar formula: called with the index
+    tuple of a near-tie, it returns the exact Decimal carrying cost.
+    """
+    raw_cents = np.asarray(raw_cents, dtype=np.float64)
+    cents = np.rint(raw_cents).astype(np.int64)
+
+    shape = raw_cents.shape
+    amount_cents = np.broadcast_to(amount_cents, shape)
+    days_held = np.broadcast_to(days_held, shape)
+    annual_rate = np.broadcast_to(annual_rate, shape)
+    compounding = np.broadcast_to(compounding, shape)
+
+    distance = np.abs(raw_cents - np.floor(raw_cents) - 0.5)
+    tolerance = (np.abs(raw_cents) + np.abs(amount_cents)) * TIE_TOLERANCE + 1e-9
+    suspect = (days_held > 0) & (distance < tolerance)
+
+    for i in zip(*np.nonzero(suspect)):
+        if reprice is not None:
+            exact = reprice(i)
+        else:
+            exact = scalar_carrying_cost(
+                Decimal(int(amount_cents[i])) / 100,
+                int(days_held[i]),
+                Decimal(repr(float(annual_rate[i]))),
+                int(compounding[i]),
+            )
+        cents[i] = int(exact * 100)
+
+    return cents
+
+
+def carrying_cost_cents(amount_cents, days_held, annual_rate, compounding) -> np.ndarray:
+    """
+    Carrying cost in whole cents for every entry.
+
+    Args:
+        amount_cents: int64 principal amounts in cents
+        days_held: Days from payment to project end
+        annual_rate: Annual rate per entry (0.08 = 8%)
+        compounding: Mode code per entry (or True = annual, False = simple)
+
+    Returns:
+        int64 array of carrying costs in cents (broadcast shape of the inputs)
+    """
+    growth = growth_factors(days_held, annual_rate, compounding)
+    raw = np.asarray(amount_cents) * growth
+    return round_cents(raw, amount_cents, days_held, annual_rate, compounding)
+
+
+# ============================================================
+# Growth factor lookup tables
+# ============================================================
+
+# (rate, mode) -> growth factors for days_held = 0, 1, 2, ...
+# Shared by every model priced in this process (portfolio runs reuse them).
+_GROWTH_TABLES = {}
+
+
+def growth_table(annual_rate: float, compounding: int, max_days: int) -> np.ndarray:
+    """
+    Cached growth factors for days_held 0..max_days at one (rate, mode).
+
+    Tables grow by doubling, so repeated lookups with slowly increasing
+    max_days stay amortized O(1) per day.
+    """
+    key = (float(annual_rate), int(compounding))
+    table = _GROWTH_TABLES.get(key)
+    if table is None or len(table) <= max_days:
+        size = max(max_days + 1, 2 * len(table) if table is not None else DAYS_PER_YEAR * 4)
+        table = growth_factors(np.arange(size), key[0], key[1])
+        _GROWTH_TABLES[key] = table
+    return table
+
+
+def clear_growth_tables() -> None:
+    """Drop all cached growth tables."""
+    _GROWTH_TABLES.clear()
+
+
+def phase_growth_table(phase_rate, phase_mode, max_days: int) -> np.ndarray:
+    """
+    Stack cached tables into an array indexed [..., phase, days_held].
+
+    phase_rate/phase_mode may be (phases,) or (models, phases).
+    """
+    phase_rate = np.asarray(phase_rate, dtype=np.float64)
+    phase_mode = np.asarray(phase_mode).astype(np.int64)
+    rows = [
+        growth_table(rate, mode, max_days)[:max_days + 1]
+        for rate, mode in zip(phase_rate.ravel().tolist(), phase_mode.ravel().tolist())
+    ]
+    return np.array(rows).reshape(phase_rate.shape + (max_days + 1,))
+
+
+def phase_growth_factors(days_held, phase_idx, phase_rate, phase_mode) -> np.ndarray:
+    """
+    Growth factors by table lookup instead of pow.
+
+    Args:
+        days_held, phase_idx: Per-entry integer arrays, length N
+        phase_rate, phase_mode: (phases,) -> result (N,), or
+                                (models, phases) -> result (N, models)
+    """
+    days = np.clip(np.asarray(days_held, dtype=np.int64), 0, None)
+    max_days = int(days.max()) if len(days) else 0
+    table = phase_growth_table(phase_rate, phase_mode, max_days)
+    if table.ndim == 2:
+        return table[phase_idx, days]
+    return table[:, phase_idx, days].T
+
+
+def phase_carrying_cost_cents(amount_cents, days_held, phase_idx, phase_rate, phase_mode) -> np.ndarray:
+    """
+    carrying_cost_cents() with per-phase rates, using cached growth tables.
+
+    phase_rate/phase_mode shaped (phases,) give an (N,) result;
+    (models, phases) give an (N, models) result.
+    """
+    growth = phase_growth_factors(days_held, phase_idx, phase_rate, phase_mode)
+    phase_rate = np.asarray(phase_rate)
+    phase_mode = np.asarray(phase_mode)
+    if phase_rate.ndim == 1:
+        amount, days = np.asarray(amount_cents), np.asarray(days_held)
+        rate, mode = phase_rate[phase_idx], phase_mode[phase_idx]
+    else:
+        amount, days = np.asarray(amount_cents)[:, None], np.asarray(days_held)[:, None]
+        rate, mode = phase_rate[:, phase_idx].T, phase_mode[:, phase_idx].T
+    return round_cents(amount * growth, amount, days, rate, mode)
+
+
+def carrying_cost_matrix(amount_cents, days_held, phase_idx, rate_matrix, mode_matrix) -> np.ndarray:
+    """
+    Carrying cost in cents for every (entry, finance model) pair.
+
+    Args:
+        amount_cents, days_held, phase_idx: Per-entry arrays, length N
+        rate_matrix, mode_matrix: (models, phases) arrays from phase_rate_matrix()
+
+    Returns:
+        int64 array shaped (N, models)
+    """
+    return phase_carrying_cost_cents(amount_cents, days_held, phase_idx, rate_matrix, mode_matrix)
+
+
+def grouped_sum(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Sum int64 cent values by group code."""
+    out = np.zeros(n_groups, dtype=np.int64)
+    np.add.at(out, codes, values)
+    return out
+
+
+def summarize(arrays: dict, carrying_cents: np.ndarray) -> dict:
+    """
+    Totals and by_phase / by_ce aggregates, all in cents.
+
+    Returns:
+        {
+            'total_base_cents': int,
+            'total_carrying_cents': int,
+            'by_phase': {phase: {'base': int, 'carrying': int}},
+            'by_ce': {ce_id: {'base': int, 'carrying': int}}
+        }
+    """
+    amount = arrays['amount_cents']
+    result = {
+        'total_base_cents': int(amount.sum()),
+        'total_carrying_cents': int(carrying_cents.sum()),
+    }
+
+    for key, labels, codes in (
+        ('by_phase', arrays['phases'], arrays['phase_idx']),
+        ('by_ce', arrays['ce_ids'], arrays['ce_idx']),
+    ):
+        base = grouped_sum(codes, amount, len(labels))
+        carrying = grouped_sum(codes, carrying_cents, len(labels))
+        result[key] = {
+            label: {'base': int(b), 'carrying': int(c)}
+            for label, b, c in zip(labels, base.tolist(), carrying.tolist())
+        }
+
+    return result
+
+
+# ============================================================
+# Time-varying rate curves
+# ============================================================
+#
+# A phase may carry dated rate segments (finance_assumptions rows with
+# effective_from / effective_to). Each day accrues at the rate in force that
+# day, so carrying cost integrates across segments:
+#     growth = exp(L[end] - L[paid]) - 1    (compounding modes)
+#     growth = S[end] - S[paid]             (simple interest)
+# where L / S are per-phase cumulative sums of daily log-growth / daily
+# simple interest over one shared day grid. With a flat rate this reduces to
+# exactly the growth_factors() formulas.
+
+def daily_log_growth(annual_rate, compounding: int) -> np.ndarray:
+    """One day's log-growth at annual_rate (or r/365 of linear growth for SIMPLE)."""
+    annual_rate = np.asarray(annual_rate, dtype=np.float64)
+    if compounding == SIMPLE or compounding == CONTINUOUS:
+        return annual_rate / DAYS_PER_YEAR
+    if compounding == ANNUAL:
+        return np.log1p(annual_rate) / DAYS_PER_YEAR
+    if compounding == MONTHLY:
+        return 12 / DAYS_PER_YEAR * np.log1p(annual_rate / 12)
+    return np.log1p(annual_rate / DAYS_PER_YEAR)
+
+
+def phase_rate_segments(phases: list, rates: dict) -> list:
+    """
+    Dated rate segments per phase label: [(from_day|None, to_day|None, rate)],
+    empty for flat-rate phases. Reads rates[phase]['segments'] (see build_rates()).
+    """
+    result = []
+    for phase in phases:
+        info = rates.get(phase, rates['_default'])
+        result.append([
+            (
+                day_number(seg['from']) if seg.get('from') else None,
+                day_number(seg['to']) if seg.get('to') else None,
+                float(seg['rate'])
+            )
+            for seg in info.get('segments') or []
+        ])
+    return result
+
+
+def daily_rates(base_rate: float, segments: list, first_day: int, n_days: int) -> np.ndarray:
+    """
+    Rate in force on each of days first_day .. first_day + n_days - 1 for
+    one phase (to-dates inclusive; base rate outside every segment).
+    """
+    daily = np.full(n_days, float(base_rate))
+    for from_day, to_day, rate in segments:
+        lo = 0 if from_day is None else max(from_day - first_day, 0)
+        hi = n_days if to_day is None else min(to_day - first_day + 1, n_days)
+        if lo < hi:
+            daily[lo:hi] = rate
+    return daily
+
+
+def rate_curves(phase_rate, phase_mode, segments: list, first_day: int, n_days: int) -> np.ndarray:
+    """
+    Cumulative growth curves, shaped (phases, n_days + 1); column k covers
+    days first_day .. first_day + k - 1. Segment to-dates are inclusive;
+    days outside every segment accrue at the phase's base rate.
+    """
+    daily = np.array([
+        daily_rates(rate, phase_segments, first_day, n_days)
+        for rate, phase_segments in zip(np.asarray(phase_rate, dtype=np.float64).tolist(), segments)
+    ]).reshape(len(segments), n_days)
+
+    curves = np.zeros((len(daily), n_days + 1))
+    for p, mode in enumerate(np.asarray(phase_mode).tolist()):
+        np.cumsum(daily_log_growth(daily[p], mode), out=curves[p, 1:])
+    return curves
+
+
+def scalar_curve_carrying_cost(amount: Decimal, paid_day: int, end_day: int, base_rate: float,
+                               compounding: int, segments: list) -> Decimal:
+    """
+    Reference carrying cost for one amount under piecewise rates: the growth
+    factor of each constant-rate run (growth_factors() formulas) is chained
+    in float, then applied in Decimal like scalar_carrying_cost().
+    """
+    if end_day <= paid_day:
+        return Decimal('0')
+    daily = daily_rates(base_rate, segments, paid_day, end_day - paid_day)
+    starts = np.flatnonzero(np.concatenate(([True], daily[1:] != daily[:-1])))
+    lengths = np.diff(np.append(starts, len(daily)))
+
+    factor = 0.0 if compounding == SIMPLE else 1.0
+    for start, length in zip(starts.tolist(), lengths.tolist()):
+        growth = float(_mode_growth(compounding, np.float64(length), np.float64(daily[start])))
+        factor = factor + growth if compounding == SIMPLE else factor * (1.0 + growth)
+    if compounding != SIMPLE:
+        factor -= 1.0
+    return (amount * Decimal(str(factor))).quantize(Decimal('0.01'))
+
+
+def curve_carrying_cost_cents(amount_cents, paid_day, phase_idx, end_day: int,
+                              phase_rate, phase_mode, segments: list) -> np.ndarray:
+    """
+    Carrying cost in whole cents under piecewise phase rates (see above).
+    Rounded half-even by round_cents(), with near-ties re-priced by
+    scalar_curve_carrying_cost(); payments on or after end_day cost nothing.
+    """
+    amount_cents = np.asarray(amount_cents)
+    paid_day = np.asarray(paid_day, dtype=np.int64)
+    if len(paid_day) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    first_day = min(int(paid_day.min()), end_day)
+    n_days = end_day - first_day
+    curves = rate_curves(phase_rate, phase_mode, segments, first_day, n_days)
+
+    paid_slot = np.clip(paid_day - first_day, 0, n_days)
+    delta = curves[phase_idx, n_days] - curves[phase_idx, paid_slot]
+    simple = np.asarray(phase_mode)[phase_idx] == SIMPLE
+    growth = np.where(simple, delta, np.expm1(delta))
+
+    phase_idx = np.asarray(phase_idx)
+    phase_rate, phase_mode = np.asarray(phase_rate, dtype=np.float64), np.asarray(phase_mode)
+    reprice = lambda i: scalar_curve_carrying_cost(
+        Decimal(int(amount_cents[i])) / 100, int(paid_day[i]), end_day,
+        float(phase_rate[phase_idx[i]]), int(phase_mode[phase_idx[i]]), segments[int(phase_idx[i])]
+    )
+    return round_cents(amount_cents * growth, amount_cents, end_day - paid_day,
+                       phase_rate[phase_idx], phase_mode[phase_idx], reprice)
+
+
+# ============================================================
+# Hierarchy rollup
+# ============================================================
+
+def hierarchy_arrays(nodes: list) -> dict:
+    """
+    Parent-index arrays for cost_elements_unified rows (each needs 'ce_id'
+    and 'parent_id'). Nodes whose parent isn't in the list are roots.
+
+    Returns:
+        {
+            'ce_ids': [ce_id per node], 'index': {ce_id: node},
+            'parent_idx': int64 array (-1 for roots),
+            'depth': int64 array (0 for roots),
+            'by_depth': [int64 node arrays, one per depth]
+        }
+    """
+    ce_ids = [n['ce_id'] for n in nodes]
+    index = {ce_id: i for i, ce_id in enumerate(ce_ids)}
+    parent_idx = np.array([index.get(n['parent_id'], -1) for n in nodes], dtype=np.int64)
+
+    # Walk every node up one level per pass: O(nodes x height), vectorized
+    depth = np.zeros(len(nodes), dtype=np.int64)
+    ancestor = parent_idx.copy()
+    for _ in range(len(nodes) + 1):
+        has_parent = ancestor >= 0
+        if not has_parent.any():
+            break
+        depth += has_parent
+        ancestor[has_parent] = parent_idx[ancestor[has_parent]]
+    else:
+        raise ValueError('cost element hierarchy contains a cycle')
+
+    order = np.argsort(depth, kind='stable')
+    bounds = np.searchsorted(depth[order], np.arange(int(depth.max(initial=0)) + 2))
+    return {
+        'ce_ids': ce_ids,
+        'index': index,
+        'parent_idx': parent_idx,
+        'depth': depth,
+        'by_depth': [order[bounds[d]:bounds[d + 1]] for d in range(len(bounds) - 1)],
+    }
+
+
+def node_values(hierarchy: dict, labels: list, codes: np.ndarray, values: np.ndarray) -> tuple:
+    """
+    Sum per-entry values onto hierarchy nodes by ce_id.
+
+    Args:
+        labels, codes: Entry ce_id labels and codes (entry_arrays() ce_ids / ce_idx)
+        values: int64 per-entry values
+
+    Returns:
+        (int64 per-node direct values, int64 total of entries whose ce_id isn't a node)
+    """
+    label_node = np.array([hierarchy['index'].get(label, -1) for label in labels], dtype=np.int64)
+    entry_node = label_node[codes] if len(codes) else np.zeros(0, dtype=np.int64)
+    mapped = entry_node >= 0
+    direct = grouped_sum(entry_node[mapped], values[mapped], len(hierarchy['ce_ids']))
+    return direct, int(values[~mapped].sum())
+
+
+def rollup(hierarchy: dict, direct: np.ndarray) -> np.ndarray:
+    """
+    Subtotal for every node: its own value plus all descendants'.
+
+    Accumulates child into parent in reverse topological order (deepest
+    level first), one vectorized scatter-add per level, so the whole
+    rollup is linear in the number of nodes.
+    """
+    totals = np.array(direct, copy=True)
+    parent_idx = hierarchy['parent_idx']
+    for nodes in reversed(hierarchy['by_depth'][1:]):
+        np.add.at(totals, parent_idx[nodes], totals[nodes])
+    return totals
+
+
+def synthetic_hierarchy(n_nodes: int, levels: int = 5, seed: int = 0) -> list:
+    """Random L1..L{levels} tree shaped like cost_elements_unified."""
+    rng = np.random.default_rng(seed)
+    per_level = np.maximum(1, (n_nodes * np.geomspace(1, 8, levels) / np.geomspace(1, 8, levels).sum()).astype(int))
+    nodes, previous = [], []
+    for level, count in enumerate(per_level.tolist(), 1):
+        current = [f"L{level}-{i}" for i in range(count)]
+        parents = rng.choice(previous, count) if previous else [None] * count
+        nodes.extend({'ce_id': ce_id, 'parent_id': parent} for ce_id, parent in zip(current, parents))
+        previous = current
+    return nodes
+
+
+def benchmark_rollup(n_nodes: int = 1_000_000, n_entries: int = 1_000_000, seed: int = 0) -> dict:
+    """Time hierarchy indexing and a full rollup over a synthetic tree."""
+    nodes = synthetic_hierarchy(n_nodes, seed=seed)
+    rng = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    hierarchy = hierarchy_arrays(nodes)
+    index_seconds = time.perf_counter() - start
+
+    labels = hierarchy['ce_ids']
+    codes = rng.integers(0, len(labels), n_entries)
+    values = rng.integers(100, 50_000_000, n_entries, dtype=np.int64)
+
+    start = time.perf_counter()
+    direct, unmapped = node_values(hierarchy, labels, codes, values)
+    join_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    totals = rollup(hierarchy, direct)
+    rollup_seconds = time.perf_counter() - start
+
+    roots = hierarchy['by_depth'][0]
+    return {
+        'nodes': len(nodes),
+        'entries': n_entries,
+        'index_seconds': index_seconds,
+        'join_seconds': join_seconds,
+        'rollup_seconds': rollup_seconds,
+        'balanced': int(totals[roots].sum()) + unmapped == int(values.sum()),
+    }
+
+
+# ============================================================
+# Sensitivity surface
+# ============================================================
+
+# Upper bound on (rate shifts x end shifts x entry groups) cells per block
+SURFACE_BLOCK_CELLS = 4_000_000
+
+
+def collapse_entries(amount_cents, paid_day, phase_idx) -> tuple:
+    """
+    Merge entries that share a (phase, paid_day) pair.
+
+    Carrying cost before rounding is linear in the amount, so entries paid on
+    the same day in the same phase can be priced as one.
+
+    Returns:
+        (group_amount_cents float64, group_day int64, group_phase int64)
+    """
+    paid_day = np.asarray(paid_day, dtype=np.int64)
+    phase_idx = np.asarray(phase_idx, dtype=np.int64)
+    if len(paid_day) == 0:
+        return np.zeros(0), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    first_day = paid_day.min()
+    span = paid_day.max() - first_day + 1
+    keys, inverse = np.unique(phase_idx * span + (paid_day - first_day), return_inverse=True)
+    weight = np.bincount(inverse.ravel(), weights=np.asarray(amount_cents, dtype=np.float64))
+    return weight, keys % span + first_day, keys // span
+
+
+def sensitivity_surface(
+    amount_cents,
+    paid_day,
+    phase_idx,
+    phase_rate,
+    phase_mode,
+    project_end_day: int,
+    rate_shifts,
+    end_shifts_days,
+    segments: list = None
+) -> dict:
+    """
+    Carrying cost over a grid of rate shifts x project-end shifts.
+
+    Args:
+        amount_cents, paid_day, phase_idx: Per-entry arrays
+        phase_rate, phase_mode: Per-phase arrays from phase_rate_arrays()
+        project_end_day: Day number of the unshifted project end
+        rate_shifts: Additive annual rate shifts (0.01 = +100 bps), length R
+        end_shifts_days: Project end shifts in days (+91 = ends 3 months later), length E
+        segments: Optional phase_rate_segments(); phases with dated segments
+            are priced on rate curves, with each shift added to every day's rate
+
+    Returns:
+        {
+            'total': (R, E) float64 carrying cost in cents (unrounded),
+            'by_phase': (R, E, phases) float64 carrying cost in cents (unrounded)
+        }
+    """
+    rate_shifts = np.asarray(rate_shifts, dtype=np.float64)
+    end_shifts_days = np.asarray(end_shifts_days, dtype=np.int64)
+    phase_rate = np.asarray(phase_rate, dtype=np.float64)
+    phase_mode = np.asarray(phase_mode).astype(np.int64)
+    n_rates, n_ends, n_phases = len(rate_shifts), len(end_shifts_days), len(phase_rate)
+
+    weight, group_day, group_phase = collapse_entries(amount_cents, paid_day, phase_idx)
+    end_day = project_end_day + end_shifts_days
+
+    # Rate curves for every shift, over one grid covering all payments and ends
+    curved = np.array([bool(s) for s in segments or []] or [False] * n_phases, dtype=bool)
+    if curved.any() and len(weight):
+        first_day = int(min(group_day.min(), end_day.min()))
+        n_days = int(max(end_day.max(), group_day.max())) - first_day
+        curves = np.stack([
+            rate_curves(phase_rate + shift, phase_mode,
+                        [[(lo, hi, rate + shift) for lo, hi, rate in s] for s in segments], first_day, n_days)
+            for shift in rate_shifts.tolist()
+        ])
+        end_slot = end_day - first_day
+
+    by_phase = np.zeros((n_rates, n_ends, n_phases))
+    block = max(1, SURFACE_BLOCK_CELLS // max(n_rates * n_ends, 1))
+    for lo in range(0, len(weight), block):
+        hi = lo + block
+        phases = group_phase[lo:hi]
+        days = (project_end_day + end_shifts_days)[:, None] - group_day[None, lo:hi]
+        rate = phase_rate[phases][None, :] + rate_shifts[:, None]
+        growth = growth_factors(
+            days[None, :, :], rate[:, None, :], phase_mode[phases][None, None, :]
+        )
+        on_curve = np.flatnonzero(curved[phases])
+        if len(on_curve):
+            p = phases[on_curve]
+            paid_slot = group_day[lo:hi][on_curve] - first_day
+            r = np.arange(n_rates)[:, None, None]
+            delta = curves[r, p[None, None, :], end_slot[None, :, None]] - curves[r, p[None, None, :], paid_slot[None, None, :]]
+            curve_growth = np.where(phase_mode[p] == SIMPLE, delta, np.expm1(delta))
+            growth[:, :, on_curve] = np.where(days[None, :, on_curve] > 0, curve_growth, 0.0)
+        # (R, E, K) x (K, P): weight each group and sum into its phase
+        phase_weights = np.zeros((len(phases), n_phases))
+        phase_weights[np.arange(len(phases)), phases] = weight[lo:hi]
+        by_phase += growth @ phase_weights
+
+    return {'total': by_phase.sum(axis=-1), 'by_phase': by_phase}
+
+
+# ============================================================
+# Benchmark
+# ============================================================
+
+# Baseline finance model rates (acquisition ... crosscutting), last one simple
+SYNTHETIC_PHASE_RATES = np.array([0.06, 0.07, 0.08, 0.09, 0.10, 0.09, 0.06, 0.07, 0.08])
+SYNTHETIC_PHASE_MODES = np.array([ANNUAL] * 8 + [SIMPLE])
+
+
+def synthetic_ledger(n_entries: int, seed: int = 0) -> dict:
+    """Random ledger arrays shaped like a large cost_entries table."""
+    rng = np.random.default_rng(seed)
+    phase_idx = rng.integers(0, len(SYNTHETIC_PHASE_RATES), n_entries)
+    return {
+        'amount_cents': rng.integers(100, 50_000_000, n_entries, dtype=np.int64),
+        'days_held': rng.integers(-30, 4 * DAYS_PER_YEAR, n_entries, dtype=np.int64),
+        'rate': SYNTHETIC_PHASE_RATES[phase_idx],
+        'compound': SYNTHETIC_PHASE_MODES[phase_idx],
+        'phase_idx': phase_idx,
+    }
+
+
+def benchmark(n_entries: int = 1_000_000, sample: int = 20_000, seed: int = 0) -> dict:
+    """
+    Time the vectorized engine on n_entries and check a sample against the
+    scalar Decimal path to the cent.
+    """
+    ledger = synthetic_ledger(n_entries, seed)
+
+    start = time.perf_counter()
+    carrying = carrying_cost_cents(
+        ledger['amount_cents'], ledger['days_held'], ledger['rate'], ledger['compound']
+    )
+    by_phase = grouped_sum(ledger['phase_idx'], carrying, 9)
+    vector_seconds = time.perf_counter() - start
+
+    clear_growth_tables()
+    start = time.perf_counter()
+    from_tables = phase_carrying_cost_cents(
+        ledger['amount_cents'], ledger['days_held'], ledger['phase_idx'],
+        SYNTHETIC_PHASE_RATES, SYNTHETIC_PHASE_MODES
+    )
+    table_seconds = time.perf_counter() - start
+
+    sample = min(sample, n_entries)
+    start = time.perf_counter()
+    reference = [
+        calculate_carrying_cost(
+            Decimal(int(ledger['amount_cents'][i])) / 100,
+            int(ledger['days_held'][i]),
+            Decimal(repr(float(ledger['rate'][i]))),
+            bool(ledger['compound'][i]),
+        )
+        for i in range(sample)
+    ]
+    scalar_seconds = time.perf_counter() - start
+
+    mismatches = sum(
+        1 for i, expected in enumerate(reference)
+        if int(expected * 100) != int(carrying[i])
+    )
+
+    return {
+        'entries': n_entries,
+        'vector_seconds': vector_seconds,
+        'table_seconds': table_seconds,
+        'table_mismatches': int((from_tables != carrying).sum()),
+        'scalar_sample': sample,
+        'scalar_seconds': scalar_seconds,
+        'scalar_seconds_extrapolated': scalar_seconds * n_entries / max(sample, 1),
+        'sample_mismatches': mismatches,
+        'total_carrying_cents': int(by_phase.sum()),
+    }
+
+
+def benchmark_sensitivity(n_entries: int = 10_000, grid: int = 40, seed: int = 0) -> dict:
+    """Time a grid x grid sensitivity surface over a synthetic ledger."""
+    ledger = synthetic_ledger(n_entries, seed)
+    paid_day = 4 * DAYS_PER_YEAR - ledger['days_held']
+
+    start = time.perf_counter()
+    surface = sensitivity_surface(
+        ledger['amount_cents'], paid_day, ledger['phase_idx'], SYNTHETIC_PHASE_RATES, SYNTHETIC_PHASE_MODES,
+        4 * DAYS_PER_YEAR, np.linspace(-0.02, 0.02, grid), np.arange(grid) * 7
+    )
+    seconds = time.perf_counter() - start
+
+    return {
+        'entries': n_entries,
+        'grid': grid,
+        'seconds': seconds,
+        'base_carrying_cents': float(surface['total'][grid // 2, 0]),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Vectorized carrying cost engine')
+    parser.add_argument('--benchmark', action='store_true', help='Run the synthetic benchmark')
+    parser.add_argument('--sensitivity', action='store_true', help='Benchmark a rate x schedule sensitivity grid')
+    parser.add_argument('--entries', type=int, default=1_000_000, help='Synthetic ledger size')
+    parser.add_argument('--sample', type=int, default=20_000, help='Entries checked against the scalar path')
+    parser.add_argument('--grid', type=int, default=40, help='Sensitivity grid size per axis')
+    parser.add_argument('--rollup', action='store_true', help='Benchmark a hierarchy rollup')
+    parser.add_argument('--nodes', type=int, default=1_000_000, help='Synthetic hierarchy size')
+    args = parser.parse_args()
+
+    if args.rollup:
+        stats = benchmark_rollup(args.nodes, args.entries)
+        print(f"Nodes:               {stats['nodes']:>12,}")
+        print(f"Entries:             {stats['entries']:>12,}")
+        print(f"Index hierarchy:     {stats['index_seconds']:>12.3f} s")
+        print(f"Join entries:        {stats['join_seconds']:>12.3f} s")
+        print(f"Rollup:              {stats['rollup_seconds']:>12.3f} s")
+        print(f"Roots sum to total:  {stats['balanced']!s:>12}")
+    elif args.sensitivity:
+        stats = benchmark_sensitivity(args.entries, args.grid)
+        print(f"Entries:             {stats['entries']:>12,}")
+        print(f"Grid:                {stats['grid']:>5} x {stats['grid']}")
+        print(f"Surface:             {stats['seconds']:>12.3f} s")
+    elif not args.benchmark:
+        parser.print_help()
+    else:
+        stats = benchmark(args.entries, args.sample)
+        speedup = stats['scalar_seconds_extrapolated'] / max(stats['vector_seconds'], 1e-9)
+        print(f"Entries:             {stats['entries']:>12,}")
+        print(f"Vectorized:          {stats['vector_seconds']:>12.3f} s")
+        print(f"Lookup tables:       {stats['table_seconds']:>12.3f} s ({stats['table_mismatches']} mismatches)")
+        print(f"Scalar (sample {stats['scalar_sample']:,}): {stats['scalar_seconds']:>8.3f} s")
+        print(f"Scalar (projected):  {stats['scalar_seconds_extrapolated']:>12.3f} s")
+        print(f"Speedup:             {speedup:>12.1f}x")
+        print(f"Sample mismatches:   {stats['sample_mismatches']:>12}")
+        print(f"Total carrying:      ${stats['total_carrying_cents'] / 100:>15,.2f}")
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Incremental carrying cost totals for a ledger that is being edited.
+
+Rather than re-pricing the whole ledger after every edit, keep per-phase
+aggregates keyed by payment day:
+- amount:    sum of amounts
+- weighted:  compounding phases: sum of A * g^(origin - d)
+             simple phases:      sum of A * (d - origin)
+
+g is the phase's per-day growth base (daily_growth_base(): (1 + r)^(1/365)
+for annual compounding, (1 + r/12)^(12/365) monthly, 1 + r/365 daily,
+e^(r/365) continuous).
+
+For a project end E, the carrying cost of every payment made before E is then
+closed-form:
+    compound: g^(E - origin) * weighted - amount
+    simple:   r / 365 * ((E - origin) * amount - weighted)
+
+Insert/update/delete change the cached phase totals in O(1) and update the
+per-day prefix sums (Fenwick trees) in O(log D), D being the ledger's day
+span. Moving the project end re-reads one prefix sum per phase and rescales,
+O(phases x log D). Totals are unrounded: each entry may differ from the
+cent-rounded full calculation by at most half a cent.
+
+Usage:
+    ledger = new_ledger(rates, project_end)
+    load_entries(ledger, entries)
+    upsert_entry(ledger, entry['id'], entry)
+    move_project_end(ledger, date(2025, 3, 31))
+    ledger_totals(ledger)
+"""
+
+from datetime import date
+from typing import Optional
+
+import numpy as np
+
+from carrying_cost_engine import (
+    DAYS_PER_YEAR, DEFAULT_PHASE, SIMPLE,
+    compounding_mode, daily_growth_base, day_number, growth_factors
+)
+from money import parse_cents
+
+# Extra days allocated on each side of the ledger's day span
+SPAN_MARGIN_DAYS = 2 * DAYS_PER_YEAR
+
+
+# ============================================================
+# Fenwick (binary indexed) prefix sums
+# ============================================================
+
+def fenwick_build(values: np.ndarray) -> np.ndarray:
+    """Build a Fenwick tree from per-slot values in O(n)."""
+    tree = np.array(values, dtype=np.float64)
+    n = len(tree)
+    for i in range(1, n + 1):
+        parent = i + (i & -i)
+        if parent <= n:
+            tree[parent - 1] += tree[i - 1]
+    return tree
+
+
+def fenwick_add(tree: np.ndarray, slot: int, value: float) -> None:
+    """Add value at slot (0-based)."""
+    i = slot + 1
+    n = len(tree)
+    while i <= n:
+        tree[i - 1] += value
+        i += i & -i
+
+
+def fenwick_prefix(tree: np.ndarray, slot: int) -> float:
+    """Sum of slots 0..slot inclusive (0 if slot < 0)."""
+    i = min(slot + 1, len(tree))
+    total = 0.0
+    while i > 0:
+        total += tree[i - 1]
+        i -= i & -i
+    return float(total)
+
+
+# ============================================================
+# Ledger state
+# ============================================================
+
+def new_ledger(rates: dict, project_end: date, origin: Optional[date] = None, span_days: int = 0) -> dict:
+    """
+    Create an empty incremental ledger.
+
+    Args:
+        rates: {phase: {'rate': Decimal, 'compound': bool}} incl. '_default'
+            (optional 'compounding' convention per phase)
+        project_end: Date carrying costs run to
+        origin: First day covered by the prefix sums (default: 2 years before project_end)
+        span_days: Days covered from origin (default: 4 years)
+
+    Raises:
+        ValueError: If any phase has dated rate segments; the per-day growth
+            base assumes one rate per phase
+    """
+    curved = sorted(phase for phase, info in rates.items() if info.get('segments'))
+    if curved:
+        raise ValueError(f"Incremental ledger needs flat phase rates; dated rate segments on: {', '.join(curved)}")
+
+    end_day = day_number(project_end)
+    origin_day = day_number(origin) if origin else end_day - SPAN_MARGIN_DAYS
+    return {
+        'rates': rates,
+        'end_day': end_day,
+        'origin_day': origin_day,
+        'span_days': max(span_days, end_day - origin_day + SPAN_MARGIN_DAYS),
+        'entries': {},   # entry_id -> (phase, paid_day, amount_cents)
+        'phases': {},    # phase -> aggregates, see _new_phase()
+    }
+
+
+def _new_phase(ledger: dict, phase: str) -> dict:
+    info = ledger['rates'].get(phase, ledger['rates']['_default'])
+    rate = float(info['rate'])
+    mode = compounding_mode(info)
+    return {
+        'rate': rate,
+        'mode': mode,
+        'base': None if mode == SIMPLE else daily_growth_base(rate, mode),
+        'amount': np.zeros(ledger['span_days']),
+        'weighted': np.zeros(ledger['span_days']),
+        'base_cents': 0,
+        'carrying_cents': 0.0,
+    }
+
+
+def _weighted_value(agg: dict, ledger: dict, paid_day: int, amount_cents: int) -> float:
+    offset = paid_day - ledger['origin_day']
+    if agg['mode'] != SIMPLE:
+        return amount_cents * agg['base'] ** -offset
+    return amount_cents * offset
+
+
+def _entry_carrying(agg: dict, ledger: dict, paid_day: int, amount_cents: int) -> float:
+    growth = growth_factors(ledger['end_day'] - paid_day, agg['rate'], agg['mode'])
+    return amount_cents * float(growth)
+
+
+def _phase_carrying(agg: dict, ledger: dict) -> float:
+    """Closed-form carrying cost (cents) of all payments before the project end."""
+    last_slot = ledger['end_day'] - 1 - ledger['origin_day']
+    amount = fenwick_prefix(agg['amount'], last_slot)
+    weighted = fenwick_prefix(agg['weighted'], last_slot)
+    span = ledger['end_day'] - ledger['origin_day']
+    if agg['mode'] != SIMPLE:
+        return agg['base'] ** span * weighted - amount
+    return agg['rate'] / DAYS_PER_YEAR * (span * amount - weighted)
+
+
+def _rebuild(ledger: dict, origin_day: int, span_days: int) -> None:
+    """Re-lay the prefix sums over a wider day range (rare, O(n + D))."""
+    ledger['origin_day'] = origin_day
+    ledger['span_days'] = span_days
+    load_entries(ledger, [])
+
+
+def _ensure_covered(ledger: dict, paid_day: int) -> None:
+    first = ledger['origin_day']
+    last = first + ledger['span_days'] - 1
+    if first <= paid_day <= last:
+        return
+    new_first = min(first, paid_day - SPAN_MARGIN_DAYS)
+    new_last = max(last, paid_day + SPAN_MARGIN_DAYS, ledger['end_day'])
+    _rebuild(ledger, new_first, new_last - new_first + 1)
+
+
+def load_entries(ledger: dict, entries: list) -> None:
+    """
+    Bulk-load v_cost_entries rows (each needs 'id', 'phase', 'date_paid',
+    'amount_total') and rebuild all aggregates in O(n + D).
+    """
+    for e in entries:
+        ledger['entries'][e['id']] = (
+            e['phase'] or DEFAULT_PHASE,
+            day_number(date.fromisoformat(str(e['date_paid']))),
+            parse_cents(e['amount_total']),
+        )
+
+    if ledger['entries']:
+        days = [paid_day for _, paid_day, _ in ledger['entries'].values()]
+        first = min(ledger['origin_day'], min(days) - SPAN_MARGIN_DAYS)
+        last = max(ledger['origin_day'] + ledger['span_days'] - 1,
+                   max(days) + SPAN_MARGIN_DAYS, ledger['end_day'])
+        ledger['origin_day'], ledger['span_days'] = first, last - first + 1
+
+    by_phase = {}
+    for phase, paid_day, amount_cents in ledger['entries'].values():
+        by_phase.setdefault(phase, []).append((paid_day, amount_cents))
+
+    ledger['phases'] = {}
+    for phase, rows in by_phase.items():
+        agg = _new_phase(ledger, phase)
+        slots = np.array([d for d, _ in rows]) - ledger['origin_day']
+        amounts = np.array([a for _, a in rows], dtype=np.float64)
+        offsets = slots.astype(np.float64)
+        if agg['mode'] != SIMPLE:
+            weighted = amounts * np.power(agg['base'], -offsets)
+        else:
+            weighted = amounts * offsets
+
+        amount_slots = np.zeros(ledger['span_days'])
+        weighted_slots = np.zeros(ledger['span_days'])
+        np.add.at(amount_slots, slots, amounts)
+        np.add.at(weighted_slots, slots, weighted)
+        agg['amount'] = fenwick_build(amount_slots)
+        agg['weighted'] = fenwick_build(weighted_slots)
+        agg['base_cents'] = int(sum(a for _, a in rows))
+        agg['carrying_cents'] = _phase_carrying(agg, ledger)
+        ledger['phases'][phase] = agg
+
+
+def _apply(ledger: dict, phase: str, paid_day: int, amount_cents: int, sign: int) -> None:
+    agg = ledger['phases'].get(phase)
+    if agg is None:
+        agg = ledger['phases'][phase] = _new_phase(ledger, phase)
+
+    slot = paid_day - ledger['origin_day']
+    fenwick_add(agg['amount'], slot, sign * amount_cents)
+    fenwick_add(agg['weighted'], slot, sign * _weighted_value(agg, ledger, paid_day, amount_cents))
+    agg['base_cents'] += sign * amount_cents
+    agg['carrying_cents'] += sign * _entry_carrying(agg, ledger, paid_day, amount_cents)
+
+
+def upsert_entry(ledger: dict, entry_id: str, entry: dict) -> None:
+    """Insert or update one entry; adjusts totals in O(1) (+ O(log D) prefix sums)."""
+    paid_day = day_number(date.fromisoformat(str(entry['date_paid'])))
+    _ensure_covered(ledger, paid_day)
+
+    if entry_id in ledger['entries']:
+        delete_entry(ledger, entry_id)
+
+    row = (entry['phase'] or DEFAULT_PHASE, paid_day, parse_cents(entry['amount_total']))
+    ledger['entries'][entry_id] = row
+    _apply(ledger, *row, sign=1)
+
+
+def delete_entry(ledger: dict, entry_id: str) -> None:
+    """Remove one entry; adjusts totals in O(1) (+ O(log D) prefix sums)."""
+    row = ledger['entries'].pop(entry_id, None)
+    if row is not None:
+        _apply(ledger, *row, sign=-1)
+
+
+def move_project_end(ledger: dict, project_end: date) -> None:
+    """Move the project end date; O(phases x log D) closed-form rescale."""
+    end_day = day_number(project_end)
+    if end_day >= ledger['origin_day'] + ledger['span_days']:
+        ledger['end_day'] = end_day
+        _rebuild(ledger, ledger['origin_day'], end_day - ledger['origin_day'] + SPAN_MARGIN_DAYS)
+        return
+
+    ledger['end_day'] = end_day
+    for agg in ledger['phases'].values():
+        agg['carrying_cents'] = _phase_carrying(agg, ledger)
+
+
+def ledger_totals(ledger: dict) -> dict:
+    """
+    Current totals in dollars.
+
+    Returns:
+        {
+            'total_base_cost': float,
+            'total_carrying_cost': float,
+            'total_with_carrying': float,
+            'by_phase': {phase: {'base': float, 'carrying': float}},
+            'entry_count': int
+        }
+    """
+    by_phase = {
+        phase: {'base': agg['base_cents'] / 100, 'carrying': agg['carrying_cents'] / 100}
+        for phase, agg in ledger['phases'].items()
+        if agg['base_cents'] or agg['carrying_cents']
+    }
+    total_base = sum(agg['base_cents'] for agg in ledger['phases'].values()) / 100
+    total_carrying = sum(agg['carrying_cents'] for agg in ledger['phases'].values()) / 100
+    return {
+        'total_base_cost': total_base,
+        'total_carrying_cost': total_carrying,
+        'total_with_carrying': total_base + total_carrying,
+        'by_phase': by_phase,
+        'entry_count': len(ledger['entries']),
+    }
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo schedule-risk simulation for carrying costs.
+
+Samples R1 schedule slips and R2 rate premiums from a risk_models preset and
+prices the cost-entry timeline once per draw:
+- Schedule slip s stretches the project timeline from project start, so every
+  payment's holding period to project end grows by (1 + s)
+- Rate premium p is added to every phase rate
+
+Both are drawn from triangular distributions on [0, 2 x preset] with the
+preset as the mode, so the mean draw equals the Dashboard's deterministic R1/R2
+assumption while the tails show what a bad schedule or rate market costs.
+
+Draws are vectorized in blocks and can be split across a process pool.
+No Supabase dependency; see simulate_carrying_cost_risk() in
+calculate_carrying_costs.py for the database-backed entry point.
+
+    python carrying_cost_montecarlo.py --benchmark --draws 100000 --workers 4
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from carrying_cost_engine import (
+    DAYS_PER_YEAR, SYNTHETIC_PHASE_MODES, SYNTHETIC_PHASE_RATES,
+    collapse_entries, growth_factors, synthetic_ledger
+)
+
+# Upper bound on (draws x entry groups) cells per block
+DRAW_BLOCK_CELLS = 4_000_000
+
+# Draws are seeded in this many chunks regardless of the worker count
+SEED_CHUNKS = 16
+
+
+def triangular_draws(rng: np.random.Generator, mode: float, n_draws: int) -> np.ndarray:
+    """Draws on [0, 2 x mode] peaking at mode (mean = mode). Zero mode gives zeros."""
+    if mode <= 0:
+        return np.zeros(n_draws)
+    return rng.triangular(0.0, mode, 2.0 * mode, n_draws)
+
+
+def sample_risk_draws(
+    schedule_variance_pct: float,
+    rate_premium_bps: float,
+    n_draws: int,
+    rng: np.random.Generator
+) -> tuple:
+    """
+    Sample (schedule slip fraction, annual rate premium) pairs for a risk preset.
+
+    Returns:
+        (slip float64 array, premium float64 array), each length n_draws
+    """
+    slip = triangular_draws(rng, float(schedule_variance_pct) / 100, n_draws)
+    premium = triangular_draws(rng, float(rate_premium_bps) / 10000, n_draws)
+    return slip, premium
+
+
+def price_draws(weight, days_held, rate, compounding, slip, premium) -> np.ndarray:
+    """
+    Carrying cost (cents, unrounded) for each (slip, premium) draw.
+
+    Args:
+        weight: Amount in cents per entry group
+        days_held: Unslipped days from payment to project end per group
+        rate, compounding: Phase rate and compounding mode per group
+        slip, premium: Per-draw schedule slip fraction and rate premium
+
+    Returns:
+        float64 array, one total per draw
+    """
+    weight = np.asarray(weight, dtype=np.float64)
+    days_held = np.asarray(days_held, dtype=np.float64)
+    rate = np.asarray(rate, dtype=np.float64)
+    compounding = np.asarray(compounding).astype(np.int64)
+
+    totals = np.empty(len(slip))
+    block = max(1, DRAW_BLOCK_CELLS // max(len(weight), 1))
+    for lo in range(0, len(slip), block):
+        hi = lo + block
+        growth = growth_factors(
+            days_held[None, :] * (1.0 + slip[lo:hi, None]),
+            rate[None, :] + premium[lo:hi, None],
+            compounding[None, :],
+        )
+        totals[lo:hi] = growth @ weight
+    return totals
+
+
+def _simulate_chunk(task: tuple) -> np.ndarray:
+    """Process-pool worker: sample and price one chunk of draws."""
+    weight, days_held, rate, compounding, schedule_variance_pct, rate_premium_bps, n_draws, seed = task
+    rng = np.random.default_rng(seed)
+    slip, premium = sample_risk_draws(schedule_variance_pct, rate_premium_bps, n_draws, rng)
+    return price_draws(weight, days_held, rate, compounding, slip, premium)
+
+
+def simulate(
+    weight,
+    days_held,
+    rate,
+    compounding,
+    schedule_variance_pct: float,
+    rate_premium_bps: float,
+    n_draws: int = 100_000,
+    seed=None,
+    workers: int = 1
+) -> np.ndarray:
+    """
+    Carrying cost distribution (cents, unrounded) over n_draws risk draws.
+
+    Draws are split into SEED_CHUNKS chunks, each with an independent child
+    seed, and the chunks are spread over the pool, so results for a given
+    seed are the same for any worker count. With workers=1 everything runs
+    in-process.
+    """
+    n_chunks = min(SEED_CHUNKS, max(1, n_draws))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    sizes = [n_draws // n_chunks + (1 if i < n_draws % n_chunks else 0) for i in range(n_chunks)]
+    tasks = [
+        (weight, days_held, rate, compounding, schedule_variance_pct, rate_premium_bps, size, child)
+        for size, child in zip(sizes, seeds)
+    ]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, tasks))
+    else:
+        chunks = [_simulate_chunk(task) for task in tasks]
+
+    return np.concatenate(chunks)
+
+
+def summarize_draws(cents: np.ndarray) -> dict:
+    """Distribution summary in dollars: mean, std, P10/P50/P90, min, max."""
+    dollars = np.asarray(cents) / 100
+    p10, p50, p90 = np.percentile(dollars, [10, 50, 90])
+    return {
+        'draws': len(dollars),
+        'mean': float(dollars.mean()),
+        'std': float(dollars.std()),
+        'p10': float(p10),
+        'p50': float(p50),
+        'p90': float(p90),
+        'min': float(dollars.min()),
+        'max': float(dollars.max()),
+    }
+
+
+# ============================================================
+# Benchmark
+# ============================================================
+
+def benchmark(n_entries: int = 1_000, n_draws: int = 100_000, workers: int = 1, seed: int = 0) -> dict:
+    """Time a High Risk (25%, 150 bps) simulation over a synthetic ledger."""
+    ledger = synthetic_ledger(n_entries, seed)
+    paid_day = 4 * DAYS_PER_YEAR - ledger['days_held']
+    weight, group_day, group_phase = collapse_entries(
+        ledger['amount_cents'], paid_day, ledger['phase_idx']
+    )
+
+    start = time.perf_counter()
+    cents = simulate(
+        weight, 4 * DAYS_PER_YEAR - group_day,
+        SYNTHETIC_PHASE_RATES[group_phase], SYNTHETIC_PHASE_MODES[group_phase], 25, 150, n_draws=n_draws, seed=seed, workers=workers
+    )
+    seconds = time.perf_counter() - start
+
+    return {'entries': n_entries, 'groups': len(weight), 'seconds': seconds, **summarize_draws(cents)}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Monte Carlo schedule-risk simulation')
+    parser.add_argument('--benchmark', action='store_true', help='Run the synthetic benchmark')
+    parser.add_argument('--entries', type=int, default=1_000, help='Synthetic ledger size')
+    parser.add_argument('--draws', type=int, default=100_000, help='Number of risk draws')
+    parser.add_argument('--workers', type=int, default=1, help='Process pool size')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+    else:
+        stats = benchmark(args.entries, args.draws, args.workers)
+        print(f"Entries:   {stats['entries']:>12,} ({stats['groups']:,} date/phase groups)")
+        print(f"Draws:     {stats['draws']:>12,}")
+        print(f"Workers:   {args.workers:>12}")
+        print(f"Time:      {stats['seconds']:>12.3f} s")
+        print(f"Mean:      ${stats['mean']:>15,.2f}")
+        print(f"P50:       ${stats['p50']:>15,.2f}")
+        print(f"P90:       ${stats['p90']:>15,.2f}")
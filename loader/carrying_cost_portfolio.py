@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Portfolio carrying cost runner: every cost/time model under every finance model.
+
+Instead of one CLI run per (cost model, finance model) pair:
+1. Bulk-read all cost_time_models, finance models + assumptions, and every
+   v_cost_entries row (paged, a handful of queries in total)
+2. Partition the entries by cost_time_model_id
+3. Price each partition against all finance models at once (one
+   carrying_cost_matrix per cost model), spread over a process pool
+4. Write the (cost model x finance model) summary cube to the
+   carrying_cost_portfolio table, or to a Parquet file
+
+Usage:
+    python carrying_cost_portfolio.py                      # write to Supabase
+    python carrying_cost_portfolio.py --parquet out.parquet --workers 4
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from calculate_carrying_costs import (
+    PAGE_SIZE, supabase, fetch_all_rows, get_finance_models, price_finance_models,
+    resolve_project_dates, summary_totals
+)
+
+# Columns the engine needs from v_cost_entries
+ENTRY_COLUMNS = 'id, cost_time_model_id, ce_id, ce_name, phase, date_paid, amount_total'
+
+
+def load_portfolio() -> dict:
+    """
+    Bulk-read everything the portfolio run needs.
+
+    Returns:
+        {
+            'cost_models': [cost_time_models rows],
+            'finance_model_ids': [id, ...],
+            'finance_models': {id: {'name': str, 'rates': {...}}},
+            'partitions': {cost_time_model_id: [v_cost_entries rows]}
+        }
+    """
+    cost_models = fetch_all_rows('cost_time_models', 'id, name, project_start_date, project_end_date')
+    finance_model_ids = [row['id'] for row in fetch_all_rows('finance_models', 'id')]
+    finance_models = get_finance_models(finance_model_ids) if finance_model_ids else {}
+
+    partitions = {model['id']: [] for model in cost_models}
+    for entry in fetch_all_rows('v_cost_entries', ENTRY_COLUMNS):
+        partitions.setdefault(entry['cost_time_model_id'], []).append(entry)
+
+    # The engine expects entries in date order
+    for entries in partitions.values():
+        entries.sort(key=lambda e: e['date_paid'])
+
+    return {
+        'cost_models': cost_models,
+        'finance_model_ids': finance_model_ids,
+        'finance_models': finance_models,
+        'partitions': partitions,
+    }
+
+
+def _price_partition(task: tuple) -> tuple:
+    """Process-pool worker: price one cost model under every finance model."""
+    cost_time_model_id, entries, project_end, rates_by_model = task
+    start = time.perf_counter()
+    base_cents, carrying_cents = price_finance_models(entries, project_end, rates_by_model)
+    return cost_time_model_id, base_cents, carrying_cents, time.perf_counter() - start
+
+
+def run_portfolio(portfolio: dict, workers: int = 1, verbose: bool = True) -> list[dict]:
+    """
+    Price every (cost model, finance model) pair.
+
+    Args:
+        portfolio: Output of load_portfolio()
+        workers: Process pool size (1 = run in-process)
+        verbose: Print one progress line per cost model
+
+    Returns:
+        List of summary rows, one per pair (see carrying_cost_portfolio table)
+    """
+    fm_ids = portfolio['finance_model_ids']
+    rates_by_model = [portfolio['finance_models'][fm_id]['rates'] for fm_id in fm_ids]
+    models_by_id = {model['id']: model for model in portfolio['cost_models']}
+
+    tasks = []
+    dates = {}
+    for ctm_id, entries in portfolio['partitions'].items():
+        dates[ctm_id] = resolve_project_dates(models_by_id.get(ctm_id), entries)
+        tasks.append((ctm_id, entries, dates[ctm_id][1], rates_by_model))
+
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        priced = (future.result() for future in as_completed(
+            [pool.submit(_price_partition, task) for task in tasks]
+        ))
+    else:
+        pool = None
+        priced = (_price_partition(task) for task in tasks)
+
+    calculated_at = datetime.now(timezone.utc).isoformat()
+    rows = []
+    try:
+        for done, (ctm_id, base_cents, carrying_cents, seconds) in enumerate(priced, 1):
+            model = models_by_id.get(ctm_id, {})
+            entry_count = len(portfolio['partitions'][ctm_id])
+            if verbose:
+                print(f"  [{done}/{len(tasks)}] {model.get('name', ctm_id)[:40]:40s} "
+                      f"{entry_count:>8,} entries x {len(fm_ids)} finance models  {seconds:.3f} s")
+
+            project_start, project_end = dates[ctm_id]
+            for fm_id, carrying in zip(fm_ids, carrying_cents):
+                rows.append({
+                    'cost_time_model_id': ctm_id,
+                    'finance_model_id': fm_id,
+                    'cost_model_name': model.get('name', ctm_id),
+                    'finance_model_name': portfolio['finance_models'][fm_id]['name'],
+                    'entry_count': entry_count,
+                    'project_start': project_start.isoformat(),
+                    'project_end': project_end.isoformat(),
+                    **summary_totals(base_cents, carrying),
+                    'calculated_at': calculated_at,
+                })
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return rows
+
+
+def write_summary_table(rows: list[dict]) -> None:
+    """Upsert summary rows into carrying_cost_portfolio, PAGE_SIZE rows per request."""
+    for lo in range(0, len(rows), PAGE_SIZE):
+        supabase.table('carrying_cost_portfolio').upsert(
+            rows[lo:lo + PAGE_SIZE], on_conflict='cost_time_model_id,finance_model_id'
+        ).execute()
+
+
+def write_parquet(rows: list[dict], path: str) -> None:
+    """Write summary rows to a Parquet file (needs pyarrow)."""
+    import pandas as pd
+
+    frame = pd.DataFrame(rows)
+    for column in ('project_start', 'project_end'):
+        frame[column] = pd.to_datetime(frame[column]).dt.date
+    frame['calculated_at'] = pd.to_datetime(frame['calculated_at'])
+    frame.to_parquet(path, index=False)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Carrying cost for every cost model x finance model')
+    parser.add_argument('--workers', type=int, default=1, help='Process pool size')
+    parser.add_argument('--parquet', metavar='PATH', help='Write a Parquet file instead of the summary table')
+    parser.add_argument('--quiet', action='store_true', help='No per-model progress lines')
+    args = parser.parse_args()
+
+    print(f"{'='*60}")
+    print("CARRYING COST PORTFOLIO RUN")
+    print(f"{'='*60}")
+
+    start = time.perf_counter()
+    portfolio = load_portfolio()
+    load_seconds = time.perf_counter() - start
+    entry_count = sum(len(entries) for entries in portfolio['partitions'].values())
+    print(f"Loaded {len(portfolio['partitions'])} cost models, "
+          f"{len(portfolio['finance_model_ids'])} finance models, "
+          f"{entry_count:,} entries in {load_seconds:.2f} s")
+
+    start = time.perf_counter()
+    rows = run_portfolio(portfolio, workers=args.workers, verbose=not args.quiet)
+    price_seconds = time.perf_counter() - start
+    print(f"Priced {len(rows):,} pairs in {price_seconds:.2f} s ({args.workers} workers)")
+
+    start = time.perf_counter()
+    if not rows:
+        print("Nothing to write")
+    elif args.parquet:
+        write_parquet(rows, args.parquet)
+        print(f"Wrote {args.parquet} in {time.perf_counter() - start:.2f} s")
+    else:
+        write_summary_table(rows)
+        print(f"Upserted carrying_cost_portfolio in {time.perf_counter() - start:.2f} s")
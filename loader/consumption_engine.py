@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Household consumption as a matrix product.
+
+consumption_factors holds per-use water / kWh / therms for each activity;
+each row also says how often it happens:
+    frequency_column:  lifestyle_models column with uses per day / week / month
+                       (null = a flat monthly load, used once a month)
+    frequency_unit:    'day' | 'week' | 'month' (periods per month below)
+    applies_to:        'per_person' | 'per_adult' | 'per_child' | 'per_household'
+    multiplier_column: lifestyle_models column scaling a flat load
+                       (heating_multiplier, cooling_multiplier)
+
+So the factors table is an (activities x 3) matrix, every (occupancy,
+lifestyle) pair is an activity-frequency vector, and the monthly usage of
+every pair is one matrix multiply:
+    uses[o, l, a] = who[o, a] * frequency[l, a] * periods[a]
+    consumption[o, l, :] = uses[o, l, :] @ factors[:, :]
+A new activity is a new consumption_factors row (plus a lifestyle column
+if it has its own frequency); no code changes.
+
+Per-use counts are formed in the Dashboard's operation order. The matrix
+product sums activities in BLAS order, which can differ from the
+Dashboard's running totals in the last bit and so flip a value sitting
+exactly on a rounding half; consumption(..., ordered=True) keeps the
+running-total order (one vectorized add per activity) for results that
+must equal the browser's.
+
+No Supabase dependency.
+
+    python consumption_engine.py --benchmark
+"""
+
+import time
+
+import numpy as np
+
+RESOURCE_COLUMNS = ('water_gallons', 'electric_kwh', 'gas_therms')
+
+# Dashboard conversions to uses per month
+WEEKS_PER_MONTH = 4.33
+DAYS_PER_MONTH = 30
+PERIODS_PER_MONTH = {'day': DAYS_PER_MONTH, 'week': WEEKS_PER_MONTH, 'month': 1}
+
+# applies_to -> occupancy column counting the people (None = once per household)
+APPLIES_TO_COLUMNS = {
+    'per_person': 'total_occupants',
+    'per_adult': 'adults',
+    'per_child': 'children',
+    'per_household': None,
+}
+
+# Frequency columns of the seed activities, for databases without the
+# frequency_column / multiplier_column migration or rows with both NULL
+# (matches the Dashboard's former hand-coded formulas; computer hours are
+# counted per adult). Mirrored by SEED_ACTIVITIES in Dashboard.tsx.
+SEED_ACTIVITIES = {
+    'shower': {'frequency_column': 'showers_per_week', 'applies_to': 'per_person', 'frequency_unit': 'week'},
+    'bath': {'frequency_column': 'baths_per_week', 'applies_to': 'per_person', 'frequency_unit': 'week'},
+    'laundry_load': {'frequency_column': 'laundry_loads_per_week', 'applies_to': 'per_household', 'frequency_unit': 'week'},
+    'dishwasher_load': {'frequency_column': 'dishwasher_loads_per_week', 'applies_to': 'per_household', 'frequency_unit': 'week'},
+    'hand_dishes': {'frequency_column': 'hand_wash_dishes_per_day', 'applies_to': 'per_household', 'frequency_unit': 'day'},
+    'toilet_flush': {'frequency_column': 'toilet_flushes_per_day', 'applies_to': 'per_person', 'frequency_unit': 'day'},
+    'cooking_meal': {'frequency_column': 'meals_cooked_per_day', 'applies_to': 'per_household', 'frequency_unit': 'day'},
+    'tv_hour': {'frequency_column': 'tv_hours_per_day', 'applies_to': 'per_household', 'frequency_unit': 'day'},
+    'computer_hour': {'frequency_column': 'computer_hours_per_day', 'applies_to': 'per_adult', 'frequency_unit': 'day'},
+    'lighting_hour': {'frequency_column': 'lighting_hours_per_day', 'applies_to': 'per_household', 'frequency_unit': 'day'},
+    'refrigerator': {'applies_to': 'per_household', 'frequency_unit': 'month'},
+    'water_heater_standby': {'applies_to': 'per_household', 'frequency_unit': 'month'},
+    'hvac_heating': {'multiplier_column': 'heating_multiplier', 'applies_to': 'per_household', 'frequency_unit': 'month'},
+    'hvac_cooling': {'multiplier_column': 'cooling_multiplier', 'applies_to': 'per_household', 'frequency_unit': 'month'},
+}
+
+# Seed consumption_factors rows (per-use water gallons, kWh, therms) in sort_order
+SEED_FACTORS = [
+    ('shower', 17.0, 0.5, 0.02),
+    ('bath', 36.0, 0.3, 0.03),
+    ('laundry_load', 20.0, 0.5, 0.0),
+    ('dishwasher_load', 6.0, 1.8, 0.0),
+    ('hand_dishes', 8.0, 0.0, 0.0),
+    ('toilet_flush', 1.6, 0.0, 0.0),
+    ('cooking_meal', 0.5, 0.8, 0.05),
+    ('tv_hour', 0.0, 0.1, 0.0),
+    ('computer_hour', 0.0, 0.15, 0.0),
+    ('lighting_hour', 0.0, 0.06, 0.0),
+    ('refrigerator', 0.0, 45.0, 0.0),
+    ('water_heater_standby', 0.0, 30.0, 3.0),
+    ('hvac_heating', 0.0, 50.0, 30.0),
+    ('hvac_cooling', 0.0, 150.0, 0.0),
+]
+
+
+def _value(row: dict, key: str, default: float = 0.0) -> float:
+    return default if row.get(key) is None else float(row[key])
+
+
+def activity_spec(factor: dict) -> dict:
+    """
+    How often one consumption_factors row is used.
+
+    Seed activities without a frequency_column or multiplier_column
+    (rows from before the migration, or NULL in both) take the seed
+    activity's spec; other rows with neither are flat monthly loads.
+
+    Returns:
+        {'frequency_column', 'multiplier_column', 'who', 'periods'}
+
+    Raises:
+        ValueError: Unknown applies_to or frequency_unit
+    """
+    spec = dict(factor)
+    if not factor.get('frequency_column') and not factor.get('multiplier_column'):
+        spec.update(SEED_ACTIVITIES.get(factor['activity_code'], {}))
+    applies_to = spec.get('applies_to') or 'per_household'
+    unit = spec.get('frequency_unit') or 'month'
+    if applies_to not in APPLIES_TO_COLUMNS:
+        raise ValueError(f"Unknown applies_to for {factor['activity_code']}: {applies_to}")
+    if unit not in PERIODS_PER_MONTH:
+        raise ValueError(f"Unknown frequency_unit for {factor['activity_code']}: {unit}")
+
+    frequency = spec.get('frequency_column')
+    return {
+        'frequency_column': frequency,
+        'multiplier_column': spec.get('multiplier_column'),
+        # A flat load is counted once per month and household
+        'who': APPLIES_TO_COLUMNS[applies_to] if frequency else None,
+        'periods': PERIODS_PER_MONTH[unit] if frequency else None,
+    }
+
+
+def factor_matrix(factors: list[dict]) -> dict:
+    """
+    Compile consumption_factors rows (in sort_order).
+
+    Returns:
+        {'codes': [activity_code], 'matrix': (activities, 3) per-use water / kWh / therms,
+         'specs': [activity_spec()]}
+    """
+    return {
+        'codes': [f['activity_code'] for f in factors],
+        'matrix': np.array([[_value(f, c) for c in RESOURCE_COLUMNS] for f in factors]).reshape(len(factors), 3),
+        'specs': [activity_spec(f) for f in factors],
+    }
+
+
+def activity_frequencies(occupancy: list[dict], lifestyle: list[dict], compiled: dict) -> np.ndarray:
+    """
+    Uses per month of every activity for every (occupancy, lifestyle) pair.
+
+    Args:
+        occupancy: v_occupancy_models rows (adults, children, total_occupants)
+        lifestyle: v_lifestyle_models rows
+        compiled: Output of factor_matrix()
+
+    Returns:
+        (occupancy, lifestyle, activities) float64 array
+    """
+    specs = compiled['specs']
+    who = np.array([[1.0 if s['who'] is None else _value(o, s['who']) for s in specs] for o in occupancy])
+    frequency = np.array([
+        [
+            _value(l, s['frequency_column']) if s['frequency_column']
+            else _value(l, s['multiplier_column'], 1.0) if s['multiplier_column']
+            else 1.0
+            for s in specs
+        ]
+        for l in lifestyle
+    ])
+    periods = np.array([1.0 if s['periods'] is None else float(s['periods']) for s in specs])
+    shape = (len(occupancy), len(lifestyle), len(specs))
+    who, frequency = who.reshape(shape[0], shape[2]), frequency.reshape(shape[1], shape[2])
+    return (who[:, None, :] * frequency[None, :, :]) * periods
+
+
+def consumption(frequencies: np.ndarray, compiled: dict, activities=None, ordered: bool = False) -> np.ndarray:
+    """
+    Unrounded monthly water / kWh / therms: frequencies @ factor matrix.
+
+    Args:
+        frequencies: (..., activities) from activity_frequencies()
+        compiled: Output of factor_matrix()
+        activities: Optional boolean mask selecting a subset of activities
+        ordered: Sum activities one at a time in row order (bit-identical
+            to the Dashboard's running totals) instead of one matmul
+
+    Returns:
+        (..., 3) float64 array
+    """
+    matrix = compiled['matrix']
+    if activities is not None:
+        mask = np.asarray(activities, dtype=bool)
+        frequencies, matrix = frequencies[..., mask], matrix[mask]
+    if not ordered:
+        return frequencies @ matrix
+
+    total = np.zeros(frequencies.shape[:-1] + (3,))
+    for a in range(matrix.shape[0]):
+        total = total + frequencies[..., a, None] * matrix[a]
+    return total
+
+
+# ============================================================
+# Reference and benchmark
+# ============================================================
+
+def reference_consumption(occupancy: dict, lifestyle: dict, factors: list[dict]) -> tuple:
+    """Running totals over the factors in order, as the Dashboard sums them."""
+    water = electric = gas = 0.0
+    for factor in factors:
+        spec = activity_spec(factor)
+        if spec['frequency_column']:
+            count = lifestyle[spec['frequency_column']]
+            if spec['who'] is not None:
+                count = occupancy[spec['who']] * count
+            count = count * spec['periods']
+        elif spec['multiplier_column']:
+            count = lifestyle[spec['multiplier_column']]
+        else:
+            count = 1
+        water += count * _value(factor, 'water_gallons')
+        electric += count * _value(factor, 'electric_kwh')
+        gas += count * _value(factor, 'gas_therms')
+    return water, electric, gas
+
+
+def seed_factors() -> list[dict]:
+    """SEED_FACTORS as consumption_factors rows."""
+    return [
+        {'activity_code': code, 'water_gallons': w, 'electric_kwh': k, 'gas_therms': t, **SEED_ACTIVITIES[code]}
+        for code, w, k, t in SEED_FACTORS
+    ]
+
+
+def benchmark(n_occupancy: int = 200, n_lifestyle: int = 500, n_extra: int = 50, n_checks: int = 5000,
+              seed: int = 0) -> dict:
+    """
+    Consumption for every pair of synthetic occupancy / lifestyle models,
+    with n_extra made-up activities added as data rows; the rounded values
+    are checked against the running-total loop.
+    """
+    rng = np.random.default_rng(seed)
+    factors = seed_factors()
+    units = list(PERIODS_PER_MONTH)
+    for n in range(n_extra):
+        factors.append({
+            'activity_code': f'extra_{n}', 'frequency_column': f'extra_{n}_frequency',
+            'applies_to': list(APPLIES_TO_COLUMNS)[n % 4], 'frequency_unit': units[n % 3],
+            'water_gallons': float(rng.choice([0, rng.uniform(0, 20)])),
+            'electric_kwh': float(rng.choice([0, rng.uniform(0, 2)])), 'gas_therms': float(rng.choice([0, rng.uniform(0, 0.1)])),
+        })
+
+    occupancy = []
+    for _ in range(n_occupancy):
+        adults, children = int(rng.integers(1, 4)), int(rng.integers(0, 4))
+        occupancy.append({'adults': adults, 'children': children, 'total_occupants': adults + children})
+    columns = sorted({s for f in factors for s in (f.get('frequency_column'), f.get('multiplier_column')) if s})
+    # Frequencies in quarter steps, like the seed presets (exercises .5 rounding ties)
+    lifestyle = [{c: float(rng.integers(0, 41)) / 4 for c in columns} for _ in range(n_lifestyle)]
+
+    start = time.perf_counter()
+    compiled = factor_matrix(factors)
+    frequencies = activity_frequencies(occupancy, lifestyle, compiled)
+    usage = consumption(frequencies, compiled)
+    seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ordered = consumption(frequencies, compiled, ordered=True)
+    ordered_seconds = time.perf_counter() - start
+
+    def rounded(values):
+        return np.floor(np.asarray(values) * np.array([1, 1, 10]) + 0.5)
+
+    mismatches = {'matmul': 0, 'ordered': 0}
+    worst = 0.0
+    for _ in range(n_checks):
+        o, l = int(rng.integers(0, n_occupancy)), int(rng.integers(0, n_lifestyle))
+        expected = np.array(reference_consumption(occupancy[o], lifestyle[l], factors))
+        worst = max(worst, float(np.max(np.abs(usage[o, l] - expected))))
+        mismatches['matmul'] += int(np.any(rounded(expected) != rounded(usage[o, l])))
+        mismatches['ordered'] += int(np.any(expected != ordered[o, l]))
+
+    return {
+        'pairs': n_occupancy * n_lifestyle,
+        'activities': len(factors),
+        'seconds': seconds,
+        'ordered_seconds': ordered_seconds,
+        'checked': n_checks,
+        'max_abs_error': worst,
+        'rounding_mismatches': mismatches['matmul'],
+        'ordered_mismatches': mismatches['ordered'],
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Matrix-form household consumption engine')
+    parser.add_argument('--benchmark', action='store_true', help='Consumption for synthetic occupancy x lifestyle pairs')
+    parser.add_argument('--extra', type=int, default=50, help='Made-up activities added as data rows')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+    else:
+        stats = benchmark(n_extra=args.extra)
+        print(f"Pairs x activities: {stats['pairs']:,} x {stats['activities']}")
+        print(f"Matrix multiply:    {stats['seconds']:.3f} s (incl. compiling frequencies)")
+        print(f"Ordered sums:       {stats['ordered_seconds']:.3f} s")
+        print(f"Checked vs loop:    {stats['checked']:,} pairs")
+        print(f"  matmul:  max error {stats['max_abs_error']:.2e}, {stats['rounding_mismatches']} pairs round differently")
+        print(f"  ordered: {stats['ordered_mismatches']} pairs not bit-identical")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+NPV / IRR engine for developer-return analysis.
+
+B13-Return is a static required-return estimate. This engine measures the
+return a project actually earns: the dated cost-entry outflows against an
+assumed sale inflow, for many sale-price / sale-date variants at once.
+
+Cash flows are discounted on an actual/365 basis from the first payment day
+(the XNPV/XIRR convention):
+    NPV(r) = sale * (1 + r)^(-T / 365) - sum(amount_k * (1 + r)^(-t_k / 365))
+
+Outflows are shared by every variant, so they are collapsed to one weight per
+payment day and each variant only differs in its sale amount and day. IRR is
+solved for all variants together with safeguarded Newton iterations: each
+variant keeps a sign-change bracket, and any Newton step that leaves the
+bracket is replaced by bisection. With every outflow before the sale the
+NPV has exactly one root, so the solver always converges.
+
+No Supabase dependency; see developer_return() in calculate_carrying_costs.py
+for the database-backed entry point.
+
+    python developer_return_engine.py --benchmark --variants 10000
+"""
+
+import time
+
+import numpy as np
+
+from carrying_cost_engine import DAYS_PER_YEAR
+
+# Bracket for IRR search (annual rates)
+IRR_LOWER = -0.99
+IRR_UPPER = 10.0
+
+IRR_TOLERANCE = 1e-10
+IRR_MAX_ITERATIONS = 100
+
+# Upper bound on (variants x payment days) cells per block
+VARIANT_BLOCK_CELLS = 4_000_000
+
+# Cost entries under this element are the required return itself, not cash out
+RETURN_CE_ID = 'B13-Return'
+
+
+def collapse_outflows(amount_cents, paid_day) -> tuple:
+    """
+    Sum outflows per payment day.
+
+    Returns:
+        (weight dollars per day, day offset from the first payment day, first day)
+    """
+    paid_day = np.asarray(paid_day, dtype=np.int64)
+    if len(paid_day) == 0:
+        return np.zeros(0), np.zeros(0), 0
+    first_day = int(paid_day.min())
+    days, inverse = np.unique(paid_day - first_day, return_inverse=True)
+    weight = np.bincount(inverse, weights=np.asarray(amount_cents, dtype=np.float64)) / 100
+    return weight, days.astype(np.float64), first_day
+
+
+def npv(annual_rate, weight, out_days, sale_amount, sale_days) -> np.ndarray:
+    """
+    Net present value per variant.
+
+    Args:
+        annual_rate: (variants,) discount rates (or a scalar)
+        weight, out_days: Collapsed outflows (collapse_outflows())
+        sale_amount, sale_days: (variants,) sale inflow and its day offset
+
+    Returns:
+        (variants,) NPV in dollars at the first payment day
+    """
+    value, _ = _npv_and_slope(
+        np.broadcast_to(np.asarray(annual_rate, dtype=np.float64), np.shape(sale_amount)),
+        weight, out_days, np.asarray(sale_amount, dtype=np.float64), np.asarray(sale_days, dtype=np.float64)
+    )
+    return value
+
+
+def _npv_and_slope(rate, weight, out_days, sale_amount, sale_days) -> tuple:
+    """NPV and dNPV/dr for each variant's rate."""
+    log_growth = np.log1p(rate)[:, None]
+    years = out_days[None, :] / DAYS_PER_YEAR
+    discount = np.exp(-years * log_growth)
+    sale_years = sale_days / DAYS_PER_YEAR
+    sale_discount = np.exp(-sale_years * log_growth[:, 0])
+
+    value = sale_amount * sale_discount - discount @ weight
+    slope = (-sale_years * sale_amount * sale_discount + (years * discount) @ weight) / (1.0 + rate)
+    return value, slope
+
+
+def irr(weight, out_days, sale_amount, sale_days) -> np.ndarray:
+    """
+    Internal rate of return per variant (annual, actual/365).
+
+    Variants whose NPV doesn't change sign on [IRR_LOWER, IRR_UPPER] (e.g. a
+    sale below cost with a loss beyond -99%/yr) get NaN.
+
+    Returns:
+        (variants,) IRR as a decimal (0.15 = 15%)
+    """
+    sale_amount = np.asarray(sale_amount, dtype=np.float64)
+    sale_days = np.broadcast_to(np.asarray(sale_days, dtype=np.float64), sale_amount.shape)
+    n = len(sale_amount)
+
+    lo = np.full(n, IRR_LOWER)
+    hi = np.full(n, IRR_UPPER)
+    f_lo, _ = _npv_and_slope(lo, weight, out_days, sale_amount, sale_days)
+    f_hi, _ = _npv_and_slope(hi, weight, out_days, sale_amount, sale_days)
+    valid = np.sign(f_lo) != np.sign(f_hi)
+
+    rate = np.where(valid, 0.1, np.nan)
+    active = valid.copy()
+    for _ in range(IRR_MAX_ITERATIONS):
+        if not active.any():
+            break
+        idx = np.flatnonzero(active)
+        r = rate[idx]
+        value, slope = _npv_and_slope(r, weight, out_days, sale_amount[idx], sale_days[idx])
+
+        # Shrink each bracket to the side that keeps the sign change
+        same_as_lo = np.sign(value) == np.sign(f_lo[idx])
+        lo[idx] = np.where(same_as_lo, r, lo[idx])
+        f_lo[idx] = np.where(same_as_lo, value, f_lo[idx])
+        hi[idx] = np.where(same_as_lo, hi[idx], r)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = r - value / slope
+        inside = np.isfinite(newton) & (newton > lo[idx]) & (newton < hi[idx])
+        step = np.where(inside, newton, 0.5 * (lo[idx] + hi[idx]))
+        step = np.where(value == 0, r, step)
+
+        rate[idx] = step
+        converged = (np.abs(step - r) < IRR_TOLERANCE) | (hi[idx] - lo[idx] < IRR_TOLERANCE)
+        active[idx[converged]] = False
+
+    return rate
+
+
+def return_metrics(amount_cents, paid_day, sale_amount, sale_day, discount_rate: float) -> dict:
+    """
+    NPV, IRR, profit and equity multiple for each sale variant.
+
+    Args:
+        amount_cents: int64 outflow amounts
+        paid_day: int64 payment day numbers
+        sale_amount: (variants,) sale price in dollars
+        sale_day: (variants,) sale day numbers
+        discount_rate: Annual rate for NPV
+
+    Returns:
+        {'npv', 'irr', 'profit', 'equity_multiple': (variants,) arrays, 'total_cost': float}
+    """
+    weight, out_days, first_day = collapse_outflows(amount_cents, paid_day)
+    sale_amount = np.asarray(sale_amount, dtype=np.float64)
+    sale_days = np.asarray(sale_day, dtype=np.int64) - first_day
+    sale_days = np.broadcast_to(sale_days, sale_amount.shape).astype(np.float64)
+    total_cost = float(weight.sum())
+
+    values = np.empty(len(sale_amount))
+    rates = np.empty(len(sale_amount))
+    block = max(1, VARIANT_BLOCK_CELLS // max(len(weight), 1))
+    for lo in range(0, len(sale_amount), block):
+        hi = lo + block
+        values[lo:hi] = npv(discount_rate, weight, out_days, sale_amount[lo:hi], sale_days[lo:hi])
+        rates[lo:hi] = irr(weight, out_days, sale_amount[lo:hi], sale_days[lo:hi])
+
+    return {
+        'total_cost': total_cost,
+        'npv': values,
+        'irr': rates,
+        'profit': sale_amount - total_cost,
+        'equity_multiple': sale_amount / total_cost if total_cost > 0 else np.full(sale_amount.shape, np.nan),
+    }
+
+
+# ============================================================
+# Benchmark
+# ============================================================
+
+def benchmark(n_entries: int = 10_000, n_variants: int = 10_000, seed: int = 0) -> dict:
+    """Solve IRR for many sale price / sale date variants over a synthetic ledger."""
+    rng = np.random.default_rng(seed)
+    amount_cents = rng.integers(100, 5_000_000, n_entries, dtype=np.int64)
+    paid_day = rng.integers(0, 2 * DAYS_PER_YEAR, n_entries)
+    total = amount_cents.sum() / 100
+    sale_amount = total * rng.uniform(0.9, 1.6, n_variants)
+    sale_day = 2 * DAYS_PER_YEAR + rng.integers(0, DAYS_PER_YEAR, n_variants)
+
+    start = time.perf_counter()
+    metrics = return_metrics(amount_cents, paid_day, sale_amount, sale_day, 0.08)
+    seconds = time.perf_counter() - start
+
+    weight, out_days, first_day = collapse_outflows(amount_cents, paid_day)
+    rates = metrics['irr']
+    residual = np.abs(npv(rates, weight, out_days, sale_amount, sale_day - first_day)) / total
+
+    return {
+        'entries': n_entries,
+        'payment_days': len(weight),
+        'variants': n_variants,
+        'seconds': seconds,
+        'unsolved': int(np.isnan(rates).sum()),
+        'max_relative_residual': float(np.nanmax(residual)),
+        'median_irr': float(np.nanmedian(rates)),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Vectorized NPV / IRR engine')
+    parser.add_argument('--benchmark', action='store_true', help='Run the synthetic benchmark')
+    parser.add_argument('--entries', type=int, default=10_000, help='Synthetic ledger size')
+    parser.add_argument('--variants', type=int, default=10_000, help='Sale price / date variants')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+    else:
+        stats = benchmark(args.entries, args.variants)
+        print(f"Entries:          {stats['entries']:>12,} ({stats['payment_days']:,} payment days)")
+        print(f"Variants:         {stats['variants']:>12,}")
+        print(f"Time:             {stats['seconds']:>12.3f} s")
+        print(f"Unsolved:         {stats['unsolved']:>12}")
+        print(f"Max NPV residual: {stats['max_relative_residual']:>12.2e} (share of cost)")
+        print(f"Median IRR:       {stats['median_irr'] * 100:>11.2f}%")
@@ -0,0 +1,628 @@
+#!/usr/bin/env python3
+"""
+Monthly housing cost engine over every model combination.
+
+The Dashboard computes the monthly housing cost for one selection at a time:
+    occupancy x lifestyle -> monthly water / kWh / therms
+    consumption -> tiered water, sewer, electric and gas bills
+    home price x occupant finance model (+ risk rate premium) -> mortgage
+    home price x risk model -> amortized risk costs
+    total = mortgage + utilities + risk
+
+This engine evaluates the same chain for the full cross-product of the nine
+dimensions at once:
+    scenario (home price), occupancy, lifestyle, water, sewer, electric, gas,
+    occupant finance model, risk model
+
+The chain is separable, so nothing is computed per combination until the
+final broadcast add:
+- consumption depends only on (occupancy, lifestyle)
+- each utility bill only on (occupancy, lifestyle, that utility's model)
+- mortgage and risk only on (scenario, finance, risk)
+
+Arithmetic follows Dashboard.tsx step for step (same constants, operation
+order and Math.round rounding), so every cell matches the browser's number.
+
+annual_utility_costs() replaces the generic month with a 12-month profile:
+hvac_heating / hvac_cooling loads are spread over the calendar by monthly
+profiles and each month is billed at the model's summer or winter rates.
+
+No Supabase dependency; see calculate_housing_costs.py for the
+database-backed entry point.
+
+    python housing_cost_engine.py --benchmark
+    python housing_cost_engine.py --benchmark --seasonal
+"""
+
+import time
+
+import numpy as np
+
+import consumption_engine as activities
+import tariff_engine as tariffs
+
+# Axis order of the result cube
+AXES = ('scenario', 'occupancy', 'lifestyle', 'water', 'sewer', 'electric', 'gas', 'finance', 'risk')
+UTILITY_TYPES = ('water', 'sewer', 'electric', 'gas')
+
+# Which consumption (index into water / electric / gas) each utility bills
+UTILITY_RESOURCE = {'water': 0, 'sewer': 0, 'electric': 1, 'gas': 2}
+
+# Dashboard constants
+DEFAULT_HOME_PRICE = 450000
+BASE_CONSTRUCTION_MONTHS = 12
+CONSTRUCTION_LTC = 0.7
+MARKETING_SHARE = 0.02
+DEFAULT_CONSTRUCTION_RATE = 0.065
+DEFAULT_TERM_YEARS = 30
+
+# Activities whose load follows the season (the rest is the same every month)
+HVAC_PARTS = {'hvac_heating': 'heating', 'hvac_cooling': 'cooling'}
+
+
+def js_round(values, digits: int = 0) -> np.ndarray:
+    """JavaScript Math.round(x * 10^digits) / 10^digits (halves round up)."""
+    scale = 10.0 ** digits
+    return np.floor(np.asarray(values, dtype=np.float64) * scale + 0.5) / scale
+
+
+def _column(rows: list[dict], key: str, default: float = 0.0) -> np.ndarray:
+    """float64 column from model rows; missing/null values take the default."""
+    return np.array([default if row.get(key) is None else float(row[key]) for row in rows])
+
+
+# ============================================================
+# Consumption
+# ============================================================
+
+def consumption_parts(occupancy: list[dict], lifestyle: list[dict], factors: list[dict]) -> dict:
+    """
+    Unrounded monthly water / kWh / therms for every (occupancy, lifestyle)
+    pair, split into the HVAC loads (lifestyle multipliers applied) and
+    everything else.
+
+    Args:
+        occupancy: v_occupancy_models rows (adults, children, total_occupants)
+        lifestyle: v_lifestyle_models rows
+        factors: consumption_factors rows, in sort_order
+
+    Returns:
+        {'base', 'heating', 'cooling', 'total': (occupancy, lifestyle, 3) float64 arrays};
+        'total' sums every activity in row order, like the Dashboard
+    """
+    compiled = activities.factor_matrix(factors)
+    frequencies = activities.activity_frequencies(occupancy, lifestyle, compiled)
+    part_of = [HVAC_PARTS.get(code, 'base') for code in compiled['codes']]
+    parts = {
+        part: activities.consumption(frequencies, compiled, [p == part for p in part_of], ordered=True)
+        for part in ('base', 'heating', 'cooling')
+    }
+    parts['total'] = activities.consumption(frequencies, compiled, ordered=True)
+    return parts
+
+
+def round_consumption(consumption: np.ndarray) -> np.ndarray:
+    """Dashboard rounding: whole gallons and kWh, tenths of a therm."""
+    return np.stack([js_round(consumption[..., 0]), js_round(consumption[..., 1]), js_round(consumption[..., 2], 1)], axis=-1)
+
+
+def monthly_consumption(occupancy: list[dict], lifestyle: list[dict], factors: list[dict]) -> np.ndarray:
+    """
+    The Dashboard's generic month for every (occupancy, lifestyle) pair:
+    every activity plus the full heating and cooling loads, rounded.
+
+    Returns:
+        (occupancy, lifestyle, 3) float64 array
+    """
+    return round_consumption(consumption_parts(occupancy, lifestyle, factors)['total'])
+
+
+# ============================================================
+# Utility bills
+# ============================================================
+
+def utility_bills(consumption: np.ndarray, models: list[dict], resource: int) -> np.ndarray:
+    """
+    Unrounded bills for every (occupancy, lifestyle) pair under each model.
+
+    Returns:
+        (occupancy, lifestyle, models) float64 array
+    """
+    bills = tariffs.price_matrix(tariffs.compile_models(models), consumption[..., resource])
+    return np.moveaxis(bills, 0, -1)
+
+
+def utility_totals(consumption: np.ndarray, utilities: dict) -> tuple:
+    """
+    Every utility model's bill and the rounded four-utility total.
+
+    Returns:
+        ({utility type: (occupancy, lifestyle, models) unrounded},
+         (occupancy, lifestyle, water, sewer, electric, gas) total)
+    """
+    raw = {u: utility_bills(consumption, utilities[u], UTILITY_RESOURCE[u]) for u in UTILITY_TYPES}
+    n_o, n_l = consumption.shape[:2]
+    sizes = [raw[u].shape[-1] for u in UTILITY_TYPES]
+    parts = [
+        raw[u].reshape((n_o, n_l) + tuple(size if i == k else 1 for i, size in enumerate(sizes)))
+        for k, u in enumerate(UTILITY_TYPES)
+    ]
+    return raw, js_round(((parts[0] + parts[1]) + parts[2]) + parts[3], 2)
+
+
+# ============================================================
+# Mortgage and risk
+# ============================================================
+
+def finance_arrays(finance: list[dict]) -> dict:
+    """Column arrays for occupant_finance_models rows."""
+    return {
+        'annual_rate': _column(finance, 'annual_interest_rate'),
+        'term_years': _column(finance, 'loan_term_years'),
+        'down_payment': _column(finance, 'down_payment_percent'),
+        'pmi_rate': _column(finance, 'pmi_rate'),
+        'pmi_threshold': _column(finance, 'pmi_threshold'),
+    }
+
+
+def risk_arrays(risk: list[dict]) -> dict:
+    """Column arrays for risk_models rows."""
+    return {
+        'schedule_variance_pct': _column(risk, 'schedule_variance_pct'),
+        'rate_premium': _column(risk, 'rate_premium_bps') / 10000,
+        'contingency_pct': _column(risk, 'design_contingency_pct') + _column(risk, 'construction_contingency_pct'),
+        'marketing_multiplier': _column(risk, 'marketing_multiplier', 1.0),
+        'sales_period_months': _column(risk, 'sales_period_months'),
+    }
+
+
+def risk_adjustments(home_price: np.ndarray, fin: dict, risk: dict) -> dict:
+    """
+    R1-R4 risk costs for every (scenario, finance, risk) triple.
+
+    Returns:
+        {'rate_premium': (1, 1, risk), 'schedule_carry', 'contingency',
+         'sales_carry', 'marketing_addon', 'monthly_impact': (scenario, finance, risk)}
+    """
+    price = home_price[:, None, None]
+    premium = risk['rate_premium'][None, None, :]
+    base_rate = np.where(fin['annual_rate'] != 0, fin['annual_rate'], DEFAULT_CONSTRUCTION_RATE)
+    loan_rate = base_rate[None, :, None] + premium
+    monthly_carry = price * CONSTRUCTION_LTC * loan_rate / 12
+
+    extra_months = BASE_CONSTRUCTION_MONTHS * (risk['schedule_variance_pct'] / 100)
+    schedule_carry = np.where(extra_months > 0, monthly_carry * extra_months, 0.0)
+    contingency = price * (risk['contingency_pct'][None, None, :] / 100)
+    marketing_addon = (price * MARKETING_SHARE) / 12 * (risk['marketing_multiplier'][None, None, :] - 1)
+    sales_months = risk['sales_period_months'][None, None, :]
+    sales_carry = np.where(sales_months > 0, monthly_carry * sales_months, 0.0)
+
+    term_years = np.where(fin['term_years'] != 0, fin['term_years'], DEFAULT_TERM_YEARS)
+    term_months = (term_years * 12)[None, :, None]
+    monthly_impact = (schedule_carry + contingency + sales_carry) / term_months + marketing_addon
+
+    shape = np.broadcast_shapes(price.shape, loan_rate.shape)
+    return {
+        'rate_premium': premium,
+        'schedule_carry': np.broadcast_to(schedule_carry, shape),
+        'contingency': np.broadcast_to(contingency, shape),
+        'sales_carry': np.broadcast_to(sales_carry, shape),
+        'marketing_addon': np.broadcast_to(marketing_addon, shape),
+        'monthly_impact': np.broadcast_to(monthly_impact, shape),
+    }
+
+
+def mortgage_payments(home_price: np.ndarray, fin: dict, rate_premium: np.ndarray) -> dict:
+    """
+    Level monthly P&I plus PMI for every (scenario, finance, risk) triple,
+    at the finance model's rate plus the risk premium. Cash purchases (term
+    or adjusted rate of 0) pay nothing.
+
+    Returns:
+        {'principal', 'pmi', 'total': (scenario, finance, risk)}
+    """
+    price = home_price[:, None, None]
+    down = fin['down_payment'][None, :, None]
+    annual_rate = fin['annual_rate'][None, :, None] + rate_premium
+    payments = (fin['term_years'] * 12)[None, :, None]
+
+    loan = price * (1 - down)
+    monthly_rate = annual_rate / 12
+    growth = np.power(1 + monthly_rate, payments)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        principal = loan * (monthly_rate * growth) / (growth - 1)
+    pmi_applies = (down < fin['pmi_threshold'][None, :, None]) & (fin['pmi_rate'][None, :, None] > 0)
+    pmi = np.where(pmi_applies, (loan * fin['pmi_rate'][None, :, None]) / 12, 0.0)
+
+    financed = (payments != 0) & (annual_rate != 0)
+    principal = np.where(financed, principal, 0.0)
+    pmi = np.where(financed, pmi, 0.0)
+    return {'principal': principal, 'pmi': pmi, 'total': principal + pmi}
+
+
+# ============================================================
+# Full cross-product
+# ============================================================
+
+def monthly_housing_costs(home_prices, occupancy: list[dict], lifestyle: list[dict], factors: list[dict],
+                          utilities: dict, finance: list[dict], risk: list[dict]) -> dict:
+    """
+    Monthly housing cost for every combination of the nine dimensions.
+
+    Args:
+        home_prices: (scenarios,) home prices (total_onetime_costs; 0/None ->
+            DEFAULT_HOME_PRICE like the Dashboard)
+        occupancy, lifestyle, factors: Model rows (see monthly_consumption())
+        utilities: {'water'|'sewer'|'electric'|'gas': [utility_models rows]}
+        finance: occupant_finance_models rows
+        risk: risk_models rows
+
+    Returns:
+        {
+            'shape': cube shape in AXES order,
+            'total': cube of monthly totals (dollars),
+            'consumption': (occupancy, lifestyle, 3),
+            'bills': {utility type: (occupancy, lifestyle, models) rounded to cents},
+            'utility_total': (occupancy, lifestyle, water, sewer, electric, gas),
+            'mortgage': {'principal', 'pmi', 'total': (scenario, finance, risk)},
+            'risk': risk_adjustments() output,
+            'home_price': (scenarios,)
+        }
+    """
+    home_price = np.array([float(p) if p else DEFAULT_HOME_PRICE for p in home_prices])
+    consumption = monthly_consumption(occupancy, lifestyle, factors)
+
+    raw, utility_total = utility_totals(consumption, utilities)
+
+    fin = finance_arrays(finance)
+    risk_cols = risk_arrays(risk)
+    adjustments = risk_adjustments(home_price, fin, risk_cols)
+    mortgage = mortgage_payments(home_price, fin, adjustments['rate_premium'])
+
+    n_p, n_f, n_r = mortgage['total'].shape
+    total = (
+        mortgage['total'].reshape(n_p, 1, 1, 1, 1, 1, 1, n_f, n_r)
+        + utility_total[None, ..., None, None]
+    ) + adjustments['monthly_impact'].reshape(n_p, 1, 1, 1, 1, 1, 1, n_f, n_r)
+
+    return {
+        'shape': total.shape,
+        'total': total,
+        'consumption': consumption,
+        'bills': {u: js_round(raw[u], 2) for u in UTILITY_TYPES},
+        'utility_total': utility_total,
+        'mortgage': mortgage,
+        'risk': adjustments,
+        'home_price': home_price,
+    }
+
+
+def breakdown(result: dict, index: tuple) -> dict:
+    """
+    Dashboard-style breakdown of one combination.
+
+    Args:
+        result: Output of monthly_housing_costs()
+        index: One position per axis, in AXES order
+
+    Returns:
+        {'total', 'mortgage_principal', 'mortgage_pmi', 'mortgage_total',
+         'water', 'sewer', 'electric', 'gas', 'utility_total',
+         'risk_monthly', 'consumption': {'water', 'electric', 'gas'}}
+    """
+    p, o, l, w, s, e, g, f, r = index
+    utility_index = {'water': w, 'sewer': s, 'electric': e, 'gas': g}
+    water, electric, gas = result['consumption'][o, l].tolist()
+    return {
+        'total': float(result['total'][index]),
+        'mortgage_principal': float(result['mortgage']['principal'][p, f, r]),
+        'mortgage_pmi': float(result['mortgage']['pmi'][p, f, r]),
+        'mortgage_total': float(result['mortgage']['total'][p, f, r]),
+        **{u: float(result['bills'][u][o, l, utility_index[u]]) for u in UTILITY_TYPES},
+        'utility_total': float(result['utility_total'][o, l, w, s, e, g]),
+        'risk_monthly': float(result['risk']['monthly_impact'][p, f, r]),
+        'consumption': {'water': water, 'electric': electric, 'gas': gas},
+    }
+
+
+# ============================================================
+# Twelve-month seasonal simulation
+# ============================================================
+
+MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+# Monthly share of the hvac_heating load (a winter average: Nov-Mar mean 1.0)
+# and the hvac_cooling load (a summer average: Jun-Aug mean 1.0), shaped
+# after Fort Collins heating / cooling degree days
+HEATING_PROFILE = np.array([1.15, 0.97, 0.86, 0.58, 0.29, 0.08, 0.0, 0.02, 0.17, 0.51, 0.88, 1.14])
+COOLING_PROFILE = np.array([0.0, 0.0, 0.0, 0.0, 0.10, 0.71, 1.24, 1.05, 0.33, 0.02, 0.0, 0.0])
+
+# Months billed at summer_multiplier (the rest at winter_multiplier)
+SUMMER_MONTHS = np.array([False] * 5 + [True] * 4 + [False] * 3)
+
+
+def seasonal_consumption(parts: dict, heating_profile=HEATING_PROFILE, cooling_profile=COOLING_PROFILE) -> np.ndarray:
+    """
+    Rounded consumption for each calendar month: the non-HVAC base every
+    month plus the heating and cooling loads scaled by the month's profile.
+
+    Args:
+        parts: Output of consumption_parts()
+
+    Returns:
+        (occupancy, lifestyle, 12, 3) float64 array
+    """
+    heating = np.asarray(heating_profile, dtype=np.float64)[:, None]
+    cooling = np.asarray(cooling_profile, dtype=np.float64)[:, None]
+    return round_consumption(
+        (parts['base'][..., None, :] + parts['heating'][..., None, :] * heating) + parts['cooling'][..., None, :] * cooling
+    )
+
+
+def seasonal_bills(consumption: np.ndarray, models: list[dict], resource: int, summer_months=SUMMER_MONTHS) -> np.ndarray:
+    """
+    Monthly bills under each model's summer or winter rates.
+
+    Args:
+        consumption: (..., 12, 3) from seasonal_consumption()
+        models: utility_models rows (has_seasonal_rates, summer/winter_multiplier)
+        resource: Index into water / electric / gas
+
+    Returns:
+        (..., 12, models) bills rounded to cents
+    """
+    usage = consumption[..., resource]
+    summer = tariffs.price_matrix(
+        tariffs.compile_models(models, [tariffs.seasonal_multiplier(m, True) for m in models]), usage
+    )
+    winter = tariffs.price_matrix(
+        tariffs.compile_models(models, [tariffs.seasonal_multiplier(m, False) for m in models]), usage
+    )
+    bills = np.where(np.asarray(summer_months, dtype=bool), summer, winter)
+    return js_round(np.moveaxis(bills, 0, -1), 2)
+
+
+def annual_utility_costs(occupancy: list[dict], lifestyle: list[dict], factors: list[dict], utilities: dict,
+                         heating_profile=HEATING_PROFILE, cooling_profile=COOLING_PROFILE,
+                         summer_months=SUMMER_MONTHS) -> dict:
+    """
+    Twelve-month utility simulation for every (occupancy, lifestyle) pair
+    under every utility model, alongside 12x the Dashboard's generic month.
+
+    Args:
+        occupancy, lifestyle, factors: Model rows (see consumption_parts())
+        utilities: {'water'|'sewer'|'electric'|'gas': [utility_models rows]}
+        heating_profile, cooling_profile: (12,) monthly HVAC load shares
+        summer_months: (12,) bool, months billed at summer rates
+
+    Returns:
+        {
+            'months': MONTH_NAMES,
+            'consumption': (occupancy, lifestyle, 12, 3),
+            'monthly': {utility type: (occupancy, lifestyle, 12, models)},
+            'annual': {utility type: (occupancy, lifestyle, models)},
+            'generic_annual': {utility type: (occupancy, lifestyle, models)},
+            'annual_total': (occupancy, lifestyle, water, sewer, electric, gas)
+        }
+    """
+    parts = consumption_parts(occupancy, lifestyle, factors)
+    consumption = seasonal_consumption(parts, heating_profile, cooling_profile)
+    generic = round_consumption(parts['total'])
+
+    monthly = {u: seasonal_bills(consumption, utilities[u], UTILITY_RESOURCE[u], summer_months) for u in UTILITY_TYPES}
+    annual = {u: monthly[u].sum(axis=-2) for u in UTILITY_TYPES}
+    generic_annual = {
+        u: 12 * js_round(utility_bills(generic, utilities[u], UTILITY_RESOURCE[u]), 2) for u in UTILITY_TYPES
+    }
+
+    n_o, n_l = consumption.shape[:2]
+    sizes = [annual[u].shape[-1] for u in UTILITY_TYPES]
+    annual_total = sum(
+        annual[u].reshape((n_o, n_l) + tuple(size if i == k else 1 for i, size in enumerate(sizes)))
+        for k, u in enumerate(UTILITY_TYPES)
+    )
+
+    return {
+        'months': MONTH_NAMES,
+        'consumption': consumption,
+        'monthly': monthly,
+        'annual': annual,
+        'generic_annual': generic_annual,
+        'annual_total': annual_total,
+    }
+
+
+# ============================================================
+# Reference and benchmark
+# ============================================================
+
+def reference_monthly_cost(home_price, occupancy: dict, lifestyle: dict, factors: list[dict],
+                           utilities: dict, finance: dict, risk: dict) -> float:
+    """Line-by-line port of the Dashboard calculation for one selection, used to check the cube."""
+    import math
+
+    def js(x, digits=0):
+        return math.floor(x * 10 ** digits + 0.5) / 10 ** digits
+
+    home_price = float(home_price) if home_price else DEFAULT_HOME_PRICE
+    water, electric, gas = activities.reference_consumption(occupancy, lifestyle, factors)
+    usage = {'water': js(water), 'sewer': js(water), 'electric': js(electric), 'gas': js(gas, 1)}
+
+    bills = [
+        tariffs.reference_bill(usage[u], utilities[u]['base_monthly_fee'], utilities[u]['rate_tiers'])
+        for u in UTILITY_TYPES
+    ]
+    utility_total = js(bills[0] + bills[1] + bills[2] + bills[3], 2)
+
+    premium = risk['rate_premium_bps'] / 10000
+    loan_rate = (finance['annual_interest_rate'] or DEFAULT_CONSTRUCTION_RATE) + premium
+    extra_months = BASE_CONSTRUCTION_MONTHS * (risk['schedule_variance_pct'] / 100)
+    schedule = (home_price * CONSTRUCTION_LTC * loan_rate / 12) * extra_months if extra_months > 0 else 0
+    contingency = home_price * ((risk['design_contingency_pct'] + risk['construction_contingency_pct']) / 100)
+    marketing = (home_price * MARKETING_SHARE) / 12 * (risk['marketing_multiplier'] - 1)
+    sales = (home_price * CONSTRUCTION_LTC * loan_rate / 12) * risk['sales_period_months'] \
+        if risk['sales_period_months'] > 0 else 0
+    term_months = (finance['loan_term_years'] or DEFAULT_TERM_YEARS) * 12
+    risk_monthly = (schedule + contingency + sales) / term_months + marketing
+
+    rate = finance['annual_interest_rate'] + premium
+    mortgage = 0.0
+    if finance['loan_term_years'] != 0 and rate != 0:
+        loan = home_price * (1 - finance['down_payment_percent'])
+        monthly_rate, n = rate / 12, finance['loan_term_years'] * 12
+        mortgage = loan * (monthly_rate * math.pow(1 + monthly_rate, n)) / (math.pow(1 + monthly_rate, n) - 1)
+        if finance['down_payment_percent'] < finance['pmi_threshold'] and finance['pmi_rate'] > 0:
+            mortgage += (loan * finance['pmi_rate']) / 12
+
+    return mortgage + utility_total + risk_monthly
+
+
+def synthetic_models(sizes: dict, seed: int = 0) -> dict:
+    """Random model rows shaped like the seed data, sizes keyed by axis name."""
+    rng = np.random.default_rng(seed)
+    factors = activities.seed_factors()
+    occupancy = []
+    for _ in range(sizes['occupancy']):
+        adults, children = int(rng.integers(1, 4)), int(rng.integers(0, 4))
+        occupancy.append({'adults': adults, 'children': children, 'total_occupants': adults + children})
+    lifestyle = [
+        {
+            'showers_per_week': float(rng.uniform(4, 10)), 'baths_per_week': float(rng.uniform(0, 2)),
+            'laundry_loads_per_week': float(rng.uniform(2, 8)), 'dishwasher_loads_per_week': float(rng.uniform(2, 7)),
+            'hand_wash_dishes_per_day': float(rng.uniform(0.5, 2)), 'toilet_flushes_per_day': float(rng.uniform(5, 7)),
+            'meals_cooked_per_day': float(rng.uniform(1.5, 3)), 'tv_hours_per_day': float(rng.uniform(2, 5)),
+            'computer_hours_per_day': float(rng.uniform(1, 6)), 'lighting_hours_per_day': float(rng.uniform(4, 10)),
+            'heating_multiplier': float(rng.uniform(0.8, 1.2)), 'cooling_multiplier': float(rng.uniform(0.8, 1.2)),
+        }
+        for _ in range(sizes['lifestyle'])
+    ]
+    scale = {'water': 0.005, 'sewer': 0.006, 'electric': 0.08, 'gas': 0.7}
+    breaks = {'water': 6000, 'sewer': 6000, 'electric': 500, 'gas': 50}
+    utilities = {
+        u: [
+            {
+                'base_monthly_fee': float(rng.uniform(0, 25)),
+                'rate_tiers': [
+                    {'max_units': breaks[u], 'rate': scale[u] * float(rng.uniform(0.8, 1.2))},
+                    {'max_units': 2 * breaks[u], 'rate': scale[u] * float(rng.uniform(1.1, 1.4))},
+                    {'max_units': None, 'rate': scale[u] * float(rng.uniform(1.3, 1.7))},
+                ],
+            }
+            for _ in range(sizes[u])
+        ]
+        for u in UTILITY_TYPES
+    }
+    finance = [
+        {
+            'annual_interest_rate': float(rng.uniform(0.055, 0.075)), 'loan_term_years': int(rng.choice([15, 20, 30])),
+            'down_payment_percent': float(rng.choice([0.0, 0.035, 0.05, 0.1, 0.2])),
+            'pmi_rate': float(rng.uniform(0, 0.009)), 'pmi_threshold': 0.2,
+        }
+        for _ in range(sizes['finance'])
+    ]
+    risk = [
+        {
+            'schedule_variance_pct': float(rng.uniform(0, 40)), 'rate_premium_bps': float(rng.uniform(0, 300)),
+            'design_contingency_pct': float(rng.uniform(3, 12)), 'construction_contingency_pct': float(rng.uniform(5, 18)),
+            'marketing_multiplier': float(rng.uniform(1, 2)), 'sales_period_months': float(rng.uniform(0, 8)),
+        }
+        for _ in range(sizes['risk'])
+    ]
+    return {
+        'home_prices': rng.uniform(250_000, 900_000, sizes['scenario']).tolist(),
+        'occupancy': occupancy, 'lifestyle': lifestyle, 'factors': factors,
+        'utilities': utilities, 'finance': finance, 'risk': risk,
+    }
+
+
+def benchmark(sizes: dict = None, n_checks: int = 1000, seed: int = 0) -> dict:
+    """Time the full cross-product over synthetic models and spot-check cells against the reference."""
+    sizes = sizes or {'scenario': 3, 'occupancy': 6, 'lifestyle': 5, 'water': 3, 'sewer': 4,
+                      'electric': 3, 'gas': 3, 'finance': 10, 'risk': 4}
+    models = synthetic_models(sizes, seed)
+
+    start = time.perf_counter()
+    result = monthly_housing_costs(models['home_prices'], models['occupancy'], models['lifestyle'], models['factors'],
+                                   models['utilities'], models['finance'], models['risk'])
+    seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    worst = 0.0
+    for _ in range(n_checks):
+        index = tuple(int(rng.integers(0, n)) for n in result['shape'])
+        p, o, l, w, s, e, g, f, r = index
+        expected = reference_monthly_cost(
+            models['home_prices'][p], models['occupancy'][o], models['lifestyle'][l], models['factors'],
+            {'water': models['utilities']['water'][w], 'sewer': models['utilities']['sewer'][s],
+             'electric': models['utilities']['electric'][e], 'gas': models['utilities']['gas'][g]},
+            models['finance'][f], models['risk'][r]
+        )
+        worst = max(worst, abs(expected - float(result['total'][index])))
+
+    return {
+        'combinations': int(result['total'].size),
+        'seconds': seconds,
+        'checked': n_checks,
+        'max_abs_error': worst,
+        'median_total': float(np.median(result['total'])),
+    }
+
+
+def benchmark_seasonal(sizes: dict = None, n_checks: int = 2000, seed: int = 0) -> dict:
+    """Time the 12-month simulation over synthetic models; spot-check bills against the tier loop."""
+    sizes = sizes or {'occupancy': 50, 'lifestyle': 50, 'water': 10, 'sewer': 10, 'electric': 10, 'gas': 10}
+    models = synthetic_models({'scenario': 1, 'finance': 1, 'risk': 1, **sizes}, seed)
+    for u in UTILITY_TYPES:
+        for m in models['utilities'][u]:
+            m.update({'has_seasonal_rates': u in ('electric', 'gas'), 'summer_multiplier': 1.15, 'winter_multiplier': 1.1})
+
+    start = time.perf_counter()
+    result = annual_utility_costs(models['occupancy'], models['lifestyle'], models['factors'], models['utilities'])
+    seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    worst = 0.0
+    for _ in range(n_checks):
+        u = UTILITY_TYPES[int(rng.integers(0, 4))]
+        o, l, month = int(rng.integers(0, sizes['occupancy'])), int(rng.integers(0, sizes['lifestyle'])), int(rng.integers(0, 12))
+        m = int(rng.integers(0, sizes[u]))
+        model = models['utilities'][u][m]
+        multiplier = tariffs.seasonal_multiplier(model, bool(SUMMER_MONTHS[month]))
+        usage = float(result['consumption'][o, l, month, UTILITY_RESOURCE[u]])
+        expected = tariffs.reference_bill(usage, model['base_monthly_fee'], model['rate_tiers'], multiplier)
+        worst = max(worst, abs(float(js_round(expected, 2)) - float(result['monthly'][u][o, l, month, m])))
+
+    bills = sum(result['monthly'][u].size for u in UTILITY_TYPES)
+    shift = {
+        u: float(np.mean(result['annual'][u] - result['generic_annual'][u])) for u in UTILITY_TYPES
+    }
+    return {'bills': bills, 'seconds': seconds, 'checked': n_checks, 'max_abs_error': worst, 'mean_annual_shift': shift}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Monthly housing cost over every model combination')
+    parser.add_argument('--benchmark', action='store_true', help='Run the synthetic benchmark')
+    parser.add_argument('--scale', type=int, default=1, help='Multiply the finance and risk model counts')
+    parser.add_argument('--seasonal', action='store_true', help='Benchmark the 12-month utility simulation instead')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+    elif args.seasonal:
+        stats = benchmark_seasonal()
+        print(f"Monthly bills:      {stats['bills']:>12,}")
+        print(f"Time:               {stats['seconds']:>12.3f} s")
+        print(f"Checked vs tier loop: {stats['checked']} bills, max error ${stats['max_abs_error']:.2f}")
+        print("Mean annual change vs 12 x generic month:")
+        for u, shift in stats['mean_annual_shift'].items():
+            print(f"  {u:<10} {shift:>+12,.2f}")
+    else:
+        sizes = {'scenario': 3, 'occupancy': 6, 'lifestyle': 5, 'water': 3, 'sewer': 4,
+                 'electric': 3, 'gas': 3, 'finance': 10 * args.scale, 'risk': 4 * args.scale}
+        stats = benchmark(sizes)
+        print(f"Combinations:       {stats['combinations']:>12,}")
+        print(f"Time:               {stats['seconds']:>12.3f} s")
+        print(f"Checked vs Dashboard port: {stats['checked']} cells, max error ${stats['max_abs_error']:.2e}")
+        print(f"Median monthly:     ${stats['median_total']:>11,.2f}")
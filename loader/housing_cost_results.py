@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Precompute monthly housing costs for every model combination.
+
+Prices the full cross-product with calculate_housing_costs() and stores
+each combination's total and breakdown (integer cents) in the
+housing_cost_results table, so the Dashboard only does a point lookup.
+
+Refreshes are incremental: housing_cost_model_versions holds a checksum of
+every model row the stored results came from. A run recomputes the cube
+(milliseconds), compares checksums, and upserts only the combinations that
+touch a new or changed model row. A changed consumption factor table or a
+new RESULTS_VERSION rewrites everything; deleted models drop out of the
+results through ON DELETE CASCADE.
+
+Alternatively --artifact writes the totals as a static gzip JSON file
+(axis ids + row-major cents), for hosting next to the frontend.
+
+Usage:
+    python housing_cost_results.py                  # incremental refresh
+    python housing_cost_results.py --full           # rewrite every row
+    python housing_cost_results.py --dry-run        # report what would change
+    python housing_cost_results.py --artifact housing_costs.json.gz
+"""
+
+import gzip
+import hashlib
+import json
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+import housing_cost_engine as housing
+import money
+from calculate_carrying_costs import PAGE_SIZE, supabase, fetch_all_rows
+from calculate_housing_costs import calculate_housing_costs, load_housing_models
+
+# Bump when the engine's math or the stored columns change (forces a full refresh)
+RESULTS_VERSION = '1'
+
+# Row fields that never affect the result
+METADATA_FIELDS = ('created_at', 'updated_at', 'sort_order')
+
+# Key columns of housing_cost_results, in housing_cost_engine.AXES order
+KEY_COLUMNS = ('scenario_id', 'occupancy_model_id', 'lifestyle_model_id', 'water_model_id', 'sewer_model_id',
+               'electric_model_id', 'gas_model_id', 'finance_model_id', 'risk_model_id')
+
+
+def row_checksum(row: dict) -> str:
+    """Checksum of a model row's content (metadata columns ignored)."""
+    payload = {k: v for k, v in row.items() if k not in METADATA_FIELDS}
+    return hashlib.md5(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def model_checksums(models: dict) -> dict:
+    """
+    {(axis, model_id): checksum} for every input the results depend on.
+    Scenarios are keyed by their home price; consumption factors and the
+    engine version are single whole-table entries ('*').
+    """
+    rows = {
+        'occupancy': models['occupancy'],
+        'lifestyle': models['lifestyle'],
+        'finance': models['finance'],
+        'risk': models['risk'],
+        **{u: models['utilities'][u] for u in housing.UTILITY_TYPES},
+    }
+    checksums = {(axis, str(row['id'])): row_checksum(row) for axis, axis_rows in rows.items() for row in axis_rows}
+    for scenario, price in zip(models['scenarios'], models['home_prices']):
+        checksums[('scenario', str(scenario['scenario_id']))] = row_checksum({'home_price': price})
+    checksums[('consumption_factors', '*')] = hashlib.md5(
+        ''.join(row_checksum(f) for f in sorted(models['factors'], key=lambda f: f['activity_code'])).encode()
+    ).hexdigest()
+    checksums[('engine', '*')] = RESULTS_VERSION
+    return checksums
+
+
+def load_manifest() -> dict:
+    """Stored {(axis, model_id): checksum} from housing_cost_model_versions."""
+    return {
+        (row['axis'], row['model_id']): row['checksum']
+        for row in fetch_all_rows('housing_cost_model_versions', 'axis, model_id, checksum', order='axis')
+    }
+
+
+def dirty_mask(labels: dict, checksums: dict, stored: dict) -> np.ndarray:
+    """
+    Boolean cube: True where a combination uses a model row whose checksum
+    is new or changed. Everything is dirty when a global input changed.
+    """
+    shape = tuple(len(labels[axis][0]) for axis in housing.AXES)
+    if any(checksums[key] != stored.get(key) for key in (('consumption_factors', '*'), ('engine', '*'))):
+        return np.ones(shape, dtype=bool)
+
+    mask = np.zeros(shape, dtype=bool)
+    for k, axis in enumerate(housing.AXES):
+        changed = np.array([checksums[(axis, str(i))] != stored.get((axis, str(i))) for i in labels[axis][0]], dtype=bool)
+        mask |= changed.reshape(tuple(-1 if j == k else 1 for j in range(len(shape))))
+    return mask
+
+
+def result_columns(result: dict, positions: np.ndarray) -> dict:
+    """
+    int64 cents columns (and axis indices) for the given flat cube positions.
+
+    Returns:
+        {'index': tuple of per-axis index arrays, '<name>_cents': int64 arrays}
+    """
+    p, o, l, w, s, e, g, f, r = np.unravel_index(positions, result['shape'])
+    cents = money.to_cents
+    bills = result['bills']
+    return {
+        'index': (p, o, l, w, s, e, g, f, r),
+        'total_cents': cents(result['total'].ravel()[positions]),
+        'mortgage_principal_cents': cents(result['mortgage']['principal'][p, f, r]),
+        'mortgage_pmi_cents': cents(result['mortgage']['pmi'][p, f, r]),
+        'water_cents': cents(bills['water'][o, l, w]),
+        'sewer_cents': cents(bills['sewer'][o, l, s]),
+        'electric_cents': cents(bills['electric'][o, l, e]),
+        'gas_cents': cents(bills['gas'][o, l, g]),
+        'utility_total_cents': cents(result['utility_total'][o, l, w, s, e, g]),
+        'risk_monthly_cents': cents(result['risk']['monthly_impact'][p, f, r]),
+    }
+
+
+def iter_result_rows(result: dict, positions: np.ndarray, calculated_at: str):
+    """housing_cost_results rows for the given flat cube positions, PAGE_SIZE at a time."""
+    ids = [result['labels'][axis][0] for axis in housing.AXES]
+    for lo in range(0, len(positions), PAGE_SIZE):
+        columns = result_columns(result, positions[lo:lo + PAGE_SIZE])
+        values = {name: array.tolist() for name, array in columns.items() if name != 'index'}
+        index = [axis_index.tolist() for axis_index in columns['index']]
+        yield [
+            {
+                **{key: ids[k][index[k][n]] for k, key in enumerate(KEY_COLUMNS)},
+                **{name: values[name][n] for name in values},
+                'calculated_at': calculated_at,
+            }
+            for n in range(len(index[0]))
+        ]
+
+
+def write_manifest(checksums: dict, stored: dict) -> None:
+    """Upsert changed checksums and drop entries for models that no longer exist."""
+    changed = [
+        {'axis': axis, 'model_id': model_id, 'checksum': checksum}
+        for (axis, model_id), checksum in checksums.items() if stored.get((axis, model_id)) != checksum
+    ]
+    for lo in range(0, len(changed), PAGE_SIZE):
+        supabase.table('housing_cost_model_versions').upsert(
+            changed[lo:lo + PAGE_SIZE], on_conflict='axis,model_id'
+        ).execute()
+    for axis, model_id in set(stored) - set(checksums):
+        supabase.table('housing_cost_model_versions').delete().eq('axis', axis).eq('model_id', model_id).execute()
+
+
+def refresh_housing_costs(full: bool = False, dry_run: bool = False, models: dict = None) -> dict:
+    """
+    Bring housing_cost_results up to date with the model tables.
+
+    Args:
+        full: Rewrite every combination regardless of checksums
+        dry_run: Compute and report, write nothing
+        models: Output of load_housing_models() (loaded if omitted)
+
+    Returns:
+        {'combinations', 'rows_written', 'seconds_compute', 'seconds_write'}
+    """
+    start = time.perf_counter()
+    models = models or load_housing_models()
+    result = calculate_housing_costs(models)
+    checksums = model_checksums(models)
+    stored = {} if full else load_manifest()
+    positions = np.flatnonzero(dirty_mask(result['labels'], checksums, stored))
+    compute_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if not dry_run:
+        calculated_at = datetime.now(timezone.utc).isoformat()
+        for rows in iter_result_rows(result, positions, calculated_at):
+            supabase.table('housing_cost_results').upsert(rows, on_conflict=','.join(KEY_COLUMNS)).execute()
+        write_manifest(checksums, load_manifest() if full else stored)
+
+    return {
+        'combinations': int(result['total'].size),
+        'rows_written': 0 if dry_run else len(positions),
+        'rows_dirty': len(positions),
+        'seconds_compute': compute_seconds,
+        'seconds_write': time.perf_counter() - start,
+    }
+
+
+def write_artifact(result: dict, path: str) -> int:
+    """
+    Static lookup file: gzip JSON with axis ids, the cube shape and the
+    row-major total cents (index = ravel of the per-axis positions).
+
+    Returns:
+        Bytes written
+    """
+    payload = {
+        'version': RESULTS_VERSION,
+        'axes': list(housing.AXES),
+        'ids': {axis: [str(i) for i in result['labels'][axis][0]] for axis in housing.AXES},
+        'shape': list(result['shape']),
+        'total_cents': money.to_cents(result['total'].ravel()).tolist(),
+    }
+    data = gzip.compress(json.dumps(payload, separators=(',', ':')).encode())
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Precompute monthly housing costs for every model combination')
+    parser.add_argument('--full', action='store_true', help='Rewrite every row, ignoring stored checksums')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would be written')
+    parser.add_argument('--artifact', metavar='PATH', help='Write a gzip JSON lookup file instead of the table')
+    args = parser.parse_args()
+
+    print(f"{'='*60}")
+    print("HOUSING COST RESULTS REFRESH")
+    print(f"{'='*60}")
+
+    if args.artifact:
+        result = calculate_housing_costs()
+        size = write_artifact(result, args.artifact)
+        print(f"Wrote {result['total'].size:,} combinations to {args.artifact} ({size / 1024:,.1f} KB)")
+    else:
+        stats = refresh_housing_costs(full=args.full, dry_run=args.dry_run)
+        print(f"Combinations:  {stats['combinations']:>12,}")
+        print(f"Changed:       {stats['rows_dirty']:>12,}")
+        print(f"Rows written:  {stats['rows_written']:>12,}")
+        print(f"Compute:       {stats['seconds_compute']:>12.2f} s")
+        print(f"Write:         {stats['seconds_write']:>12.2f} s")
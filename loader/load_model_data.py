@@ -17,10 +17,11 @@ import os
 import csv
 import argparse
 from datetime import date
-from decimal import Decimal
 from dotenv import load_dotenv
 from supabase import create_client, Client
 
+import money
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -71,8 +72,9 @@ def load_cost_model(csv_path: str, model_name: str, description: str = None) ->
     print(f"  Project period: {project_start} to {project_end}")
 
     # Calculate totals
-    total_cost = sum(Decimal(r['amount_total']) for r in valid_rows)
-    print(f"  Total cost: ${total_cost:,.2f}")
+    amount_cents = money.to_cents([r['amount_total'] for r in valid_rows])
+    total_cost = money.format_cents(money.sum_cents(amount_cents))
+    print(f"  Total cost: {total_cost}")
 
     # Create cost_time_model record
     print("\nCreating cost_time_model...")
@@ -92,25 +94,26 @@ def load_cost_model(csv_path: str, model_name: str, description: str = None) ->
     # Prepare cost entries
     print("\nInserting cost entries...")
     entries = []
-    for row in valid_rows:
+    for row, cents in zip(valid_rows, amount_cents.tolist()):
+        # Money goes over the wire as exact decimal strings, never floats
         entry = {
             'cost_time_model_id': model_id,
             'ce_id': row['ce_id'],
             'date_paid': row['date_paid'],
-            'amount_total': float(row['amount_total']),
+            'amount_total': money.cents_to_str(cents),
         }
 
         # Optional fields - check for non-empty values
         if row.get('amount_material') and row['amount_material'].strip():
-            entry['amount_material'] = float(row['amount_material'])
+            entry['amount_material'] = money.cents_to_str(money.parse_cents(row['amount_material']))
         if row.get('labor_hours') and row['labor_hours'].strip():
             entry['labor_hours'] = float(row['labor_hours'])
         if row.get('labor_rate') and row['labor_rate'].strip():
-            entry['labor_rate'] = float(row['labor_rate'])
+            entry['labor_rate'] = money.cents_to_str(money.parse_cents(row['labor_rate']))
         if row.get('amount_labor') and row['amount_labor'].strip():
-            entry['amount_labor'] = float(row['amount_labor'])
+            entry['amount_labor'] = money.cents_to_str(money.parse_cents(row['amount_labor']))
         if row.get('amount_op_other') and row['amount_op_other'].strip():
-            entry['amount_op_other'] = float(row['amount_op_other'])
+            entry['amount_op_other'] = money.cents_to_str(money.parse_cents(row['amount_op_other']))
         if row.get('notes') and row['notes'].strip():
             entry['notes'] = row['notes']
 
@@ -127,7 +130,7 @@ def load_cost_model(csv_path: str, model_name: str, description: str = None) ->
     print(f"  Model ID: {model_id}")
     print(f"  Model Name: {model_name}")
     print(f"  Entries: {len(entries)}")
-    print(f"  Total: ${total_cost:,.2f}")
+    print(f"  Total: {total_cost}")
 
     return model_id
 
@@ -138,6 +141,8 @@ def load_finance_model(csv_path: str, model_name: str, description: str = None)
 
     CSV columns:
         phase, annual_rate, compound_annually, notes
+        compounding (optional: simple, annual, monthly, daily, continuous)
+        effective_from, effective_to (optional: YYYY-MM-DD, dated rate segments)
 
     Returns the created model ID.
     """
@@ -180,6 +185,11 @@ def load_finance_model(csv_path: str, model_name: str, description: str = None)
             'annual_rate': float(row['annual_rate']),
             'compound_annually': row.get('compound_annually', 'true').lower() == 'true',
         }
+        if row.get('compounding'):
+            assumption['compounding'] = row['compounding'].strip().lower()
+        for column in ('effective_from', 'effective_to'):
+            if row.get(column):
+                assumption[column] = row[column].strip()
         if row.get('notes'):
             assumption['notes'] = row['notes']
         assumptions.append(assumption)
@@ -195,7 +205,10 @@ def load_finance_model(csv_path: str, model_name: str, description: str = None)
     # Show rate summary
     print("\n  Rates by phase:")
     for row in rows:
-        print(f"    {row['phase']:20s}: {float(row['annual_rate'])*100:.1f}%")
+        window = ""
+        if row.get('effective_from') or row.get('effective_to'):
+            window = f" ({row.get('effective_from') or 'start'} to {row.get('effective_to') or 'end'})"
+        print(f"    {row['phase']:20s}: {float(row['annual_rate'])*100:.1f}%{window}")
 
     return model_id
 
@@ -237,14 +250,12 @@ def list_models():
 
 def calculate_and_display(cost_model_id: str, finance_model_id: str):
     """Calculate and display carrying costs."""
-    from calculate_carrying_costs import calculate_model_carrying_costs
-
-    # Get model names
-    cost_result = supabase.table('cost_time_models').select('name').eq('id', cost_model_id).execute()
-    finance_result = supabase.table('finance_models').select('name').eq('id', finance_model_id).execute()
+    from calculate_carrying_costs import calculate_model_carrying_costs, load_calculation_bundle
 
-    cost_name = cost_result.data[0]['name'] if cost_result.data else cost_model_id
-    finance_name = finance_result.data[0]['name'] if finance_result.data else finance_model_id
+    # Fetch entries, rates, dates and model names in one go
+    bundle = load_calculation_bundle(cost_model_id, finance_model_id)
+    cost_name = bundle['cost_model_name']
+    finance_name = bundle['finance_model_name']
 
     print(f"\n{'='*60}")
     print(f"CARRYING COST CALCULATION")
@@ -252,7 +263,7 @@ def calculate_and_display(cost_model_id: str, finance_model_id: str):
     print(f"Cost Model:    {cost_name}")
     print(f"Finance Model: {finance_name}")
 
-    result = calculate_model_carrying_costs(cost_model_id, finance_model_id)
+    result = calculate_model_carrying_costs(cost_model_id, finance_model_id, bundle=bundle, details='none')
 
     print(f"\nProject Period: {result['project_start']} to {result['project_end']}")
     print(f"Cost Entries:   {result['entry_count']}")
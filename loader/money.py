@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Shared money representation: integer cents.
+
+Loaders and calculation engines keep amounts as int (scalars) or int64
+numpy arrays (columns) of cents, so sums are exact and vectorized. Conversion
+happens only at the edges:
+- Parsing input (CSV cells, Supabase numerics, floats): exact decimal value
+  rounded to the cent, half away from zero ('12.345' -> 1235)
+- Computed amounts (interest, shares): rounded half-even, like
+  Decimal.quantize() in the original carrying cost code
+- Output: Decimal, exact '1234.56' strings for Supabase numeric columns,
+  floats for JSON/display
+
+int64 cents hold up to ~$92 quadrillion, far beyond any ledger here.
+
+Cents are used wherever amounts come from cost entries and are summed or
+stored: the carrying cost engine and incremental ledger, the construction
+loan and developer return engines (int64 cents in), load_model_data.py,
+and housing_cost_results.py (stored breakdowns). housing_cost_engine,
+tariff_engine, amortization_engine, affordability_engine,
+projection_engine and risk_engine stay on float dollars on purpose: they
+reproduce the Dashboard's and the SQL functions' float arithmetic step
+for step (Math.round included), or solve continuous quantities (prices,
+NPVs, escalations, Monte Carlo losses) that are never summed as a ledger;
+their results become cents only where they are stored.
+
+Parse and rounding cases: loader/tests/test_money.py
+
+    python money.py --check       # exactness checks on random amounts
+    python money.py --benchmark   # parse/sum speed vs Decimal
+"""
+
+import time
+from decimal import Decimal, ROUND_HALF_UP, ROUND_HALF_EVEN
+
+import numpy as np
+
+CENT = Decimal('0.01')
+
+# |x * 100 - nearest integer| above this may be a half-cent in the decimal
+# input that binary floats can't show, so those values are parsed exactly
+HALF_CENT_GUARD = 0.5 - 1e-6
+
+
+def parse_cents(value) -> int:
+    """
+    Exact cents for one amount (str, int, float, Decimal), half away from zero.
+    Floats are read through their shortest repr, so 0.1 means 10 cents.
+    """
+    if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+        return int(value) * 100
+    if isinstance(value, (float, np.floating)):
+        value = repr(float(value))
+    amount = Decimal(str(value).strip().replace(',', '').replace('$', ''))
+    return int(amount.quantize(CENT, rounding=ROUND_HALF_UP) * 100)
+
+
+def to_cents(values) -> np.ndarray:
+    """
+    Vectorized parse_cents() for a column of amounts -> int64 array.
+
+    Values with at most two decimals (every stored amount) take the float
+    fast path, which is exact for them; anything that could be a third-decimal
+    half-cent is re-parsed exactly.
+    """
+    values = list(values) if not isinstance(values, np.ndarray) else values
+    try:
+        floats = np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        # Formatted strings ('$1,234.56') or mixed types
+        return np.array([parse_cents(v) for v in values], dtype=np.int64)
+    scaled = floats * 100
+    cents = np.rint(scaled)
+
+    unsure = np.flatnonzero(~np.isfinite(scaled) | (np.abs(scaled - cents) > HALF_CENT_GUARD))
+    cents = cents.astype(np.int64) if not len(unsure) else np.where(np.isfinite(cents), cents, 0).astype(np.int64)
+    for i in unsure.tolist():
+        cents[i] = parse_cents(values[i])
+    return cents
+
+
+def half_even_cents(raw_cents) -> np.ndarray:
+    """Round computed (fractional) cent values half-even to int64 cents."""
+    return np.rint(np.asarray(raw_cents, dtype=np.float64)).astype(np.int64)
+
+
+def sum_cents(cents) -> int:
+    """Exact total of a cents array."""
+    return int(np.asarray(cents, dtype=np.int64).sum())
+
+
+def cents_to_decimal(cents: int) -> Decimal:
+    """Exact Decimal dollars."""
+    return Decimal(int(cents)) / 100
+
+
+def cents_to_str(cents: int) -> str:
+    """Exact dollars string for Supabase numeric columns ('-1234.05')."""
+    cents = int(cents)
+    sign = '-' if cents < 0 else ''
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def cents_to_dollars(cents) -> float:
+    """Dollars as float (nearest double to the exact value) for JSON/display."""
+    return int(cents) / 100
+
+
+def format_cents(cents: int) -> str:
+    """'$1,234.56' / '-$1,234.56'."""
+    cents = int(cents)
+    sign = '-' if cents < 0 else ''
+    return f"{sign}${abs(cents) // 100:,}.{abs(cents) % 100:02d}"
+
+
+def decimal_half_even_cents(value: Decimal) -> int:
+    """Cents of a computed Decimal dollar value, half-even (Decimal.quantize default)."""
+    return int(value.quantize(CENT, rounding=ROUND_HALF_EVEN) * 100)
+
+
+# ============================================================
+# Exactness checks and benchmark
+# ============================================================
+
+def exactness_checks(n_random: int = 200_000, seed: int = 0) -> dict:
+    """
+    Vectorized-vs-scalar agreement on random amounts, and exact int64 sums
+    vs Decimal sums (with the float-sum drift for reference).
+    """
+    rng = np.random.default_rng(seed)
+    cents = rng.integers(-10**11, 10**11, n_random)
+    strings = [cents_to_str(c) for c in cents.tolist()]
+    three_dp = [f"{x:.3f}" for x in rng.uniform(-1e6, 1e6, n_random // 10)]
+
+    parsed = to_cents(strings)
+    parse_mismatches = int((parsed != cents).sum())
+    parse_mismatches += sum(int(a) != parse_cents(s) for a, s in zip(to_cents(three_dp).tolist(), three_dp))
+
+    exact_total = sum((Decimal(s) for s in strings), Decimal(0))
+    float_total = float(np.sum(np.asarray(strings, dtype=np.float64)))
+
+    return {
+        'random_amounts': n_random + len(three_dp),
+        'parse_mismatches': parse_mismatches,
+        'sum_exact': cents_to_decimal(sum_cents(parsed)) == exact_total,
+        'float_sum_drift': abs(Decimal(repr(float_total)) - exact_total),
+    }
+
+
+def benchmark(n_amounts: int = 1_000_000, seed: int = 0) -> dict:
+    """Parse + sum amount strings: int64 cents vs per-value Decimal."""
+    rng = np.random.default_rng(seed)
+    strings = [cents_to_str(c) for c in rng.integers(0, 10**9, n_amounts).tolist()]
+
+    start = time.perf_counter()
+    cents = to_cents(strings)
+    cents_parse_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    total = sum_cents(cents)
+    cents_sum_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decimals = [Decimal(s).quantize(CENT) for s in strings]
+    decimal_parse_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    decimal_total = sum(decimals, Decimal(0))
+    decimal_sum_seconds = time.perf_counter() - start
+
+    return {
+        'amounts': n_amounts,
+        'cents_parse_seconds': cents_parse_seconds,
+        'cents_sum_seconds': cents_sum_seconds,
+        'decimal_parse_seconds': decimal_parse_seconds,
+        'decimal_sum_seconds': decimal_sum_seconds,
+        'equal': cents_to_decimal(total) == decimal_total,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Integer-cents money helpers')
+    parser.add_argument('--check', action='store_true', help='Run exactness checks on random amounts')
+    parser.add_argument('--benchmark', action='store_true', help='Time parse + sum vs Decimal')
+    parser.add_argument('--amounts', type=int, default=1_000_000, help='Benchmark size')
+    args = parser.parse_args()
+
+    if args.check:
+        stats = exactness_checks()
+        print(f"Random amounts:    {stats['random_amounts']:>10,} ({stats['parse_mismatches']} mismatches)")
+        print(f"Cents sum exact:   {stats['sum_exact']!s:>10}")
+        print(f"Float sum drift:   ${stats['float_sum_drift']}")
+    elif args.benchmark:
+        stats = benchmark(args.amounts)
+        print(f"Amounts:           {stats['amounts']:>10,}")
+        print(f"{'':19}{'parse':>10}{'sum':>10}")
+        print(f"int64 cents:       {stats['cents_parse_seconds']:>9.3f}s{stats['cents_sum_seconds']:>9.4f}s")
+        print(f"Decimal:           {stats['decimal_parse_seconds']:>9.3f}s{stats['decimal_sum_seconds']:>9.4f}s")
+        print(f"Totals equal:      {stats['equal']!s:>10}")
+    else:
+        parser.print_help()
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Lifetime (multi-year) housing cost projection.
+
+housing_cost_engine.py prices one month. Over a 30-year hold the same
+household also sees the operating costs escalate and PMI drop off:
+    O01-Utilities, O02-Maint, O05-HOA   grow with inflation
+    O03-PropIns                         inflation x (1 + insurance escalation)
+    O04-Taxes                           follows the assessed value: grows
+                                        with inflation up to the assessment
+                                        cap, reset to market value (home
+                                        appreciation) every reassessment cycle
+    mortgage P&I                        level until the loan is paid off
+    PMI                                 until the balance reaches the LTV
+                                        cutoff (amortization_engine.py)
+
+Escalation steps on each anniversary of the purchase. Projections are
+(scenarios x periods) with yearly or monthly periods; amounts are
+discounted at each period's end.
+
+Every operating series is a first-year amount times a factor vector
+shared by all scenarios, and the loan series are level payments over a
+number of months, so NPV and lifetime totals never need the series:
+    NPV[s, c]  = base[s, c] * sum_y factor[c, y] * discount weight[y]
+    NPV[s, mortgage] = payment[s] * (discount weights of the first n_payments months)
+reevaluate() uses this to apply a new escalation parameter by rebuilding
+only the factor vectors that depend on it and updating their NPV / total
+columns, without touching the other components or any (scenarios x
+periods) array. series() and cumulative() build the arrays on demand.
+
+No Supabase dependency; see lifetime_costs() in calculate_housing_costs.py
+for the database-backed entry point.
+
+    python projection_engine.py --benchmark
+"""
+
+import time
+
+import numpy as np
+
+import amortization_engine as amortization
+from housing_cost_engine import DEFAULT_TERM_YEARS
+
+# Operating cost elements (cost_elements_unified), in column order
+COMPONENTS = ('O01-Utilities', 'O02-Maint', 'O03-PropIns', 'O04-Taxes', 'O05-HOA')
+LOAN_COMPONENTS = ('mortgage', 'pmi')
+SERIES_COMPONENTS = COMPONENTS + LOAN_COMPONENTS
+
+PERIODS_PER_YEAR = {'year': 1, 'month': 12}
+
+# Annual rates (decimal); reassessment_years 0 = never reassessed
+DEFAULT_ESCALATION = {
+    'inflation': 0.025,
+    'insurance_escalation': 0.03,
+    'appreciation': 0.035,
+    'assessment_cap': 0.02,
+    'reassessment_years': 5,
+    'discount_rate': 0.05,
+}
+
+# Escalation parameters each operating component depends on
+COMPONENT_PARAMS = {
+    'O01-Utilities': ('inflation',),
+    'O02-Maint': ('inflation',),
+    'O03-PropIns': ('inflation', 'insurance_escalation'),
+    'O04-Taxes': ('inflation', 'appreciation', 'assessment_cap', 'reassessment_years'),
+    'O05-HOA': ('inflation',),
+}
+
+# First-year O02-O04 as a share of the home price (no per-home operating
+# amounts are stored yet); O05-HOA is a flat amount
+DEFAULT_OPERATING_RATES = {'O02-Maint': 0.01, 'O03-PropIns': 0.0035, 'O04-Taxes': 0.011}
+
+
+def operating_bases(home_prices, utility_annual, hoa_annual=0.0, rates: dict = None) -> np.ndarray:
+    """
+    First-year operating costs per scenario.
+
+    Args:
+        home_prices: (scenarios,) purchase prices
+        utility_annual: O01 annual utility cost (scalar or (scenarios,))
+        hoa_annual: O05 annual HOA dues (scalar or (scenarios,))
+        rates: {component: annual share of the home price} for O02-O04
+
+    Returns:
+        (scenarios, COMPONENTS) annual dollars
+    """
+    rates = {**DEFAULT_OPERATING_RATES, **(rates or {})}
+    price = np.asarray(home_prices, dtype=np.float64)
+    columns = [np.broadcast_to(np.asarray(utility_annual, dtype=np.float64), price.shape)]
+    columns += [price * rates[c] for c in ('O02-Maint', 'O03-PropIns', 'O04-Taxes')]
+    columns.append(np.broadcast_to(np.asarray(hoa_annual, dtype=np.float64), price.shape))
+    return np.stack(columns, axis=1)
+
+
+# ============================================================
+# Escalation factors
+# ============================================================
+
+def assessed_value_index(years: int, inflation: float, appreciation: float, assessment_cap: float,
+                         reassessment_years: int) -> np.ndarray:
+    """
+    Assessed value relative to year 1: between reassessments it grows with
+    inflation up to the cap; in reassessment years it is reset to the
+    market value (purchase price grown at the appreciation rate).
+    """
+    y = np.arange(years)
+    cycle = int(reassessment_years)
+    last_reset = (y // cycle) * cycle if cycle > 0 else np.zeros(years, dtype=np.int64)
+    return np.power(1 + appreciation, last_reset) * np.power(1 + min(inflation, assessment_cap), y - last_reset)
+
+
+def component_factor(component: str, params: dict, years: int) -> np.ndarray:
+    """(years,) multiplier on a component's first-year amount."""
+    y = np.arange(years)
+    inflation = params['inflation']
+    if component == 'O03-PropIns':
+        return np.power((1 + inflation) * (1 + params['insurance_escalation']), y)
+    if component == 'O04-Taxes':
+        return assessed_value_index(years, inflation, params['appreciation'], params['assessment_cap'],
+                                    params['reassessment_years'])
+    return np.power(1 + inflation, y)
+
+
+def month_discount(discount_rate: float, years: int, periods: str) -> np.ndarray:
+    """
+    (years * 12,) discount weight of each month's cash flow: the end of
+    its month for monthly periods, the end of its year for yearly ones.
+    """
+    per_year = PERIODS_PER_YEAR[periods]
+    period_end = (np.arange(years * per_year) + 1) / per_year
+    return np.repeat(np.power(1 + discount_rate, -period_end), 12 // per_year)
+
+
+def _price(projection: dict, components) -> None:
+    """(Re)compute NPV and lifetime totals for the given components in place."""
+    months = projection['years'] * 12
+    weights = projection['month_discount']
+    year_weight = weights.reshape(projection['years'], 12).mean(axis=1)
+    level_pv = np.concatenate(([0.0], np.cumsum(weights)))
+
+    for component in components:
+        c = SERIES_COMPONENTS.index(component)
+        if component in COMPONENTS:
+            factor = projection['factors'][c]
+            base = projection['operating'][:, c]
+            projection['component_npv'][:, c] = base * (factor @ year_weight)
+            projection['component_total'][:, c] = base * factor.sum()
+        else:
+            level, n = (projection['payment'], projection['n_payments']) if component == 'mortgage' \
+                else (projection['pmi_monthly'], projection['pmi_months'])
+            n = np.minimum(n, months)
+            projection['component_npv'][:, c] = level * level_pv[n]
+            projection['component_total'][:, c] = level * n
+
+    projection['npv'] = projection['component_npv'].sum(axis=1)
+    projection['total'] = projection['component_total'].sum(axis=1)
+
+
+def project(operating, loans: dict = None, params: dict = None, years: int = DEFAULT_TERM_YEARS,
+            periods: str = 'year') -> dict:
+    """
+    Lifetime cost projection for many scenarios at once.
+
+    Args:
+        operating: (scenarios, COMPONENTS) first-year annual amounts (operating_bases())
+        loans: amortization_engine loan arrays with one loan per scenario (None = no mortgage)
+        params: Overrides of DEFAULT_ESCALATION
+        years: Projection horizon
+        periods: 'year' or 'month'
+
+    Returns:
+        {
+            'years', 'periods', 'n_periods', 'params',
+            'operating': (scenarios, COMPONENTS),
+            'payment', 'n_payments', 'pmi_monthly', 'pmi_months': (scenarios,),
+            'factors': (COMPONENTS, years), 'month_discount': (years * 12,),
+            'component_npv', 'component_total': (scenarios, SERIES_COMPONENTS),
+            'npv', 'total': (scenarios,) dollars
+        }
+    """
+    if periods not in PERIODS_PER_YEAR:
+        raise ValueError(f"periods must be one of {sorted(PERIODS_PER_YEAR)}")
+    params = {**DEFAULT_ESCALATION, **(params or {})}
+    operating = np.asarray(operating, dtype=np.float64)
+    n = operating.shape[0]
+
+    if loans is None:
+        payment = pmi_monthly = np.zeros(n)
+        n_payments = n_pmi = np.zeros(n, dtype=np.int64)
+    else:
+        summary = amortization.loan_summary(loans)
+        payment, n_pmi = summary['payment'], summary['pmi_months']
+        n_payments, pmi_monthly = loans['n_payments'], loans['pmi_monthly']
+
+    projection = {
+        'years': years,
+        'periods': periods,
+        'n_periods': years * PERIODS_PER_YEAR[periods],
+        'params': params,
+        'operating': operating,
+        'payment': payment,
+        'n_payments': n_payments,
+        'pmi_monthly': pmi_monthly,
+        'pmi_months': n_pmi,
+        'factors': np.stack([component_factor(c, params, years) for c in COMPONENTS]),
+        'month_discount': month_discount(params['discount_rate'], years, periods),
+        'component_npv': np.empty((n, len(SERIES_COMPONENTS))),
+        'component_total': np.empty((n, len(SERIES_COMPONENTS))),
+    }
+    _price(projection, SERIES_COMPONENTS)
+    return projection
+
+
+def reevaluate(projection: dict, **changes) -> dict:
+    """
+    The projection under changed escalation parameters, recomputing only
+    the factor vectors and NPV / total columns that depend on them
+    (a discount rate change reprices every component).
+
+    Returns:
+        A new projection dict; the input is left unchanged
+    """
+    unknown = set(changes) - set(DEFAULT_ESCALATION)
+    if unknown:
+        raise ValueError(f"Unknown escalation parameters: {sorted(unknown)}")
+    changed = {k for k, v in changes.items() if projection['params'][k] != v}
+    updated = {
+        **projection,
+        'params': {**projection['params'], **changes},
+        'component_npv': projection['component_npv'].copy(),
+        'component_total': projection['component_total'].copy(),
+    }
+    if not changed:
+        return updated
+
+    affected = [c for c in COMPONENTS if changed & set(COMPONENT_PARAMS[c])]
+    if affected:
+        updated['factors'] = projection['factors'].copy()
+        for component in affected:
+            updated['factors'][COMPONENTS.index(component)] = component_factor(component, updated['params'], projection['years'])
+    if 'discount_rate' in changed:
+        updated['month_discount'] = month_discount(updated['params']['discount_rate'], projection['years'], projection['periods'])
+        affected = SERIES_COMPONENTS
+    _price(updated, affected)
+    return updated
+
+
+# ============================================================
+# Series
+# ============================================================
+
+def series(projection: dict, components=SERIES_COMPONENTS, rows=None) -> np.ndarray:
+    """
+    Cost per period, summed over the given components.
+
+    Args:
+        components: Subset of SERIES_COMPONENTS
+        rows: Optional scenario indices (all scenarios by default)
+
+    Returns:
+        (scenarios, n_periods) dollars
+    """
+    rows = slice(None) if rows is None else np.asarray(rows)
+    per_year = PERIODS_PER_YEAR[projection['periods']]
+    period = np.arange(projection['n_periods'])
+    months_per_period = 12 // per_year
+
+    operating = [c for c in components if c in COMPONENTS]
+    columns = [COMPONENTS.index(c) for c in operating]
+    factors = projection['factors'][columns][:, period // per_year] / per_year
+    out = projection['operating'][rows][:, columns] @ factors
+
+    for component in components:
+        if component in LOAN_COMPONENTS:
+            level, n = (projection['payment'], projection['n_payments']) if component == 'mortgage' \
+                else (projection['pmi_monthly'], projection['pmi_months'])
+            months = np.clip(n[rows][:, None] - months_per_period * period[None, :], 0, months_per_period)
+            out += months * level[rows][:, None]
+    return out
+
+
+def cumulative(projection: dict, components=SERIES_COMPONENTS, rows=None) -> np.ndarray:
+    """Running total of series() through each period."""
+    return np.cumsum(series(projection, components, rows), axis=1)
+
+
+# ============================================================
+# Reference and benchmark
+# ============================================================
+
+def reference_projection(operating, payment: float, n_payments: int, pmi_monthly: float, n_pmi: int,
+                         params: dict, years: int = DEFAULT_TERM_YEARS) -> dict:
+    """Month-by-month walk for one scenario (monthly periods), used to check project()."""
+    params = {**DEFAULT_ESCALATION, **params}
+    inflation, cycle = params['inflation'], int(params['reassessment_years'])
+    general = insurance = assessed = market = 1.0
+    monthly, npv = [], 0.0
+    for y in range(years):
+        if y > 0:
+            general *= 1 + inflation
+            insurance *= (1 + inflation) * (1 + params['insurance_escalation'])
+            market *= 1 + params['appreciation']
+            assessed = market if cycle and y % cycle == 0 else assessed * (1 + min(inflation, params['assessment_cap']))
+        index = (general, general, insurance, assessed, general)
+        for month in range(12):
+            m = y * 12 + month
+            amount = sum(base * i for base, i in zip(operating, index)) / 12
+            amount += (payment if m < n_payments else 0.0) + (pmi_monthly if m < n_pmi else 0.0)
+            monthly.append(amount)
+            npv += amount / (1 + params['discount_rate']) ** ((m + 1) / 12)
+    return {'monthly': monthly, 'npv': npv, 'total': sum(monthly)}
+
+
+def synthetic_scenarios(n_scenarios: int, seed: int = 0) -> dict:
+    """Random loans (amortization_engine) with matching first-year operating costs."""
+    rng = np.random.default_rng(seed)
+    loans = amortization.synthetic_loans(n_scenarios, seed)
+    operating = operating_bases(
+        loans['home_value'],
+        rng.uniform(2_400, 6_000, n_scenarios),
+        rng.choice([0.0, 1_200.0, 3_600.0], n_scenarios),
+    )
+    return {'operating': operating, 'loans': loans}
+
+
+def benchmark(n_scenarios: int = 100_000, years: int = DEFAULT_TERM_YEARS, n_checks: int = 200, seed: int = 0) -> dict:
+    """Yearly and monthly projections for synthetic scenarios; one-parameter re-evaluation vs a full rebuild."""
+    scenarios = synthetic_scenarios(n_scenarios, seed)
+
+    start = time.perf_counter()
+    yearly = project(scenarios['operating'], scenarios['loans'], years=years)
+    project_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    yearly_series = cumulative(yearly)
+    series_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    monthly = project(scenarios['operating'], scenarios['loans'], years=years, periods='month')
+    monthly_seconds = time.perf_counter() - start
+
+    changed = {'insurance_escalation': 0.05}
+    start = time.perf_counter()
+    updated = reevaluate(monthly, **changed)
+    reevaluate_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    rebuilt = project(scenarios['operating'], scenarios['loans'], {**monthly['params'], **changed}, years, 'month')
+    rebuild_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, n_scenarios, n_checks)
+    checked = series(updated, rows=rows)
+    worst_series = worst_npv = 0.0
+    for k, j in enumerate(rows.tolist()):
+        ref = reference_projection(scenarios['operating'][j], float(updated['payment'][j]), int(updated['n_payments'][j]),
+                                   float(updated['pmi_monthly'][j]), int(updated['pmi_months'][j]), updated['params'], years)
+        worst_series = max(worst_series, float(np.max(np.abs(checked[k] - ref['monthly']))))
+        worst_npv = max(worst_npv, abs(float(updated['npv'][j]) - ref['npv']), abs(float(updated['total'][j]) - ref['total']))
+
+    return {
+        'scenarios': n_scenarios,
+        'years': years,
+        'project_seconds': project_seconds,
+        'series_seconds': series_seconds,
+        'series_mb': yearly_series.nbytes / 1e6,
+        'monthly_seconds': monthly_seconds,
+        'reevaluate_seconds': reevaluate_seconds,
+        'rebuild_seconds': rebuild_seconds,
+        'reevaluate_error': float(np.max(np.abs(updated['npv'] - rebuilt['npv']))),
+        'checked': n_checks,
+        'max_series_error': worst_series,
+        'max_npv_error': worst_npv,
+        'yearly_total_error': float(np.max(np.abs(yearly_series[:, -1] - yearly['total']))),
+        'median_npv': float(np.median(yearly['npv'])),
+        'median_total': float(np.median(yearly['total'])),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Lifetime housing cost projection over many scenarios')
+    parser.add_argument('--benchmark', action='store_true', help='Project synthetic scenarios')
+    parser.add_argument('--scenarios', type=int, default=100_000, help='Number of synthetic scenarios')
+    parser.add_argument('--years', type=int, default=DEFAULT_TERM_YEARS, help='Projection horizon')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+    else:
+        stats = benchmark(args.scenarios, args.years)
+        print(f"Scenarios x years:   {stats['scenarios']:,} x {stats['years']}")
+        print(f"Yearly projection:   {stats['project_seconds']:.3f} s (NPV + totals)")
+        print(f"Cumulative series:   {stats['series_seconds']:.3f} s, {stats['series_mb']:,.1f} MB")
+        print(f"Monthly projection:  {stats['monthly_seconds']:.3f} s")
+        print(f"Re-evaluate O03:     {stats['reevaluate_seconds']:.4f} s vs {stats['rebuild_seconds']:.3f} s full rebuild "
+              f"(max NPV difference ${stats['reevaluate_error']:.2e})")
+        print(f"Checked vs monthly walk: {stats['checked']} scenarios, max period error ${stats['max_series_error']:.2e}, "
+              f"max NPV / total error ${stats['max_npv_error']:.2e}")
+        print(f"Median NPV:          ${stats['median_npv']:>12,.0f}  (lifetime total ${stats['median_total']:,.0f})")
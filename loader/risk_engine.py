@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+R1-R4 risk costs on actual cost-model timelines.
+
+The Dashboard's riskAdjustments prices one risk preset at a time against a
+home price with fixed assumptions: a 12-month build, a construction loan
+balance of 70% of the price for the whole delay, and marketing at 2% of the
+price. This engine applies every risk_models preset to every cost model at
+once, using each model's own monthly payment timeline (cost_entries over
+the cost_time_models project dates):
+
+- construction loan: pro-rata draws of CONSTRUCTION_LTC of each month's
+  costs, interest capitalized monthly (construction_loan_engine.py)
+- R2 rate premium: extra construction interest over the timeline at
+  (rate + premium) vs the base rate
+- R1 schedule variance: construction_months x variance% extra months
+  carrying the closing loan balance, compounded monthly
+- R4 sales period: further months carrying that balance after the delay;
+  marketing add-on = MARKETING_SHARE x total cost x (multiplier - 1), once
+- R3 contingency: design + construction contingency % of the total cost;
+  the contingency is financed like the costs it covers, so it also
+  carries that share of the construction interest and the carry above
+
+All outputs are (cost models, risk models) arrays in dollars; monthly_impact()
+spreads the one-time total over a mortgage term like the Dashboard.
+
+No Supabase dependency; see risk_comparison() in calculate_carrying_costs.py
+for the database-backed entry point.
+
+    python risk_engine.py --benchmark
+"""
+
+import time
+
+import numpy as np
+
+import construction_loan_engine as construction_loan
+from housing_cost_engine import CONSTRUCTION_LTC, DEFAULT_CONSTRUCTION_RATE, DEFAULT_TERM_YEARS, MARKETING_SHARE, risk_arrays
+
+ONE_TIME_FIELDS = ('premium_interest', 'schedule_carry', 'sales_carry', 'contingency', 'contingency_carry', 'marketing_addon')
+
+
+def timeline_matrix(timelines: list[dict]) -> dict:
+    """
+    Monthly cost series for several cost models on one (models, months) grid.
+    Each row starts at its own first month; columns past a model's end are 0.
+
+    Args:
+        timelines: [{'amount_cents': int64 array, 'paid_month': month numbers,
+                     'first_month': int, 'n_months': int}]
+
+    Returns:
+        {'cost': (models, months) dollars, 'n_months': (models,) int64}
+    """
+    n_months = np.array([max(int(t['n_months']), 1) for t in timelines], dtype=np.int64)
+    width = int(n_months.max(initial=1))
+    slots, weights = [], []
+    for m, t in enumerate(timelines):
+        slot = np.clip(np.asarray(t['paid_month'], dtype=np.int64) - t['first_month'], 0, n_months[m] - 1)
+        slots.append(m * width + slot)
+        weights.append(np.asarray(t['amount_cents'], dtype=np.float64))
+    flat = np.bincount(
+        np.concatenate(slots) if slots else np.zeros(0, dtype=np.int64),
+        weights=np.concatenate(weights) if weights else None,
+        minlength=len(timelines) * width,
+    )
+    return {'cost': flat.reshape(len(timelines), width) / 100, 'n_months': n_months}
+
+
+def _construction_interest(draw: np.ndarray, annual_rate: np.ndarray, n_months: np.ndarray) -> tuple:
+    """Interest accrued within each row's own timeline and its closing balance, capitalized."""
+    interest, balance = construction_loan.accrue_interest(
+        draw, {'annual_rate': annual_rate, 'capitalized': np.ones(len(annual_rate), dtype=bool)}
+    )
+    within = np.arange(draw.shape[1])[None, :] < n_months[:, None]
+    rows = np.arange(draw.shape[0])
+    return np.where(within, interest, 0.0).sum(axis=1), balance[rows, n_months - 1]
+
+
+def risk_costs(timelines: dict, base_rate, risk: list[dict], ltc: float = CONSTRUCTION_LTC) -> dict:
+    """
+    Price every risk preset against every cost model.
+
+    Args:
+        timelines: Output of timeline_matrix()
+        base_rate: Construction loan annual rate per cost model (scalar or (models,);
+            0 -> DEFAULT_CONSTRUCTION_RATE)
+        risk: risk_models rows
+        ltc: Loan-to-cost share of each month's costs drawn on the loan
+
+    Returns:
+        {
+            'total_cost', 'construction_months', 'base_interest': (models,),
+            'rate_premium': (risks,) decimal annual premium,
+            'delay_months', 'sales_months': (models, risks),
+            ONE_TIME_FIELDS..., 'total': (models, risks) dollars
+        }
+    """
+    cost, n_months = timelines['cost'], timelines['n_months']
+    n_models, width = cost.shape
+    cols = risk_arrays(risk)
+    n_risks = len(cols['rate_premium'])
+
+    base_rate = np.broadcast_to(np.asarray(base_rate, dtype=np.float64), (n_models,))
+    base_rate = np.where(base_rate != 0, base_rate, DEFAULT_CONSTRUCTION_RATE)
+    rate = base_rate[:, None] + cols['rate_premium'][None, :]
+    draw = ltc * cost
+
+    base_interest, _ = _construction_interest(draw, base_rate, n_months)
+    interest, balance = _construction_interest(
+        np.repeat(draw, n_risks, axis=0), rate.ravel(), np.repeat(n_months, n_risks)
+    )
+    interest, balance = interest.reshape(n_models, n_risks), balance.reshape(n_models, n_risks)
+
+    # R1 / R4: the closing balance keeps compounding through the delay, then the sales period
+    monthly_rate = rate / 12
+    delay = n_months[:, None] * (cols['schedule_variance_pct'][None, :] / 100)
+    sales = np.broadcast_to(cols['sales_period_months'][None, :], (n_models, n_risks))
+    after_delay = balance * np.power(1 + monthly_rate, delay)
+    schedule_carry = after_delay - balance
+    sales_carry = after_delay * (np.power(1 + monthly_rate, sales) - 1)
+
+    total_cost = cost.sum(axis=1)
+    contingency_share = cols['contingency_pct'][None, :] / 100
+    result = {
+        'total_cost': total_cost,
+        'construction_months': n_months,
+        'base_interest': base_interest,
+        'rate_premium': cols['rate_premium'],
+        'delay_months': delay,
+        'sales_months': sales,
+        'premium_interest': interest - base_interest[:, None],
+        'schedule_carry': schedule_carry,
+        'sales_carry': sales_carry,
+        'contingency': total_cost[:, None] * contingency_share,
+        'contingency_carry': contingency_share * (interest + schedule_carry + sales_carry),
+        'marketing_addon': (total_cost[:, None] * MARKETING_SHARE) * (cols['marketing_multiplier'][None, :] - 1),
+    }
+    result['total'] = sum(result[field] for field in ONE_TIME_FIELDS)
+    return result
+
+
+def monthly_impact(result: dict, term_years=DEFAULT_TERM_YEARS) -> np.ndarray:
+    """One-time risk total spread evenly over a mortgage term (months), like the Dashboard."""
+    return result['total'] / (np.asarray(term_years, dtype=np.float64) * 12)
+
+
+# ============================================================
+# Reference and benchmark
+# ============================================================
+
+def reference_risk_cost(cost: np.ndarray, base_rate: float, risk: dict, ltc: float = CONSTRUCTION_LTC) -> dict:
+    """Month-by-month loan walk for one cost model and one preset, used to check risk_costs()."""
+    base_rate = base_rate or DEFAULT_CONSTRUCTION_RATE
+    premium = risk['rate_premium_bps'] / 10000
+
+    def walk(annual_rate):
+        balance = interest = 0.0
+        for amount in cost:
+            accrued = balance * annual_rate / 12
+            interest += accrued
+            balance += accrued + ltc * amount
+        return interest, balance
+
+    base_interest, _ = walk(base_rate)
+    interest, balance = walk(base_rate + premium)
+    i = (base_rate + premium) / 12
+    delay = len(cost) * risk['schedule_variance_pct'] / 100
+    after_delay = balance * (1 + i) ** delay
+    schedule_carry = after_delay - balance
+    sales_carry = after_delay * ((1 + i) ** risk['sales_period_months'] - 1)
+    share = (risk['design_contingency_pct'] + risk['construction_contingency_pct']) / 100
+    total_cost = float(np.sum(cost))
+    parts = {
+        'premium_interest': interest - base_interest,
+        'schedule_carry': schedule_carry,
+        'sales_carry': sales_carry,
+        'contingency': total_cost * share,
+        'contingency_carry': share * (interest + schedule_carry + sales_carry),
+        'marketing_addon': total_cost * MARKETING_SHARE * (risk['marketing_multiplier'] - 1),
+    }
+    parts['total'] = sum(parts.values())
+    return parts
+
+
+def synthetic_risk_models(n_risks: int, seed: int = 0) -> list[dict]:
+    """Random presets spanning the seed Low .. Very High risk ranges."""
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            'schedule_variance_pct': float(rng.uniform(0, 40)), 'rate_premium_bps': float(rng.uniform(0, 300)),
+            'design_contingency_pct': float(rng.uniform(3, 12)), 'construction_contingency_pct': float(rng.uniform(5, 18)),
+            'marketing_multiplier': float(rng.uniform(1, 2)), 'sales_period_months': float(rng.integers(0, 9)),
+        }
+        for _ in range(n_risks)
+    ]
+
+
+def benchmark(n_models: int = 500, n_risks: int = 50, entries_per_model: int = 2000, n_checks: int = 200,
+              seed: int = 0) -> dict:
+    """Every preset against every synthetic cost model; a sample checked against the loan walk."""
+    rng = np.random.default_rng(seed)
+    timelines = []
+    for _ in range(n_models):
+        n_months = int(rng.integers(8, 37))
+        timelines.append({
+            'amount_cents': rng.integers(10_000, 2_000_000, entries_per_model),
+            'paid_month': rng.integers(0, n_months, entries_per_model),
+            'first_month': 0,
+            'n_months': n_months,
+        })
+    risk = synthetic_risk_models(n_risks, seed)
+    base_rate = rng.uniform(0.05, 0.10, n_models)
+
+    start = time.perf_counter()
+    grid = timeline_matrix(timelines)
+    result = risk_costs(grid, base_rate, risk)
+    seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    worst = 0.0
+    for _ in range(n_checks):
+        m, r = int(rng.integers(0, n_models)), int(rng.integers(0, n_risks))
+        expected = reference_risk_cost(grid['cost'][m, :grid['n_months'][m]], float(base_rate[m]), risk[r])
+        worst = max(worst, max(abs(expected[k] - float(result[k][m, r])) for k in ONE_TIME_FIELDS + ('total',)))
+    loop_seconds = (time.perf_counter() - start) / n_checks * n_models * n_risks
+
+    return {
+        'pairs': n_models * n_risks,
+        'entries': n_models * entries_per_model,
+        'seconds': seconds,
+        'loop_seconds_projected': loop_seconds,
+        'checked': n_checks,
+        'max_abs_error': worst,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='R1-R4 risk costs for every (cost model, risk preset) pair')
+    parser.add_argument('--benchmark', action='store_true', help='Price synthetic cost models against synthetic presets')
+    parser.add_argument('--models', type=int, default=500, help='Number of synthetic cost models')
+    parser.add_argument('--risks', type=int, default=50, help='Number of synthetic risk presets')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+    else:
+        stats = benchmark(args.models, args.risks)
+        print(f"Cost models x presets: {stats['pairs']:,} pairs ({stats['entries']:,} cost entries)")
+        print(f"Vectorized:            {stats['seconds']:>10.3f} s")
+        print(f"Loan walk (projected): {stats['loop_seconds_projected']:>10.3f} s")
+        print(f"Checked vs loan walk:  {stats['checked']} pairs, max error ${stats['max_abs_error']:.2e}")
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Tiered utility tariff engine.
+
+calculate_utility_cost() (SQL) and calculateTieredCost() (Dashboard) walk a
+utility's rate_tiers for every bill. Here each tariff is compiled once into
+cumulative arrays:
+    breaks[k]: consumption at the start of segment k (breaks[0] = 0)
+    cum[k]:    bill at breaks[k] (cum[0] = base fee)
+    rates[k]:  rate inside segment k
+so a bill for any consumption c is one binary search plus a linear step:
+    k = searchsorted(breaks, c, 'right') - 1
+    bill = cum[k] + (c - breaks[k]) * rates[k]
+
+Tier semantics match the loop versions: tiers are filled in order up to
+max_units, a null max_units tier takes everything left (later tiers are
+unreachable), usage beyond the last capped tier with no open tier is not
+billed, and consumption <= 0 pays the base fee. Cumulative bills are summed
+in tier order like the loops, so whole-unit consumptions price to the
+same float.
+
+No Supabase dependency.
+
+    python tariff_engine.py --benchmark
+"""
+
+import json
+import time
+
+import numpy as np
+
+
+def parse_tiers(rate_tiers) -> list[dict]:
+    """rate_tiers as a list of {'max_units': float|None, 'rate': float} (accepts JSON text)."""
+    if isinstance(rate_tiers, str):
+        rate_tiers = json.loads(rate_tiers)
+    return [
+        {'max_units': None if t.get('max_units') is None else float(t['max_units']), 'rate': float(t['rate'])}
+        for t in (rate_tiers or [])
+    ]
+
+
+def compile_tariff(base_fee, rate_tiers, multiplier: float = 1.0) -> dict:
+    """
+    Compile one rate structure.
+
+    Args:
+        base_fee: Fixed monthly charge
+        rate_tiers: utility_models.rate_tiers (list or JSON text)
+        multiplier: Applied to every tier rate (seasonal multiplier), not the base fee
+
+    Returns:
+        {'breaks', 'cum', 'rates': float64 arrays of equal length}
+
+    Raises:
+        ValueError: If capped tiers' max_units decrease
+    """
+    breaks, cum, rates = [0.0], [float(base_fee or 0)], []
+    prev_max = 0.0
+    for tier in parse_tiers(rate_tiers):
+        rate = tier['rate'] * multiplier
+        if tier['max_units'] is None:
+            rates.append(rate)
+            break
+        if tier['max_units'] < prev_max:
+            raise ValueError(f"Tier max_units must not decrease: {tier['max_units']} after {prev_max}")
+        width = tier['max_units'] - prev_max
+        rates.append(rate)
+        breaks.append(breaks[-1] + width)
+        cum.append(cum[-1] + width * rate)
+        prev_max = tier['max_units']
+    else:
+        # No open tier: nothing is billed past the last cap
+        rates.append(0.0)
+
+    return {'breaks': np.array(breaks), 'cum': np.array(cum), 'rates': np.array(rates)}
+
+
+def price(tariff: dict, consumption) -> np.ndarray:
+    """Bills (unrounded) for an array of consumption values under one compiled tariff."""
+    usage = np.maximum(np.asarray(consumption, dtype=np.float64), 0.0)
+    k = np.searchsorted(tariff['breaks'], usage, side='right') - 1
+    return tariff['cum'][k] + (usage - tariff['breaks'][k]) * tariff['rates'][k]
+
+
+def seasonal_multiplier(model: dict, is_summer: bool) -> float:
+    """Rate multiplier calculate_utility_cost() applies for a summer or winter month."""
+    if not model.get('has_seasonal_rates'):
+        return 1.0
+    value = model.get('summer_multiplier' if is_summer else 'winter_multiplier')
+    return 1.0 if value is None else float(value)
+
+
+def compile_models(models: list[dict], multiplier=None) -> list[dict]:
+    """
+    Compile utility_models rows.
+
+    Args:
+        models: Rows with base_monthly_fee and rate_tiers
+        multiplier: Optional per-model rate multipliers (e.g. seasonal)
+    """
+    multiplier = [1.0] * len(models) if multiplier is None else multiplier
+    return [
+        compile_tariff(model.get('base_monthly_fee'), model.get('rate_tiers'), float(m))
+        for model, m in zip(models, multiplier)
+    ]
+
+
+def price_matrix(tariffs: list[dict], consumption) -> np.ndarray:
+    """
+    Bills for every (tariff, consumption) pair.
+
+    Returns:
+        (tariffs,) + consumption.shape float64 array
+    """
+    consumption = np.asarray(consumption, dtype=np.float64)
+    bills = np.empty((len(tariffs),) + consumption.shape)
+    for t, tariff in enumerate(tariffs):
+        bills[t] = price(tariff, consumption)
+    return bills
+
+
+def bill_histogram(tariff: dict, consumption, bins=50, weights=None) -> tuple:
+    """
+    Distribution of bills for a population of consumption values.
+
+    Returns:
+        (counts, bin_edges) as from np.histogram
+    """
+    return np.histogram(price(tariff, consumption), bins=bins, weights=weights)
+
+
+# ============================================================
+# Reference and benchmark
+# ============================================================
+
+def reference_bill(consumption: float, base_fee, rate_tiers, multiplier: float = 1.0) -> float:
+    """Tier-by-tier loop (calculateTieredCost / calculate_utility_cost), used to check price()."""
+    total, remaining, prev_max = float(base_fee or 0), consumption, 0.0
+    for tier in parse_tiers(rate_tiers):
+        if remaining <= 0:
+            break
+        used = remaining if tier['max_units'] is None else min(remaining, tier['max_units'] - prev_max)
+        total += used * (tier['rate'] * multiplier)
+        remaining -= used
+        prev_max = tier['max_units'] if tier['max_units'] is not None else prev_max
+    return total
+
+
+# Seed tariffs from the utility_models migrations (water, electric, gas)
+SEED_TARIFFS = [
+    (12.50, [{'max_units': 7000, 'rate': 0.00425}, {'max_units': 13000, 'rate': 0.00525}, {'max_units': None, 'rate': 0.00675}]),
+    (18.00, [{'max_units': 6000, 'rate': 0.00475}, {'max_units': 12000, 'rate': 0.00575}, {'max_units': None, 'rate': 0.00725}]),
+    (15.00, [{'max_units': 5000, 'rate': 0.00500}, {'max_units': 10000, 'rate': 0.00600}, {'max_units': None, 'rate': 0.00750}]),
+    (8.50, [{'max_units': 500, 'rate': 0.0725}, {'max_units': 1000, 'rate': 0.0875}, {'max_units': None, 'rate': 0.1025}]),
+    (22.00, [{'max_units': 500, 'rate': 0.0850}, {'max_units': 1000, 'rate': 0.0950}, {'max_units': None, 'rate': 0.1100}]),
+    (12.00, [{'max_units': 50, 'rate': 0.65}, {'max_units': 100, 'rate': 0.72}, {'max_units': None, 'rate': 0.80}]),
+    (0, []),
+]
+
+
+def benchmark(n_values: int = 1_000_000, n_checks: int = 20_000, seed: int = 0) -> dict:
+    """Price whole-unit consumption sweeps under the seed tariffs; check a sample against the loop."""
+    rng = np.random.default_rng(seed)
+    consumption = rng.integers(0, 25_000, n_values).astype(np.float64)
+    tariffs = [compile_tariff(fee, tiers) for fee, tiers in SEED_TARIFFS]
+
+    start = time.perf_counter()
+    bills = price_matrix(tariffs, consumption)
+    seconds = time.perf_counter() - start
+
+    sample = rng.integers(0, n_values, n_checks)
+    start = time.perf_counter()
+    mismatches = 0
+    for t, (fee, tiers) in enumerate(SEED_TARIFFS):
+        for i in sample.tolist():
+            mismatches += reference_bill(float(consumption[i]), fee, tiers) != bills[t, i]
+    loop_seconds = time.perf_counter() - start
+
+    n_bills = bills.size
+    return {
+        'tariffs': len(tariffs),
+        'bills': n_bills,
+        'seconds': seconds,
+        'loop_seconds_projected': loop_seconds / (n_checks * len(tariffs)) * n_bills,
+        'checked': n_checks * len(tariffs),
+        'mismatches': int(mismatches),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compiled tiered tariff engine')
+    parser.add_argument('--benchmark', action='store_true', help='Price synthetic consumption sweeps')
+    parser.add_argument('--values', type=int, default=1_000_000, help='Consumption values per tariff')
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+    else:
+        stats = benchmark(args.values)
+        print(f"Tariffs x values:  {stats['tariffs']} x {args.values:,} = {stats['bills']:,} bills")
+        print(f"Compiled:          {stats['seconds']:>10.3f} s")
+        print(f"Loop (projected):  {stats['loop_seconds_projected']:>10.3f} s")
+        print(f"Speedup:           {stats['loop_seconds_projected'] / stats['seconds']:>10.1f}x")
+        print(f"Checked vs loop:   {stats['checked']:,} bills, {stats['mismatches']} not bit-identical")
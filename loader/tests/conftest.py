@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Loader modules import each other by bare name (run from loader/)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
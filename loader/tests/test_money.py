@@ -0,0 +1,58 @@
+"""Exactness of the shared integer-cents representation (money.py)."""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+import money
+
+# (input, expected cents): parsing is exact and rounds half away from zero
+PARSE_CASES = [
+    ('0', 0), ('0.01', 1), ('0.1', 10), (0.1, 10), (0.29, 29), (1.15, 115),
+    ('1234.56', 123456), ('-1234.56', -123456), ('$1,234.56', 123456),
+    ('12.345', 1235), ('-12.345', -1235), ('12.3449', 1234), (12.345, 1235),
+    (1e-3, 0), (0.005, 1), (-0.005, -1), (2.675, 268), (1.005, 101),
+    (19.99, 1999), (4.35, 435), (8.2, 820), (100, 10000), (Decimal('7.125'), 713),
+    ('99999999999.99', 9999999999999),
+]
+
+
+@pytest.mark.parametrize('value, expected', PARSE_CASES)
+def test_parse_cents(value, expected):
+    assert money.parse_cents(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', PARSE_CASES)
+def test_to_cents_matches_parse_cents(value, expected):
+    assert money.to_cents([value]).tolist() == [expected]
+
+
+def test_to_cents_column():
+    values = [value for value, _ in PARSE_CASES]
+    cents = money.to_cents(values)
+    assert cents.dtype == np.int64
+    assert cents.tolist() == [expected for _, expected in PARSE_CASES]
+
+
+def test_random_amounts_parse_and_sum_exactly():
+    stats = money.exactness_checks(n_random=20_000)
+    assert stats['parse_mismatches'] == 0
+    assert stats['sum_exact']
+
+
+@pytest.mark.parametrize('cents, text, formatted', [
+    (0, '0.00', '$0.00'), (5, '0.05', '$0.05'), (-5, '-0.05', '-$0.05'),
+    (123456, '1234.56', '$1,234.56'), (-123405, '-1234.05', '-$1,234.05'),
+])
+def test_output(cents, text, formatted):
+    assert money.cents_to_str(cents) == text
+    assert money.format_cents(cents) == formatted
+    assert money.cents_to_decimal(cents) == Decimal(text)
+    assert money.cents_to_dollars(cents) == float(text)
+
+
+def test_computed_amounts_round_half_even():
+    assert money.half_even_cents([0.5, 1.5, 2.5, -2.5, 2.4999]).tolist() == [0, 2, 2, -2, 2]
+    assert money.decimal_half_even_cents(Decimal('0.125')) == 12
+    assert money.decimal_half_even_cents(Decimal('0.135')) == 14
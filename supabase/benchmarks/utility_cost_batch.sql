@@ -0,0 +1,105 @@
+-- ============================================================
+-- Benchmark: calculate_utility_costs() vs calculate_utility_cost()
+-- ============================================================
+-- Prices every utility model against N consumption levels both ways,
+-- checks the bills are identical, and reports the timings. Then checks
+-- NULL handling on throwaway models (NULL fee, rates, multiplier and
+-- consumption; rolled back). Run against
+-- a local database with the migrations applied (supabase start), e.g.
+--
+--   psql "$LOCAL_DB_URL" -f supabase/benchmarks/utility_cost_batch.sql
+--
+-- Set the number of consumption levels with -v levels=20000.
+-- ============================================================
+
+\if :{?levels}
+\else
+  \set levels 10000
+\endif
+
+SELECT set_config('bench.levels', :'levels', false);
+
+DO $$
+DECLARE
+  v_ids uuid[];
+  v_levels integer := current_setting('bench.levels')::integer;
+  v_consumptions numeric[];
+  v_start timestamptz;
+  v_scalar_ms numeric;
+  v_batch_ms numeric;
+  v_pairs bigint;
+  v_mismatches bigint;
+BEGIN
+  SELECT array_agg(id ORDER BY utility_type, sort_order) INTO v_ids FROM utility_models;
+  SELECT array_agg(round((random() * 25000)::numeric, 1)) INTO v_consumptions FROM generate_series(1, v_levels);
+
+  CREATE TEMP TABLE bench_scalar ON COMMIT DROP AS SELECT NULL::uuid AS id, 0 AS idx, 0::numeric AS cost LIMIT 0;
+  CREATE TEMP TABLE bench_batch ON COMMIT DROP AS SELECT NULL::uuid AS id, 0 AS idx, 0::numeric AS cost LIMIT 0;
+
+  -- One call per (model, consumption)
+  v_start := clock_timestamp();
+  INSERT INTO bench_scalar
+  SELECT m.id, u.idx::integer, calculate_utility_cost(m.id, u.amount, true)
+  FROM unnest(v_ids) AS m(id)
+  CROSS JOIN unnest(v_consumptions) WITH ORDINALITY AS u(amount, idx);
+  v_scalar_ms := extract(epoch FROM clock_timestamp() - v_start) * 1000;
+
+  -- One call for everything
+  v_start := clock_timestamp();
+  INSERT INTO bench_batch
+  SELECT utility_model_id, consumption_index, cost
+  FROM calculate_utility_costs(v_ids, v_consumptions, true);
+  v_batch_ms := extract(epoch FROM clock_timestamp() - v_start) * 1000;
+
+  SELECT count(*) INTO v_pairs FROM bench_scalar;
+  SELECT count(*) INTO v_mismatches
+  FROM bench_scalar s FULL JOIN bench_batch b USING (id, idx)
+  WHERE s.cost IS DISTINCT FROM b.cost;
+
+  RAISE NOTICE 'models: %, consumption levels: %, bills: %', array_length(v_ids, 1), v_levels, v_pairs;
+  RAISE NOTICE 'calculate_utility_cost  (scalar): % ms', round(v_scalar_ms, 1);
+  RAISE NOTICE 'calculate_utility_costs (batch):  % ms', round(v_batch_ms, 1);
+  RAISE NOTICE 'speedup: %x, mismatched bills: %', round(v_scalar_ms / NULLIF(v_batch_ms, 0), 1), v_mismatches;
+END $$;
+
+-- NULL handling: both functions on models with NULL columns, at tier edges
+BEGIN;
+
+INSERT INTO utility_models (utility_type, provider_code, provider_name, base_monthly_fee, rate_tiers,
+                            has_seasonal_rates, summer_multiplier, winter_multiplier, unit_name)
+SELECT 'water', 'BENCH-NULL-' || n, 'Benchmark NULL case ' || n, fee, tiers::jsonb, seasonal, summer, winter, 'gallons'
+FROM (VALUES
+  (1, 10.00, '[{"max_units": 100, "rate": null}, {"max_units": null, "rate": 0.5}]', false, 1.0, 1.0),
+  (2, 10.00, '[{"max_units": 100, "rate": 0.2}, {"max_units": null, "rate": null}]', false, 1.0, 1.0),
+  (3, 10.00, '[{"max_units": 100, "rate": 0.2}, {"max_units": 100, "rate": null}, {"max_units": 300, "rate": 0.3}]', false, 1.0, 1.0),
+  (4, 10.00, '[{"max_units": 100, "rate": 0.2}, {"max_units": 200, "rate": 0.3}]', true, NULL, 1.1),
+  (5, NULL, '[{"max_units": 100, "rate": 0.2}]', false, 1.0, 1.0),
+  (6, 5.00, '[{"max_units": 100, "rate": 0.2}, {"max_units": 200, "rate": null}]', false, 1.0, 1.0),
+  (7, 5.00, '[{"max_units": 0, "rate": null}, {"max_units": 100, "rate": 0.2}]', false, 1.0, 1.0),
+  (8, 5.00, '[]', NULL, 1.2, 0.8),
+  (9, 5.00, '[{"max_units": 50, "rate": 0.1}, {"max_units": null, "rate": 0.2}, {"max_units": 500, "rate": null}]', NULL, 1.2, 0.8),
+  (10, 5.00, '[{"max_units": 100, "rate": 0.2}, {"max_units": 200, "rate": 0.3}, {"max_units": 200, "rate": null}]', false, 1.0, 1.0)
+) AS v(n, fee, tiers, seasonal, summer, winter);
+
+WITH cases AS (
+  SELECT
+    (SELECT array_agg(id ORDER BY provider_code) FROM utility_models WHERE provider_code LIKE 'BENCH-NULL-%') AS ids,
+    ARRAY[NULL, -5, 0, 0.5, 50, 99.9, 100, 100.1, 150, 200, 250, 300, 1000]::numeric[] AS consumptions
+),
+scalar AS (
+  SELECT m.id, u.idx::integer AS idx, s.summer, calculate_utility_cost(m.id, u.amount, s.summer) AS cost
+  FROM cases, unnest(cases.ids) AS m(id), unnest(cases.consumptions) WITH ORDINALITY AS u(amount, idx),
+       (VALUES (true), (false)) AS s(summer)
+),
+batch AS (
+  SELECT b.utility_model_id AS id, b.consumption_index AS idx, s.summer, b.cost
+  FROM cases, (VALUES (true), (false)) AS s(summer),
+       calculate_utility_costs(cases.ids, cases.consumptions, s.summer) AS b
+)
+SELECT
+  count(*) AS null_case_bills,
+  count(*) FILTER (WHERE s.cost IS NULL) AS null_bills,
+  count(*) FILTER (WHERE s.id IS NULL OR b.id IS NULL OR s.cost IS DISTINCT FROM b.cost) AS mismatched_bills
+FROM scalar s FULL JOIN batch b USING (id, idx, summer);
+
+ROLLBACK;
@@ -0,0 +1,47 @@
+-- ============================================================
+-- Carrying Cost Calculation Bundle
+-- ============================================================
+-- One round-trip that returns everything a single carrying cost
+-- calculation needs: cost model name/dates, finance model name and
+-- default rate, phase assumptions, and the dated cost entries.
+--
+-- Used by loader/calculate_carrying_costs.py load_calculation_bundle().
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION get_carrying_cost_bundle(
+  p_cost_time_model_id uuid,
+  p_finance_model_id uuid
+) RETURNS jsonb AS $$
+  SELECT jsonb_build_object(
+    'cost_model', (
+      SELECT to_jsonb(m) FROM (
+        SELECT id, name, project_start_date, project_end_date
+        FROM cost_time_models
+        WHERE id = p_cost_time_model_id
+      ) m
+    ),
+    'finance_model', (
+      SELECT to_jsonb(f) FROM (
+        SELECT id, name, default_annual_rate
+        FROM finance_models
+        WHERE id = p_finance_model_id
+      ) f
+    ),
+    'assumptions', COALESCE((
+      SELECT jsonb_agg(to_jsonb(a)) FROM (
+        SELECT phase, annual_rate, compound_annually
+        FROM finance_assumptions
+        WHERE finance_model_id = p_finance_model_id
+      ) a
+    ), '[]'::jsonb),
+    'entries', COALESCE((
+      SELECT jsonb_agg(to_jsonb(e) ORDER BY e.date_paid)
+      FROM v_cost_entries e
+      WHERE e.cost_time_model_id = p_cost_time_model_id
+    ), '[]'::jsonb)
+  );
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION get_carrying_cost_bundle IS 'Cost entries, phase rates, project dates and model names for one carrying cost calculation';
+
+GRANT EXECUTE ON FUNCTION get_carrying_cost_bundle(uuid, uuid) TO anon, authenticated;
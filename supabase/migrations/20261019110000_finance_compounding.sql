@@ -0,0 +1,68 @@
+-- ============================================================
+-- Finance Assumption Compounding Conventions
+-- ============================================================
+-- compound_annually only distinguishes annual compounding from
+-- simple interest. Lenders also quote monthly, daily and continuous
+-- compounding; the optional compounding column names the convention
+-- for a phase. NULL keeps the compound_annually behaviour.
+--
+-- The carrying cost engine caches one growth-factor table per
+-- (rate, compounding) pair; see loader/carrying_cost_engine.py.
+-- ============================================================
+
+ALTER TABLE finance_assumptions
+  ADD COLUMN IF NOT EXISTS compounding text
+  CHECK (compounding IN ('simple', 'annual', 'monthly', 'daily', 'continuous'));
+
+COMMENT ON COLUMN finance_assumptions.compounding IS 'Compounding convention (simple, annual, monthly, daily, continuous); NULL = derive from compound_annually';
+
+CREATE OR REPLACE VIEW v_finance_assumptions AS
+SELECT
+    fa.id,
+    fa.finance_model_id,
+    fm.name AS model_name,
+    fa.phase,
+    fa.annual_rate,
+    fa.compound_annually,
+    fa.effective_from,
+    fa.effective_to,
+    fa.notes,
+    fa.compounding
+FROM finance_assumptions fa
+JOIN finance_models fm ON fa.finance_model_id = fm.id;
+
+-- Include the convention in the calculation bundle
+CREATE OR REPLACE FUNCTION get_carrying_cost_bundle(
+  p_cost_time_model_id uuid,
+  p_finance_model_id uuid
+) RETURNS jsonb AS $$
+  SELECT jsonb_build_object(
+    'cost_model', (
+      SELECT to_jsonb(m) FROM (
+        SELECT id, name, project_start_date, project_end_date
+        FROM cost_time_models
+        WHERE id = p_cost_time_model_id
+      ) m
+    ),
+    'finance_model', (
+      SELECT to_jsonb(f) FROM (
+        SELECT id, name, default_annual_rate
+        FROM finance_models
+        WHERE id = p_finance_model_id
+      ) f
+    ),
+    'assumptions', COALESCE((
+      SELECT jsonb_agg(to_jsonb(a)) FROM (
+        SELECT phase, annual_rate, compound_annually, compounding
+        FROM finance_assumptions
+        WHERE finance_model_id = p_finance_model_id
+      ) a
+    ), '[]'::jsonb),
+    'entries', COALESCE((
+      SELECT jsonb_agg(to_jsonb(e) ORDER BY e.date_paid)
+      FROM v_cost_entries e
+      WHERE e.cost_time_model_id = p_cost_time_model_id
+    ), '[]'::jsonb)
+  );
+$$ LANGUAGE sql STABLE;
+
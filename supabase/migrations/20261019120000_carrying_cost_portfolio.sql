@@ -0,0 +1,31 @@
+-- ============================================================
+-- Carrying Cost Portfolio Results
+-- ============================================================
+-- Summary cube written by loader/carrying_cost_portfolio.py: one
+-- row per (cost/time model, finance model) pair, refreshed by the
+-- nightly portfolio run (upsert on the primary key).
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS carrying_cost_portfolio (
+    cost_time_model_id UUID NOT NULL REFERENCES cost_time_models(id) ON DELETE CASCADE,
+    finance_model_id UUID NOT NULL REFERENCES finance_models(id) ON DELETE CASCADE,
+    cost_model_name TEXT,
+    finance_model_name TEXT,
+    entry_count INTEGER NOT NULL DEFAULT 0,
+    project_start DATE,
+    project_end DATE,
+    total_base_cost DECIMAL(14,2) NOT NULL,
+    total_carrying_cost DECIMAL(14,2) NOT NULL,
+    total_with_carrying DECIMAL(14,2) NOT NULL,
+    carrying_cost_pct DECIMAL(8,4),
+    calculated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (cost_time_model_id, finance_model_id)
+);
+
+COMMENT ON TABLE carrying_cost_portfolio IS 'Carrying cost totals for every cost/time model x finance model pair (portfolio batch run)';
+
+CREATE INDEX IF NOT EXISTS idx_carrying_cost_portfolio_finance ON carrying_cost_portfolio(finance_model_id);
+
+ALTER TABLE carrying_cost_portfolio ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Public read carrying_cost_portfolio" ON carrying_cost_portfolio FOR SELECT USING (TRUE);
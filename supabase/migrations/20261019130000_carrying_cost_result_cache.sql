@@ -0,0 +1,55 @@
+-- ============================================================
+-- Carrying Cost Result Cache
+-- ============================================================
+-- get_carrying_cost_version() returns a checksum of every input a
+-- carrying cost calculation reads for a (cost/time model, finance
+-- model) pair: project dates, default rate, phase assumptions and
+-- cost entries. Any insert, update or delete changes it, so cached
+-- results keyed by it invalidate themselves. (updated_at columns
+-- aren't maintained by triggers and miss deletes, so they aren't
+-- used.)
+--
+-- carrying_cost_results holds one shared cached result per pair,
+-- replaced whenever the version changes.
+--
+-- Used by loader/calculate_carrying_costs.py cached_model_carrying_costs().
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION get_carrying_cost_version(
+  p_cost_time_model_id uuid,
+  p_finance_model_id uuid
+) RETURNS text AS $$
+  SELECT md5(concat_ws('|',
+    (SELECT concat_ws(',', project_start_date, project_end_date)
+     FROM cost_time_models WHERE id = p_cost_time_model_id),
+    (SELECT default_annual_rate::text
+     FROM finance_models WHERE id = p_finance_model_id),
+    (SELECT string_agg(
+       concat_ws(',', phase, annual_rate, compound_annually, compounding, effective_from, effective_to),
+       ';' ORDER BY phase, effective_from)
+     FROM finance_assumptions WHERE finance_model_id = p_finance_model_id),
+    (SELECT string_agg(
+       concat_ws(',', e.id, e.ce_id, e.phase, e.date_paid, e.amount_total),
+       ';' ORDER BY e.id)
+     FROM v_cost_entries e WHERE e.cost_time_model_id = p_cost_time_model_id)
+  ));
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION get_carrying_cost_version IS 'Checksum of the inputs to one carrying cost calculation (result cache key)';
+
+GRANT EXECUTE ON FUNCTION get_carrying_cost_version(uuid, uuid) TO anon, authenticated;
+
+CREATE TABLE IF NOT EXISTS carrying_cost_results (
+    cost_time_model_id UUID NOT NULL REFERENCES cost_time_models(id) ON DELETE CASCADE,
+    finance_model_id UUID NOT NULL REFERENCES finance_models(id) ON DELETE CASCADE,
+    content_version TEXT NOT NULL,
+    result JSONB NOT NULL,
+    calculated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (cost_time_model_id, finance_model_id)
+);
+
+COMMENT ON TABLE carrying_cost_results IS 'Cached carrying cost results per (cost/time model, finance model), valid while content_version matches';
+
+ALTER TABLE carrying_cost_results ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Public read carrying_cost_results" ON carrying_cost_results FOR SELECT USING (TRUE);
@@ -0,0 +1,46 @@
+-- ============================================================
+-- Time-Varying Rate Curves in the Calculation Bundle
+-- ============================================================
+-- finance_assumptions already allows several rows per phase with
+-- effective_from / effective_to (UNIQUE on finance_model_id, phase,
+-- effective_from). The carrying cost calculation now integrates
+-- across those dated segments, so the bundle returns the dates too.
+--
+-- Rows with both dates NULL are the phase's base rate; dated rows
+-- override it for the days they cover (effective_to inclusive).
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION get_carrying_cost_bundle(
+  p_cost_time_model_id uuid,
+  p_finance_model_id uuid
+) RETURNS jsonb AS $$
+  SELECT jsonb_build_object(
+    'cost_model', (
+      SELECT to_jsonb(m) FROM (
+        SELECT id, name, project_start_date, project_end_date
+        FROM cost_time_models
+        WHERE id = p_cost_time_model_id
+      ) m
+    ),
+    'finance_model', (
+      SELECT to_jsonb(f) FROM (
+        SELECT id, name, default_annual_rate
+        FROM finance_models
+        WHERE id = p_finance_model_id
+      ) f
+    ),
+    'assumptions', COALESCE((
+      SELECT jsonb_agg(to_jsonb(a)) FROM (
+        SELECT phase, annual_rate, compound_annually, compounding, effective_from, effective_to
+        FROM finance_assumptions
+        WHERE finance_model_id = p_finance_model_id
+      ) a
+    ), '[]'::jsonb),
+    'entries', COALESCE((
+      SELECT jsonb_agg(to_jsonb(e) ORDER BY e.date_paid)
+      FROM v_cost_entries e
+      WHERE e.cost_time_model_id = p_cost_time_model_id
+    ), '[]'::jsonb)
+  );
+$$ LANGUAGE sql STABLE;
+
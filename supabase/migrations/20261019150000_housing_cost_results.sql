@@ -0,0 +1,85 @@
+-- ============================================================
+-- Precomputed Monthly Housing Costs
+-- ============================================================
+-- Written by loader/housing_cost_results.py: one row per model
+-- combination (scenario x occupancy x lifestyle x water x sewer x
+-- electric x gas x occupant finance x risk) with the Dashboard's
+-- monthly total and breakdown, so the Dashboard does one point
+-- lookup instead of recomputing in the browser.
+--
+-- Amounts are integer cents to keep rows small; v_housing_cost_results
+-- presents them in dollars. Deleting a model row cascades to its
+-- results. housing_cost_model_versions records the checksum of each
+-- model row the results were computed from, so the refresh job only
+-- rewrites combinations whose inputs changed.
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS housing_cost_results (
+    scenario_id UUID NOT NULL REFERENCES scenarios(scenario_id) ON DELETE CASCADE,
+    occupancy_model_id UUID NOT NULL REFERENCES occupancy_models(id) ON DELETE CASCADE,
+    lifestyle_model_id UUID NOT NULL REFERENCES lifestyle_models(id) ON DELETE CASCADE,
+    water_model_id UUID NOT NULL REFERENCES utility_models(id) ON DELETE CASCADE,
+    sewer_model_id UUID NOT NULL REFERENCES utility_models(id) ON DELETE CASCADE,
+    electric_model_id UUID NOT NULL REFERENCES utility_models(id) ON DELETE CASCADE,
+    gas_model_id UUID NOT NULL REFERENCES utility_models(id) ON DELETE CASCADE,
+    finance_model_id UUID NOT NULL REFERENCES occupant_finance_models(id) ON DELETE CASCADE,
+    risk_model_id UUID NOT NULL REFERENCES risk_models(id) ON DELETE CASCADE,
+    total_cents BIGINT NOT NULL,
+    mortgage_principal_cents BIGINT NOT NULL,
+    mortgage_pmi_cents BIGINT NOT NULL,
+    water_cents BIGINT NOT NULL,
+    sewer_cents BIGINT NOT NULL,
+    electric_cents BIGINT NOT NULL,
+    gas_cents BIGINT NOT NULL,
+    utility_total_cents BIGINT NOT NULL,
+    risk_monthly_cents BIGINT NOT NULL,
+    calculated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (scenario_id, occupancy_model_id, lifestyle_model_id, water_model_id, sewer_model_id,
+                 electric_model_id, gas_model_id, finance_model_id, risk_model_id)
+);
+
+COMMENT ON TABLE housing_cost_results IS 'Monthly housing cost (cents) for every model combination, precomputed for Dashboard lookups';
+
+ALTER TABLE housing_cost_results ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Public read housing_cost_results" ON housing_cost_results FOR SELECT USING (TRUE);
+
+CREATE OR REPLACE VIEW v_housing_cost_results AS
+SELECT
+    scenario_id,
+    occupancy_model_id,
+    lifestyle_model_id,
+    water_model_id,
+    sewer_model_id,
+    electric_model_id,
+    gas_model_id,
+    finance_model_id,
+    risk_model_id,
+    total_cents / 100.0 AS total_monthly,
+    mortgage_principal_cents / 100.0 AS mortgage_principal,
+    mortgage_pmi_cents / 100.0 AS mortgage_pmi,
+    (mortgage_principal_cents + mortgage_pmi_cents) / 100.0 AS mortgage_total,
+    water_cents / 100.0 AS water_cost,
+    sewer_cents / 100.0 AS sewer_cost,
+    electric_cents / 100.0 AS electric_cost,
+    gas_cents / 100.0 AS gas_cost,
+    utility_total_cents / 100.0 AS utility_total,
+    risk_monthly_cents / 100.0 AS risk_monthly,
+    calculated_at
+FROM housing_cost_results;
+
+GRANT SELECT ON v_housing_cost_results TO anon, authenticated;
+
+CREATE TABLE IF NOT EXISTS housing_cost_model_versions (
+    axis TEXT NOT NULL,
+    model_id TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (axis, model_id)
+);
+
+COMMENT ON TABLE housing_cost_model_versions IS 'Checksum of each model row housing_cost_results was computed from (incremental refresh state)';
+
+ALTER TABLE housing_cost_model_versions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Public read housing_cost_model_versions" ON housing_cost_model_versions FOR SELECT USING (TRUE);
@@ -0,0 +1,138 @@
+-- ============================================================
+-- Batch Utility Cost Calculation
+-- ============================================================
+-- calculate_utility_cost() prices one consumption for one model per
+-- call, re-reading the row and re-walking its rate_tiers JSONB each
+-- time. calculate_utility_costs() prices every (model, consumption)
+-- pair of two arrays in one call:
+--
+-- 1. Each requested tariff is compiled once into segments (same form
+--    as loader/tariff_engine.py): [lo, hi) consumption range, bill at
+--    lo (base fee + all lower tiers) and the seasonal-adjusted rate.
+--    Tiers after an open (null max_units) tier are unreachable and
+--    dropped; with no open tier a zero-rate tail segment bills nothing
+--    past the last cap.
+-- 2. Each consumption (clamped at 0) joins to its one segment:
+--    bill = ROUND(cum + (consumption - lo) * rate, 2)
+--    (just cum at lo, where the scalar loop stops before reading the
+--    next tier's rate)
+--
+-- numeric arithmetic is exact, so results equal calculate_utility_cost()
+-- for the same inputs, NULL columns included:
+-- - a NULL base_monthly_fee gives a NULL cost
+-- - has_seasonal_rates NULL means no seasonal multiplier (1.0)
+-- - a NULL rate (or seasonal multiplier) gives a NULL cost once the
+--   consumption reaches its tier; each segment carries whether such a
+--   tier starts below lo (null_before) or at lo (null_at), since SUM()
+--   alone would skip it
+-- - a NULL consumption bills every capped tier in full and is NULL on
+--   an open tier, as the scalar loop never sees v_remaining <= 0
+-- Unknown model ids return no rows (the scalar function returns NULL).
+--
+-- Benchmark: supabase/benchmarks/utility_cost_batch.sql
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION calculate_utility_costs(
+  p_utility_model_ids uuid[],
+  p_consumptions numeric[],
+  p_is_summer boolean DEFAULT false
+) RETURNS TABLE (
+  utility_model_id uuid,
+  consumption_index integer,
+  consumption numeric,
+  cost numeric
+) AS $$
+  WITH models AS (
+    SELECT
+      m.id,
+      m.base_monthly_fee AS base_fee,
+      m.rate_tiers,
+      CASE
+        WHEN m.has_seasonal_rates IS NOT TRUE THEN 1.0
+        WHEN p_is_summer THEN m.summer_multiplier
+        ELSE m.winter_multiplier
+      END AS multiplier
+    FROM utility_models m
+    WHERE m.id = ANY(p_utility_model_ids)
+  ),
+  tiers AS (
+    SELECT
+      mo.id,
+      mo.base_fee,
+      t.ord,
+      (t.tier->>'max_units')::numeric AS max_units,
+      (t.tier->>'rate')::numeric * mo.multiplier AS rate,
+      MIN(t.ord) FILTER (WHERE t.tier->>'max_units' IS NULL) OVER (PARTITION BY mo.id) AS open_ord
+    FROM models mo
+    CROSS JOIN LATERAL jsonb_array_elements(mo.rate_tiers) WITH ORDINALITY AS t(tier, ord)
+  ),
+  capped AS (
+    -- Reachable tiers with their lower bound
+    SELECT
+      id, base_fee, ord, max_units, rate,
+      COALESCE(MAX(max_units) OVER (PARTITION BY id ORDER BY ord ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING), 0) AS lo
+    FROM tiers
+    WHERE open_ord IS NULL OR ord <= open_ord
+  ),
+  segments AS (
+    SELECT
+      id,
+      ord,
+      lo,
+      max_units AS hi,
+      base_fee + COALESCE(SUM((max_units - lo) * rate) OVER (
+        PARTITION BY id ORDER BY ord ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+      ), 0) AS cum,
+      rate,
+      -- lo never decreases with ord, so these frames are the tiers read
+      -- below lo and the ones read once consumption passes lo
+      COALESCE(bool_or(rate IS NULL) OVER (
+        PARTITION BY id ORDER BY lo RANGE BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW EXCLUDE GROUP
+      ), false) AS null_before,
+      COALESCE(bool_or(rate IS NULL) OVER (
+        PARTITION BY id ORDER BY lo RANGE BETWEEN CURRENT ROW AND CURRENT ROW
+      ), false) AS null_at
+    FROM capped
+    UNION ALL
+    -- Zero-rate tail past the last cap (models without an open tier, or without tiers)
+    SELECT
+      mo.id,
+      NULL,
+      t.lo,
+      NULL,
+      mo.base_fee + t.total,
+      0,
+      COALESCE((SELECT bool_or(c.rate IS NULL) FROM capped c WHERE c.id = mo.id AND c.lo < t.lo), false),
+      COALESCE((SELECT bool_or(c.rate IS NULL) FROM capped c WHERE c.id = mo.id AND c.lo = t.lo), false)
+    FROM models mo
+    CROSS JOIN LATERAL (
+      SELECT
+        COALESCE(MAX(c.max_units), 0) AS lo,
+        COALESCE(SUM((c.max_units - c.lo) * c.rate), 0) AS total
+      FROM capped c
+      WHERE c.id = mo.id
+    ) t
+    WHERE NOT EXISTS (SELECT 1 FROM capped c WHERE c.id = mo.id AND c.max_units IS NULL)
+  )
+  SELECT
+    s.id,
+    u.idx::integer,
+    u.amount,
+    ROUND(CASE
+      WHEN s.null_before OR (s.null_at AND (u.amount IS NULL OR u.amount > s.lo)) THEN NULL
+      WHEN u.amount IS NULL THEN CASE WHEN s.ord IS NULL THEN s.cum END
+      WHEN GREATEST(u.amount, 0) = s.lo THEN s.cum
+      ELSE s.cum + (GREATEST(u.amount, 0) - s.lo) * s.rate
+    END, 2)
+  FROM unnest(p_consumptions) WITH ORDINALITY AS u(amount, idx)
+  JOIN segments s
+    ON CASE
+      WHEN u.amount IS NULL THEN s.hi IS NULL
+      ELSE GREATEST(u.amount, 0) >= s.lo AND (s.hi IS NULL OR GREATEST(u.amount, 0) < s.hi)
+    END
+  ORDER BY array_position(p_utility_model_ids, s.id), u.idx;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION calculate_utility_costs IS 'Monthly utility cost for every (model id, consumption) pair of two arrays; each tariff is parsed once';
+
+GRANT EXECUTE ON FUNCTION calculate_utility_costs(uuid[], numeric[], boolean) TO anon, authenticated;
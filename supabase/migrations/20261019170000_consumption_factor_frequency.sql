@@ -0,0 +1,76 @@
+-- ============================================================
+-- Data-driven Consumption Factors
+-- ============================================================
+-- The Dashboard and loader/housing_cost_engine.py had one hand-coded
+-- frequency formula per activity code. Each consumption_factors row now
+-- names the lifestyle_models column that holds its frequency, so both
+-- compute usage generically:
+--
+--   uses per month = people(applies_to) * lifestyle[frequency_column]
+--                    * periods(frequency_unit: day 30, week 4.33, month 1)
+--   flat loads (frequency_column NULL) are used once a month, scaled by
+--   lifestyle[multiplier_column] when set
+--
+-- A new activity is an INSERT here (plus a lifestyle_models column and
+-- v_lifestyle_models entry if it has its own frequency).
+--
+-- computer_hour was labelled per_person but has always been counted per
+-- adult; applies_to is corrected to match.
+-- ============================================================
+
+ALTER TABLE consumption_factors
+  ADD COLUMN IF NOT EXISTS frequency_column text,
+  ADD COLUMN IF NOT EXISTS multiplier_column text;
+
+COMMENT ON COLUMN consumption_factors.frequency_column IS 'lifestyle_models column holding uses per frequency_unit; NULL = flat monthly load';
+COMMENT ON COLUMN consumption_factors.multiplier_column IS 'lifestyle_models column scaling a flat monthly load (e.g. heating_multiplier)';
+
+UPDATE consumption_factors SET frequency_column = v.frequency_column, multiplier_column = v.multiplier_column
+FROM (VALUES
+  ('shower', 'showers_per_week', NULL),
+  ('bath', 'baths_per_week', NULL),
+  ('laundry_load', 'laundry_loads_per_week', NULL),
+  ('dishwasher_load', 'dishwasher_loads_per_week', NULL),
+  ('hand_dishes', 'hand_wash_dishes_per_day', NULL),
+  ('toilet_flush', 'toilet_flushes_per_day', NULL),
+  ('cooking_meal', 'meals_cooked_per_day', NULL),
+  ('tv_hour', 'tv_hours_per_day', NULL),
+  ('computer_hour', 'computer_hours_per_day', NULL),
+  ('lighting_hour', 'lighting_hours_per_day', NULL),
+  ('hvac_heating', NULL, 'heating_multiplier'),
+  ('hvac_cooling', NULL, 'cooling_multiplier')
+) AS v(activity_code, frequency_column, multiplier_column)
+WHERE consumption_factors.activity_code = v.activity_code;
+
+UPDATE consumption_factors SET applies_to = 'per_adult' WHERE activity_code = 'computer_hour';
+
+ALTER TABLE consumption_factors
+  ADD CONSTRAINT consumption_factors_applies_to_check
+    CHECK (applies_to IN ('per_person', 'per_household', 'per_adult', 'per_child')),
+  ADD CONSTRAINT consumption_factors_frequency_unit_check
+    CHECK (frequency_unit IN ('day', 'week', 'month'));
+
+-- Column names must exist on lifestyle_models (checked on write)
+CREATE OR REPLACE FUNCTION check_consumption_factor_columns()
+RETURNS trigger AS $$
+BEGIN
+  IF NEW.frequency_column IS NOT NULL AND NOT EXISTS (
+    SELECT 1 FROM information_schema.columns
+    WHERE table_schema = 'public' AND table_name = 'lifestyle_models' AND column_name = NEW.frequency_column
+  ) THEN
+    RAISE EXCEPTION 'consumption_factors.frequency_column: lifestyle_models has no column %', NEW.frequency_column;
+  END IF;
+  IF NEW.multiplier_column IS NOT NULL AND NOT EXISTS (
+    SELECT 1 FROM information_schema.columns
+    WHERE table_schema = 'public' AND table_name = 'lifestyle_models' AND column_name = NEW.multiplier_column
+  ) THEN
+    RAISE EXCEPTION 'consumption_factors.multiplier_column: lifestyle_models has no column %', NEW.multiplier_column;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS consumption_factor_columns ON consumption_factors;
+CREATE TRIGGER consumption_factor_columns
+  BEFORE INSERT OR UPDATE OF frequency_column, multiplier_column ON consumption_factors
+  FOR EACH ROW EXECUTE FUNCTION check_consumption_factor_columns();